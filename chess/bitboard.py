@@ -0,0 +1,810 @@
+"""Bitboard position and move generation.
+
+Squares are indexed from 0 (a1) to 63 (h8), i.e. ``square = (y - 1) * 8 + (x - 1)``
+for the 1-based ``(x, y)`` coordinates used by the object model. Each of the twelve
+(color, piece type) pairs is stored as a 64-bit occupancy mask held in a Python int.
+
+Moves are encoded as 16-bit integers: ``from | to << 6 | flag << 12``.
+"""
+import struct
+from random import Random
+from typing import Iterator, List, NamedTuple, Optional
+
+from .constants import COL_NAMES
+
+WHITE, BLACK = 0, 1
+COLORS = ("white", "black")
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_SYMBOLS = "PNBRQK"
+
+# castling rights
+WHITE_KING_SIDE = 1
+WHITE_QUEEN_SIDE = 2
+BLACK_KING_SIDE = 4
+BLACK_QUEEN_SIDE = 8
+# FEN symbols of the castling rights, by bit index
+CASTLING_SYMBOLS = "KQkq"
+# (color, King square, Rook square) of the castling rights, by FEN symbol
+CASTLING_SQUARES = {
+    "K": (WHITE, 4, 7),
+    "Q": (WHITE, 4, 0),
+    "k": (BLACK, 60, 63),
+    "q": (BLACK, 60, 56),
+}
+
+# packed snapshot: 64 cells of 4 bits (0 if empty, piece index + 1 otherwise), side
+# to move and castling rights, en passant square (+ 1, 0 if none), halfmove clock
+# and fullmove number
+PACK_FORMAT = struct.Struct("<32sBBHH")
+PACKED_SIZE = PACK_FORMAT.size
+
+# move flags
+QUIET = 0
+DOUBLE_PAWN_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8  # promoted piece type is KNIGHT + (flag & 3)
+PROMOTION_CAPTURE = 12
+
+INITIAL_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+FULL = (1 << 64) - 1
+RANK_3 = 0xFF << 16
+RANK_6 = 0xFF << 40
+
+
+def color_index(color: str) -> int:
+    if color not in COLORS:
+        raise ValueError('`color` must be either "white" or "black".')
+    return WHITE if color == "white" else BLACK
+
+
+def coords_to_square(coords: tuple) -> int:
+    (x, y) = coords
+    return (y - 1) * 8 + (x - 1)
+
+
+def square_to_coords(square: int) -> tuple:
+    return (square % 8 + 1, square // 8 + 1)
+
+
+def square_name(square: int) -> str:
+    return COL_NAMES[square % 8] + str(square // 8 + 1)
+
+
+def parse_square(name: str) -> int:
+    if len(name) != 2 or name[0] not in COL_NAMES or name[1] not in "12345678":
+        raise ValueError(f'Invalid square "{name}"')
+    return (int(name[1]) - 1) * 8 + COL_NAMES.index(name[0])
+
+
+def encode_move(from_square: int, to_square: int, flag: int = QUIET) -> int:
+    return from_square | (to_square << 6) | (flag << 12)
+
+
+def move_from(move: int) -> int:
+    return move & 63
+
+
+def move_to(move: int) -> int:
+    return (move >> 6) & 63
+
+
+def move_flag(move: int) -> int:
+    return move >> 12
+
+
+def move_promotion(move: int):
+    """Return the promoted piece type of `move`, or None."""
+    flag = move >> 12
+    if flag & PROMOTION:
+        return KNIGHT + (flag & 3)
+    return None
+
+
+def move_to_uci(move: int) -> str:
+    uci = square_name(move & 63) + square_name((move >> 6) & 63)
+    promotion = move_promotion(move)
+    if promotion is not None:
+        uci += PIECE_SYMBOLS[promotion].lower()
+    return uci
+
+
+def iter_bits(bb: int):
+    while bb:
+        b = bb & -bb
+        yield b.bit_length() - 1
+        bb ^= b
+
+
+def _leaper_attacks(offsets) -> List[int]:
+    table = []
+    for square in range(64):
+        x, y = square % 8, square // 8
+        bb = 0
+        for dx, dy in offsets:
+            if 0 <= x + dx < 8 and 0 <= y + dy < 8:
+                bb |= 1 << ((y + dy) * 8 + x + dx)
+        table.append(bb)
+    return table
+
+
+def _ray(dx: int, dy: int) -> List[int]:
+    table = []
+    for square in range(64):
+        x, y = square % 8 + dx, square // 8 + dy
+        bb = 0
+        while 0 <= x < 8 and 0 <= y < 8:
+            bb |= 1 << (y * 8 + x)
+            x, y = x + dx, y + dy
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks(
+    [(-2, +1), (-2, -1), (+2, +1), (+2, -1), (+1, -2), (+1, +2), (-1, +2), (-1, -2)]
+)
+KING_ATTACKS = _leaper_attacks(
+    [(0, +1), (0, -1), (+1, 0), (+1, +1), (+1, -1), (-1, 0), (-1, +1), (-1, -1)]
+)
+PAWN_ATTACKS = [
+    _leaper_attacks([(+1, +1), (-1, +1)]),
+    _leaper_attacks([(+1, -1), (-1, -1)]),
+]
+
+# rays going towards higher square indices (first blocker is the lowest set bit)
+NORTH, EAST = _ray(0, 1), _ray(1, 0)
+NORTH_EAST, NORTH_WEST = _ray(1, 1), _ray(-1, 1)
+# rays going towards lower square indices (first blocker is the highest set bit)
+SOUTH, WEST = _ray(0, -1), _ray(-1, 0)
+SOUTH_WEST, SOUTH_EAST = _ray(-1, -1), _ray(1, -1)
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    attacks = 0
+    for rays in (NORTH_EAST, NORTH_WEST):
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for rays in (SOUTH_WEST, SOUTH_EAST):
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+    attacks = 0
+    for rays in (NORTH, EAST):
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for rays in (SOUTH, WEST):
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+# castling rights kept when a piece leaves or lands on a given square
+CASTLING_MASK = [15] * 64
+CASTLING_MASK[0] = 15 ^ WHITE_QUEEN_SIDE
+CASTLING_MASK[4] = 15 ^ (WHITE_KING_SIDE | WHITE_QUEEN_SIDE)
+CASTLING_MASK[7] = 15 ^ WHITE_KING_SIDE
+CASTLING_MASK[56] = 15 ^ BLACK_QUEEN_SIDE
+CASTLING_MASK[60] = 15 ^ (BLACK_KING_SIDE | BLACK_QUEEN_SIDE)
+CASTLING_MASK[63] = 15 ^ BLACK_KING_SIDE
+
+# Zobrist keys (drawn from a fixed seed so that they are shared by all processes)
+_zobrist_random = Random(20211105)
+ZOBRIST_PIECES = [
+    [_zobrist_random.getrandbits(64) for _ in range(64)] for _ in range(12)
+]
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)
+ZOBRIST_CASTLING = [_zobrist_random.getrandbits(64) for _ in range(16)]
+ZOBRIST_EP_FILE = [_zobrist_random.getrandbits(64) for _ in range(8)]
+
+
+class UndoInfo(NamedTuple):
+    """Everything needed by `Position.unmake_move` to revert a move."""
+
+    move: int
+    captured: Optional[int]
+    castling: int
+    ep_square: Optional[int]
+    halfmove_clock: int
+    key: int
+
+
+class Position:
+    """Chess position stored as twelve 64-bit occupancy masks.
+
+    A 64-entry mailbox (`squares`) mirrors the masks so that the piece standing on
+    a given square can be found without scanning the bitboards.
+    """
+
+    def __init__(self):
+        self.bitboards = [0] * 12
+        self.squares = [None] * 64
+        self.occupancy = [0, 0]
+        self.side_to_move = WHITE
+        self.castling = 0
+        self.ep_square = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.key = 0
+
+    @classmethod
+    def initial(cls):
+        position = cls()
+        back_rank = [ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK]
+        for x, piece_type in enumerate(back_rank):
+            position._put(WHITE * 6 + piece_type, x)
+            position._put(WHITE * 6 + PAWN, 8 + x)
+            position._put(BLACK * 6 + PAWN, 48 + x)
+            position._put(BLACK * 6 + piece_type, 56 + x)
+        position.castling = 15
+        position.key = position.compute_key()
+        return position
+
+    @classmethod
+    def from_board(cls, board, turn: str = "white"):
+        """Build a position from an object `Board` and the color to play."""
+        from .pieces import Ghost
+
+        position = cls()
+        position.side_to_move = color_index(turn)
+        ghost_square = None
+        for player in board.players:
+            for piece in player.pieces:
+                if isinstance(piece, Ghost):
+                    if piece.color != turn:
+                        ghost_square = coords_to_square(piece.coords)
+                    continue
+                piece_type = PIECE_SYMBOLS.index(piece.SYMBOL)
+                square = coords_to_square(piece.coords)
+                position._put(color_index(piece.color) * 6 + piece_type, square)
+
+        # castling rights derive from unmoved kings and rooks on their home squares
+        for color, rank in ((WHITE, 0), (BLACK, 56)):
+            king = board.get_piece(square_to_coords(rank + 4))
+            if king is None or king.SYMBOL != "K" or king.has_moved:
+                continue
+            for rook_square, right in ((rank + 7, 1), (rank, 2)):
+                rook = board.get_piece(square_to_coords(rook_square))
+                if (
+                    rook is not None
+                    and rook.SYMBOL == "R"
+                    and color_index(rook.color) == color
+                    and not rook.has_moved
+                ):
+                    position.castling |= right << (2 * color)
+
+        if ghost_square is not None and position._can_capture_en_passant(ghost_square):
+            position.ep_square = ghost_square
+        position.key = position.compute_key()
+        return position
+
+    @classmethod
+    def from_game(cls, game):
+        return cls.from_board(game.board, turn=game.turn)
+
+    @classmethod
+    def from_fen(cls, fen: str):
+        """Build a position from a Forsyth-Edwards Notation string."""
+        fields = fen.split()
+        if len(fields) not in (4, 6):
+            raise ValueError(f'Invalid FEN "{fen}"')
+        (placement, turn, castling, ep_square) = fields[:4]
+
+        position = cls()
+        rows = placement.split("/")
+        if len(rows) != 8:
+            raise ValueError(f'Invalid FEN placement "{placement}"')
+        for y, row in enumerate(reversed(rows)):
+            x = 0
+            for char in row:
+                if char.isdigit():
+                    x += int(char)
+                    continue
+                if char.upper() not in PIECE_SYMBOLS or x > 7:
+                    raise ValueError(f'Invalid FEN placement "{placement}"')
+                color = WHITE if char.isupper() else BLACK
+                position._put(color * 6 + PIECE_SYMBOLS.index(char.upper()), y * 8 + x)
+                x += 1
+            if x != 8:
+                raise ValueError(f'Invalid FEN placement "{placement}"')
+
+        for color in (WHITE, BLACK):
+            if bin(position.bitboards[color * 6 + KING]).count("1") != 1:
+                raise ValueError(f'Invalid FEN placement "{placement}"')
+
+        if turn not in ("w", "b"):
+            raise ValueError(f'Invalid FEN side to move "{turn}"')
+        position.side_to_move = WHITE if turn == "w" else BLACK
+        if castling != "-":
+            for char in castling:
+                if char not in CASTLING_SYMBOLS:
+                    raise ValueError(f'Invalid FEN castling rights "{castling}"')
+                # rights are dropped unless the King and Rook are on their squares
+                (color, king, rook) = CASTLING_SQUARES[char]
+                if (
+                    position.squares[king] == color * 6 + KING
+                    and position.squares[rook] == color * 6 + ROOK
+                ):
+                    position.castling |= 1 << CASTLING_SYMBOLS.index(char)
+        if ep_square != "-":
+            ep_square = parse_square(ep_square)
+            if position._can_capture_en_passant(ep_square):
+                position.ep_square = ep_square
+        if len(fields) == 6:
+            position.halfmove_clock = int(fields[4])
+            position.fullmove_number = int(fields[5])
+        position.key = position.compute_key()
+        return position
+
+    @classmethod
+    def unpack(cls, data: bytes):
+        """Build a position from a snapshot created by `pack`."""
+        (cells, flags, ep_square, halfmove_clock, fullmove_number) = PACK_FORMAT.unpack(
+            data
+        )
+        position = cls()
+        for i, byte in enumerate(cells):
+            if byte & 15:
+                position._put((byte & 15) - 1, 2 * i)
+            if byte >> 4:
+                position._put((byte >> 4) - 1, 2 * i + 1)
+        position.side_to_move = flags & 1
+        position.castling = flags >> 1
+        position.ep_square = ep_square - 1 if ep_square else None
+        position.halfmove_clock = halfmove_clock
+        position.fullmove_number = fullmove_number
+        position.key = position.compute_key()
+        return position
+
+    def pack(self) -> bytes:
+        """Return a fixed-size (`PACKED_SIZE` bytes) binary snapshot of the position."""
+        codes = [0 if piece is None else piece + 1 for piece in self.squares]
+        cells = bytes([codes[i] | codes[i + 1] << 4 for i in range(0, 64, 2)])
+        return PACK_FORMAT.pack(
+            cells,
+            self.side_to_move | self.castling << 1,
+            0 if self.ep_square is None else self.ep_square + 1,
+            self.halfmove_clock,
+            self.fullmove_number,
+        )
+
+    def to_fen(self) -> str:
+        """Return the Forsyth-Edwards Notation of the position."""
+        rows = []
+        for y in range(7, -1, -1):
+            (row, n_empty) = ("", 0)
+            for piece in self.squares[y * 8 : y * 8 + 8]:
+                if piece is None:
+                    n_empty += 1
+                    continue
+                if n_empty:
+                    (row, n_empty) = (row + str(n_empty), 0)
+                symbol = PIECE_SYMBOLS[piece % 6]
+                row += symbol if piece < 6 else symbol.lower()
+            rows.append(row + str(n_empty) if n_empty else row)
+        castling = "".join(
+            symbol
+            for i, symbol in enumerate(CASTLING_SYMBOLS)
+            if self.castling >> i & 1
+        )
+        ep_square = "-" if self.ep_square is None else square_name(self.ep_square)
+        return " ".join(
+            [
+                "/".join(rows),
+                "wb"[self.side_to_move],
+                castling or "-",
+                ep_square,
+                str(self.halfmove_clock),
+                str(self.fullmove_number),
+            ]
+        )
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position.bitboards = self.bitboards[:]
+        position.squares = self.squares[:]
+        position.occupancy = self.occupancy[:]
+        position.side_to_move = self.side_to_move
+        position.castling = self.castling
+        position.ep_square = self.ep_square
+        position.halfmove_clock = self.halfmove_clock
+        position.fullmove_number = self.fullmove_number
+        position.key = self.key
+        return position
+
+    def compute_key(self) -> int:
+        """Compute the Zobrist key of the position from scratch."""
+        key = ZOBRIST_CASTLING[self.castling]
+        for square, piece in enumerate(self.squares):
+            if piece is not None:
+                key ^= ZOBRIST_PIECES[piece][square]
+        if self.side_to_move == BLACK:
+            key ^= ZOBRIST_SIDE
+        if self.ep_square is not None:
+            key ^= ZOBRIST_EP_FILE[self.ep_square % 8]
+        return key
+
+    @property
+    def turn(self) -> str:
+        return COLORS[self.side_to_move]
+
+    @property
+    def occupied(self) -> int:
+        return self.occupancy[0] | self.occupancy[1]
+
+    def _put(self, piece: int, square: int):
+        bit = 1 << square
+        self.bitboards[piece] |= bit
+        self.occupancy[piece // 6] |= bit
+        self.squares[square] = piece
+
+    def _remove(self, square: int) -> int:
+        piece = self.squares[square]
+        bit = 1 << square
+        self.bitboards[piece] ^= bit
+        self.occupancy[piece // 6] ^= bit
+        self.squares[square] = None
+        return piece
+
+    def piece_at(self, square: int):
+        """Return the piece index (``color * 6 + piece type``) on `square`."""
+        return self.squares[square]
+
+    def king_square(self, color: int) -> int:
+        return self.bitboards[color * 6 + KING].bit_length() - 1
+
+    def _can_capture_en_passant(self, ep_square: int) -> bool:
+        # pawns of the side to move standing diagonally behind the skipped square
+        us = self.side_to_move
+        return bool(PAWN_ATTACKS[us ^ 1][ep_square] & self.bitboards[us * 6 + PAWN])
+
+    def is_square_attacked(self, square: int, by_color: int) -> bool:
+        bbs = self.bitboards
+        base = by_color * 6
+        if PAWN_ATTACKS[by_color ^ 1][square] & bbs[base + PAWN]:
+            return True
+        if KNIGHT_ATTACKS[square] & bbs[base + KNIGHT]:
+            return True
+        if KING_ATTACKS[square] & bbs[base + KING]:
+            return True
+        occupied = self.occupancy[0] | self.occupancy[1]
+        queens = bbs[base + QUEEN]
+        diagonal = bbs[base + BISHOP] | queens
+        if diagonal and bishop_attacks(square, occupied) & diagonal:
+            return True
+        straight = bbs[base + ROOK] | queens
+        if straight and rook_attacks(square, occupied) & straight:
+            return True
+        return False
+
+    def attackers_of(self, square: int, by_color: int) -> int:
+        """Return the bitboard of the pieces of `by_color` attacking `square`."""
+        bbs = self.bitboards
+        base = by_color * 6
+        occupied = self.occupancy[0] | self.occupancy[1]
+        queens = bbs[base + QUEEN]
+        return (
+            (PAWN_ATTACKS[by_color ^ 1][square] & bbs[base + PAWN])
+            | (KNIGHT_ATTACKS[square] & bbs[base + KNIGHT])
+            | (KING_ATTACKS[square] & bbs[base + KING])
+            | (bishop_attacks(square, occupied) & (bbs[base + BISHOP] | queens))
+            | (rook_attacks(square, occupied) & (bbs[base + ROOK] | queens))
+        )
+
+    def is_check(self) -> bool:
+        us = self.side_to_move
+        return self.is_square_attacked(self.king_square(us), us ^ 1)
+
+    def pseudo_legal_moves(self) -> List[int]:
+        """Generate moves without checking that the own king is left safe.
+
+        Castling moves are only generated when the king does not start from, cross
+        or land on an attacked square.
+        """
+        us = self.side_to_move
+        them = us ^ 1
+        bbs = self.bitboards
+        own = self.occupancy[us]
+        enemy = self.occupancy[them]
+        occupied = own | enemy
+        empty = ~occupied & FULL
+        base = us * 6
+        moves = []
+        append = moves.append
+
+        # pawns
+        pawns = bbs[base + PAWN]
+        if us == WHITE:
+            single = (pawns << 8) & empty
+            double = ((single & RANK_3) << 8) & empty
+            push = -8
+        else:
+            single = (pawns >> 8) & empty
+            double = ((single & RANK_6) >> 8) & empty
+            push = 8
+        while single:
+            b = single & -single
+            to = b.bit_length() - 1
+            single ^= b
+            if to >= 56 or to < 8:
+                for promotion in (3, 2, 1, 0):
+                    append((to + push) | (to << 6) | ((PROMOTION | promotion) << 12))
+            else:
+                append((to + push) | (to << 6))
+        while double:
+            b = double & -double
+            to = b.bit_length() - 1
+            double ^= b
+            append((to + 2 * push) | (to << 6) | (DOUBLE_PAWN_PUSH << 12))
+        pawn_attacks = PAWN_ATTACKS[us]
+        ep_square = self.ep_square
+        ep_bit = 0 if ep_square is None else 1 << ep_square
+        while pawns:
+            b = pawns & -pawns
+            frm = b.bit_length() - 1
+            pawns ^= b
+            attacks = pawn_attacks[frm]
+            targets = attacks & enemy
+            while targets:
+                t = targets & -targets
+                to = t.bit_length() - 1
+                targets ^= t
+                if to >= 56 or to < 8:
+                    for promotion in (3, 2, 1, 0):
+                        append(
+                            frm | (to << 6) | ((PROMOTION_CAPTURE | promotion) << 12)
+                        )
+                else:
+                    append(frm | (to << 6) | (CAPTURE << 12))
+            if attacks & ep_bit:
+                append(frm | (ep_square << 6) | (EN_PASSANT << 12))
+
+        # pieces
+        not_own = ~own & FULL
+        for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            pieces = bbs[base + piece_type]
+            while pieces:
+                b = pieces & -pieces
+                frm = b.bit_length() - 1
+                pieces ^= b
+                if piece_type == KNIGHT:
+                    targets = KNIGHT_ATTACKS[frm]
+                elif piece_type == BISHOP:
+                    targets = bishop_attacks(frm, occupied)
+                elif piece_type == ROOK:
+                    targets = rook_attacks(frm, occupied)
+                elif piece_type == QUEEN:
+                    targets = bishop_attacks(frm, occupied) | rook_attacks(
+                        frm, occupied
+                    )
+                else:
+                    targets = KING_ATTACKS[frm]
+                targets &= not_own
+                while targets:
+                    t = targets & -targets
+                    to = t.bit_length() - 1
+                    targets ^= t
+                    if t & enemy:
+                        append(frm | (to << 6) | (CAPTURE << 12))
+                    else:
+                        append(frm | (to << 6))
+
+        # castling
+        rights = self.castling >> (2 * us) & 3
+        if rights:
+            king = 4 if us == WHITE else 60
+            if not self.is_square_attacked(king, them):
+                if (
+                    rights & 1
+                    and not occupied & (0b11 << (king + 1))
+                    and not self.is_square_attacked(king + 1, them)
+                    and not self.is_square_attacked(king + 2, them)
+                ):
+                    append(king | ((king + 2) << 6) | (KING_CASTLE << 12))
+                if (
+                    rights & 2
+                    and not occupied & (0b111 << (king - 3))
+                    and not self.is_square_attacked(king - 1, them)
+                    and not self.is_square_attacked(king - 2, them)
+                ):
+                    append(king | ((king - 2) << 6) | (QUEEN_CASTLE << 12))
+        return moves
+
+    def legal_moves(self) -> List[int]:
+        return [move for move in self.pseudo_legal_moves() if self.is_legal(move)]
+
+    def iter_legal_moves(self) -> Iterator[int]:
+        for move in self.pseudo_legal_moves():
+            if self.is_legal(move):
+                yield move
+
+    def has_legal_move(self) -> bool:
+        """Check whether the side to move can move, stopping at the first legal move."""
+        for _ in self.iter_legal_moves():
+            return True
+        return False
+
+    def is_legal(self, move: int) -> bool:
+        """Check that the pseudo-legal `move` does not leave the own king attacked."""
+        us = self.side_to_move
+        undo = self.make_move(move)
+        legal = not self.is_square_attacked(self.king_square(us), us ^ 1)
+        self.unmake_move(undo)
+        return legal
+
+    def make_move(self, move: int) -> UndoInfo:
+        """Play `move` (assumed pseudo-legal) and return what is needed to revert it.
+
+        The Zobrist key is updated incrementally.
+        """
+        frm = move & 63
+        to = (move >> 6) & 63
+        flag = move >> 12
+        us = self.side_to_move
+        castling, ep_square, halfmove_clock, key = (
+            self.castling,
+            self.ep_square,
+            self.halfmove_clock,
+            self.key,
+        )
+
+        piece = self._remove(frm)
+        key ^= ZOBRIST_PIECES[piece][frm]
+        captured = None
+        self.halfmove_clock += 1
+        if flag == EN_PASSANT:
+            captured_square = to - 8 if us == WHITE else to + 8
+            captured = self._remove(captured_square)
+            key ^= ZOBRIST_PIECES[captured][captured_square]
+            self.halfmove_clock = 0
+        elif self.squares[to] is not None:
+            captured = self._remove(to)
+            key ^= ZOBRIST_PIECES[captured][to]
+            self.halfmove_clock = 0
+        if flag & PROMOTION:
+            piece = us * 6 + KNIGHT + (flag & 3)
+        self._put(piece, to)
+        key ^= ZOBRIST_PIECES[piece][to]
+
+        if flag == KING_CASTLE:
+            rook = self._remove(to + 1)
+            self._put(rook, to - 1)
+            key ^= ZOBRIST_PIECES[rook][to + 1] ^ ZOBRIST_PIECES[rook][to - 1]
+        elif flag == QUEEN_CASTLE:
+            rook = self._remove(to - 2)
+            self._put(rook, to + 1)
+            key ^= ZOBRIST_PIECES[rook][to - 2] ^ ZOBRIST_PIECES[rook][to + 1]
+
+        if piece % 6 == PAWN:
+            self.halfmove_clock = 0
+        self.castling &= CASTLING_MASK[frm] & CASTLING_MASK[to]
+        key ^= ZOBRIST_CASTLING[castling] ^ ZOBRIST_CASTLING[self.castling]
+        self.side_to_move = us ^ 1
+        key ^= ZOBRIST_SIDE
+        if us == BLACK:
+            self.fullmove_number += 1
+        if ep_square is not None:
+            key ^= ZOBRIST_EP_FILE[ep_square % 8]
+        self.ep_square = None
+        if flag == DOUBLE_PAWN_PUSH:
+            skipped = (frm + to) // 2
+            if self._can_capture_en_passant(skipped):
+                self.ep_square = skipped
+                key ^= ZOBRIST_EP_FILE[skipped % 8]
+        undo = UndoInfo(move, captured, castling, ep_square, halfmove_clock, self.key)
+        self.key = key
+        return undo
+
+    def unmake_move(self, undo: UndoInfo):
+        """Revert a move played with `make_move`."""
+        move = undo.move
+        frm = move & 63
+        to = (move >> 6) & 63
+        flag = move >> 12
+        us = self.side_to_move ^ 1
+        self.side_to_move = us
+        if us == BLACK:
+            self.fullmove_number -= 1
+
+        piece = self._remove(to)
+        if flag & PROMOTION:
+            piece = us * 6 + PAWN
+        self._put(piece, frm)
+        if undo.captured is not None:
+            if flag == EN_PASSANT:
+                self._put(undo.captured, to - 8 if us == WHITE else to + 8)
+            else:
+                self._put(undo.captured, to)
+        if flag == KING_CASTLE:
+            self._put(self._remove(to - 1), to + 1)
+        elif flag == QUEEN_CASTLE:
+            self._put(self._remove(to + 1), to - 2)
+
+        self.castling = undo.castling
+        self.ep_square = undo.ep_square
+        self.halfmove_clock = undo.halfmove_clock
+        self.key = undo.key
+
+    def encode(self, from_square: int, to_square: int, promotion: str = None) -> int:
+        """Encode the move from `from_square` to `to_square` in this position.
+
+        `promotion` is the symbol ("Q", "R", "B" or "N") of the piece a pawn reaching
+        the last rank is promoted to (a queen by default).
+        """
+        piece = self.squares[from_square]
+        if piece is None:
+            raise ValueError(f"No piece on {square_name(from_square)}")
+        piece_type = piece % 6
+        captured = self.squares[to_square] is not None
+        flag = CAPTURE if captured else QUIET
+        if piece_type == KING and abs(to_square - from_square) == 2:
+            flag = KING_CASTLE if to_square > from_square else QUEEN_CASTLE
+        elif piece_type == PAWN:
+            if abs(to_square - from_square) == 16:
+                flag = DOUBLE_PAWN_PUSH
+            elif (to_square - from_square) % 8 != 0 and not captured:
+                flag = EN_PASSANT
+            elif to_square >= 56 or to_square < 8:
+                symbol = "Q" if promotion is None else promotion
+                flag = (PROMOTION_CAPTURE if captured else PROMOTION) | (
+                    PIECE_SYMBOLS.index(symbol) - KNIGHT
+                )
+        return from_square | (to_square << 6) | (flag << 12)
+
+    def parse_uci(self, uci: str) -> int:
+        """Encode a move given in UCI notation (e.g. "e2e4" or "e7e8q")."""
+        if len(uci) not in (4, 5):
+            raise ValueError(f'Invalid UCI move "{uci}"')
+        promotion = uci[4].upper() if len(uci) == 5 else None
+        if promotion is not None and promotion not in "NBRQ":
+            raise ValueError(f'Invalid UCI move "{uci}"')
+        return self.encode(parse_square(uci[:2]), parse_square(uci[2:4]), promotion)
+
+    def to_object_move(self, move: int, board):
+        """Convert `move` to a (piece, move) pair of the matching object `Board`."""
+        from .moves import KingSideCastling, Move, QueenSideCastling
+        from .pieces import King
+
+        piece = board.get_piece(square_to_coords(move & 63))
+        flag = move >> 12
+        if flag in (KING_CASTLE, QUEEN_CASTLE):
+            castling = KingSideCastling if flag == KING_CASTLE else QueenSideCastling
+            for king_move in King.MOVES:
+                if isinstance(king_move, castling):
+                    return (piece, king_move)
+        (x, y) = square_to_coords((move >> 6) & 63)
+        return (piece, Move((x - piece.x, y - piece.y)))
+
+    def to_str_arr(self):
+        import numpy as np
+
+        arr = np.zeros((8, 8), dtype="<U2")
+        for square, piece in enumerate(self.squares):
+            if piece is not None:
+                arr[7 - square // 8, square % 8] = (
+                    PIECE_SYMBOLS[piece % 6] + COLORS[piece // 6][0]
+                )
+        return arr
+
+    def __str__(self):
+        from .board import board_to_string
+
+        return board_to_string(self.to_str_arr())
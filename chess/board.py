@@ -1,15 +1,30 @@
 """Board class and functions."""
-from copy import deepcopy
-from typing import List
+from typing import List, NamedTuple, Optional, Tuple
 
 import numpy as np
 
 from .constants import COL_NAMES, ROW_NAMES
 from .coords import coords_to_loc, coords_to_np_coords, loc_to_coords
+from .moves import DIAGONALS, ROWS, Castling, Move
 from .players import Player
-from .pieces import Piece
+from .pieces import (
+    PROMOTION_PIECES,
+    Bishop,
+    Ghost,
+    King,
+    Knight,
+    Pawn,
+    Piece,
+    Queen,
+    Rook,
+)
 from .plot import show_board
 
+KNIGHT_JUMPS = [
+    (dx, dy) for dx in (-2, -1, +1, +2) for dy in (-2, -1, +1, +2) if abs(dx) != abs(dy)
+]
+KING_STEPS = [(dx, dy) for dx in (-1, 0, +1) for dy in (-1, 0, +1) if dx or dy]
+
 
 def create_board() -> np.ndarray:
     board = np.zeros((8, 8), dtype=object)
@@ -46,6 +61,23 @@ def display_board(board: np.ndarray):
     print(board_to_string(board))
 
 
+class UndoInfo(NamedTuple):
+    """Everything needed by `Board.unmake_move` to revert a move."""
+
+    piece: Piece
+    init_coords: tuple
+    had_moved: bool
+    captured: Optional[Piece]
+    captured_index: int
+    expired_ghosts: List[Tuple[int, Ghost]]
+    rook: Optional[Piece]
+    rook_coords: tuple
+    rook_had_moved: bool
+    ghost: Optional[Ghost]
+    promoted: Optional[Piece]
+    promoted_index: int
+
+
 class Board:
     def __init__(self, players: List[Player] = None):
         self.chessboard = create_board()
@@ -53,7 +85,14 @@ class Board:
             self.add_players(players)
 
     def copy(self):
-        return deepcopy(self)
+        """Return an independent copy of the board.
+
+        Pieces are copied shallowly (their attributes are immutable) and the
+        chessboard array is rebuilt from the copied players.
+        """
+        return Board([player.copy() for player in self.players])
+
+    snapshot = copy
 
     def add_players(self, players: List[Player]):
         self.players = players
@@ -99,6 +138,177 @@ class Board:
     def del_piece(self, piece: Piece):
         self.chessboard[coords_to_np_coords(piece.coords)] = None
 
+    def iter_attackers(self, coords: tuple, by_color: str = None):
+        """Iterate over the pieces attacking the cell at `coords`.
+
+        Instead of generating the moves of every adversary piece, scan outward from
+        the cell along pawn diagonals, knight jumps, king steps, rows and diagonals.
+        Ghosts are transparent. If `by_color` is None, pieces of both colors are
+        considered.
+        """
+        chessboard = self.chessboard
+        (x, y) = coords
+
+        for dx, dy in KNIGHT_JUMPS + KING_STEPS:
+            if 1 <= x + dx <= 8 and 1 <= y + dy <= 8:
+                piece = chessboard[8 - y - dy, x + dx - 1]
+                if piece is None or (by_color is not None and piece.color != by_color):
+                    continue
+                if abs(dx) + abs(dy) == 3:
+                    if isinstance(piece, Knight):
+                        yield piece
+                elif isinstance(piece, King):
+                    yield piece
+                # Pawns attack diagonally forward
+                elif isinstance(piece, Pawn) and dx != 0:
+                    if dy == (-1 if piece.color == "white" else +1):
+                        yield piece
+
+        for directions, sliders in (
+            (DIAGONALS, (Bishop, Queen)),
+            (ROWS, (Rook, Queen)),
+        ):
+            for dx, dy in directions:
+                (i, j) = (x + dx, y + dy)
+                while 1 <= i <= 8 and 1 <= j <= 8:
+                    piece = chessboard[8 - j, i - 1]
+                    if piece is not None and not isinstance(piece, Ghost):
+                        if isinstance(piece, sliders) and (
+                            by_color is None or piece.color == by_color
+                        ):
+                            yield piece
+                        break
+                    (i, j) = (i + dx, j + dy)
+
+    def attackers_of(self, coords: tuple, by_color: str = None) -> List[Piece]:
+        return list(self.iter_attackers(coords, by_color))
+
+    def is_square_attacked(self, coords: tuple, by_color: str) -> bool:
+        for _ in self.iter_attackers(coords, by_color):
+            return True
+        return False
+
+    def make_move(self, piece: Piece, move: Move, promotion: str = None) -> UndoInfo:
+        """Play `move` of `piece` on the board and on the players' pieces.
+
+        The returned `UndoInfo` reverts the move through `unmake_move`. `promotion`
+        is the symbol of the piece a Pawn reaching the last row is changed to (a
+        Queen by default).
+        """
+        player = self.get_player(piece.color)
+        other_player = self.get_player("white" if piece.color == "black" else "black")
+        init_coords = piece.coords
+        new_coords = move.get_new_coords(init_coords)
+
+        # a Pawn landing on an adversary ghost takes the Pawn "en passant"
+        target_cell = self.get_piece(new_coords)
+        if isinstance(target_cell, Ghost):
+            target_cell = (
+                self.get_piece((new_coords[0], init_coords[1]))
+                if isinstance(piece, Pawn)
+                else None
+            )
+
+        # adversary ghosts only last for one move
+        expired_ghosts = []
+        pieces = other_player.pieces
+        for i in range(len(pieces) - 1, -1, -1):
+            if isinstance(pieces[i], Ghost):
+                ghost = pieces.pop(i)
+                expired_ghosts.append((i, ghost))
+                if self.get_piece(ghost.coords) is ghost:
+                    self.del_piece(ghost)
+        expired_ghosts.reverse()
+
+        # take adversary piece
+        captured, captured_index = None, -1
+        if target_cell is not None and target_cell.color != piece.color:
+            captured = target_cell
+            captured_index = pieces.index(captured)
+            del pieces[captured_index]
+            player.captured_pieces.append(captured)
+            self.del_piece(captured)
+
+        # move piece
+        had_moved = piece.has_moved
+        self.del_piece(piece)
+        piece.move(new_coords)
+        self.set_piece(piece)
+
+        # move Rook if move is Castling
+        rook, rook_coords, rook_had_moved = None, None, False
+        if isinstance(move, Castling):
+            rook = self.get_piece((move.rook_col, init_coords[1]))
+            rook_coords, rook_had_moved = rook.coords, rook.has_moved
+            self.del_piece(rook)
+            rook.move(move.rook_move.get_new_coords(rook_coords))
+            self.set_piece(rook)
+
+        ghost, promoted, promoted_index = None, None, -1
+        if isinstance(piece, Pawn):
+            # mark intermediary cell as "Ghost" if Pawn is moving two cells
+            if abs(new_coords[1] - init_coords[1]) == 2:
+                ghost = Ghost(
+                    (init_coords[0], (init_coords[1] + new_coords[1]) // 2),
+                    color=piece.color,
+                )
+                player.pieces.append(ghost)
+                self.set_piece(ghost)
+            # change Pawn to chosen piece if it reaches the last row
+            elif new_coords[1] == (8 if piece.color == "white" else 1):
+                promoted = PROMOTION_PIECES[promotion or "Q"](
+                    new_coords, color=piece.color, has_moved=True
+                )
+                promoted_index = player.pieces.index(piece)
+                player.pieces[promoted_index] = promoted
+                self.set_piece(promoted)
+
+        return UndoInfo(
+            piece,
+            init_coords,
+            had_moved,
+            captured,
+            captured_index,
+            expired_ghosts,
+            rook,
+            rook_coords,
+            rook_had_moved,
+            ghost,
+            promoted,
+            promoted_index,
+        )
+
+    def unmake_move(self, undo: UndoInfo):
+        """Revert a move played with `make_move`."""
+        piece = undo.piece
+        player = self.get_player(piece.color)
+        other_player = self.get_player("white" if piece.color == "black" else "black")
+
+        if undo.promoted is not None:
+            player.pieces[undo.promoted_index] = piece
+        if undo.ghost is not None:
+            player.pieces.pop()
+            self.del_piece(undo.ghost)
+        if undo.rook is not None:
+            self.del_piece(undo.rook)
+            undo.rook.coords = undo.rook_coords
+            undo.rook.has_moved = undo.rook_had_moved
+            self.set_piece(undo.rook)
+
+        self.del_piece(piece)
+        piece.coords = undo.init_coords
+        piece.has_moved = undo.had_moved
+        self.set_piece(piece)
+
+        if undo.captured is not None:
+            other_player.pieces.insert(undo.captured_index, undo.captured)
+            player.captured_pieces.pop()
+            self.set_piece(undo.captured)
+        for i, ghost in undo.expired_ghosts:
+            other_player.pieces.insert(i, ghost)
+            if self.get_piece(ghost.coords) is None:
+                self.set_piece(ghost)
+
     def get_moves(self, loc):
         piece = self.get_piece(loc)
         if piece is None:
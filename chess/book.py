@@ -0,0 +1,156 @@
+"""Opening book stored as a sorted binary file, looked up through `mmap`.
+
+The file is a flat array of 12-byte little-endian records (Zobrist key, encoded move,
+weight), sorted by key then move. Lookups binary search the memory-mapped file, so
+opening a book costs nothing and processes share its pages through the OS cache.
+
+Usage: ``python -m chess.book games.pgn book.bin [--max_ply=16] [--min_count=2]``
+"""
+import mmap
+import os
+import struct
+from collections import Counter
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from .bitboard import Position
+
+RECORD = struct.Struct("<QHH")
+RECORD_DTYPE = np.dtype([("key", "<u8"), ("move", "<u2"), ("weight", "<u2")])
+KEY = struct.Struct("<Q")
+MAX_WEIGHT = 2**16 - 1
+
+
+def build_book(
+    sources: Iterable, path: str, max_ply: int = 16, min_count: int = 1
+) -> int:
+    """Write the book of the moves played in the first `max_ply` plies of `sources`.
+
+    `sources` are games or move sequences (see `chess.encode.iter_positions`). The
+    weight of a move is the number of times it was played from a position, and moves
+    played less than `min_count` times are left out. Return the number of records.
+    """
+    # imported here as `chess.players`, which `chess.game` depends on, uses books
+    from .encode import iter_positions
+
+    counts = Counter()
+    for source in sources:
+        for ply, (position, move) in enumerate(iter_positions(source)):
+            if ply >= max_ply:
+                break
+            counts[(position.key, move)] += 1
+
+    records = np.array(
+        [
+            (key, move, min(count, MAX_WEIGHT))
+            for (key, move), count in counts.items()
+            if count >= min_count
+        ],
+        dtype=RECORD_DTYPE,
+    )
+    records.sort(order=["key", "move"])
+    with open(path, "wb") as f:
+        f.write(records.tobytes())
+    return len(records)
+
+
+class OpeningBook:
+    """Read-only opening book, memory-mapped from `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        size = os.path.getsize(path)
+        if size % RECORD.size:
+            raise ValueError(f'"{path}" is not an opening book')
+        self.n_records = size // RECORD.size
+        self._file = open(path, "rb")
+        # empty files cannot be memory-mapped
+        self._mmap = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+
+    def __len__(self) -> int:
+        return self.n_records
+
+    def __getstate__(self):
+        # memory maps cannot be pickled: the book is mapped again when unpickled
+        return self.path
+
+    def __setstate__(self, path):
+        self.__init__(path)
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def entries(self, key: int) -> List[Tuple[int, int]]:
+        """Return the (move, weight) records of the position of Zobrist `key`."""
+        data = self._mmap
+        (lo, hi) = (0, self.n_records)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if KEY.unpack_from(data, mid * RECORD.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        entries = []
+        for i in range(lo, self.n_records):
+            (record_key, move, weight) = RECORD.unpack_from(data, i * RECORD.size)
+            if record_key != key:
+                break
+            entries.append((move, weight))
+        return entries
+
+    def choose(self, position: Position, best: bool = False):
+        """Pick a book move of `position` at random, proportionally to its weight.
+
+        With `best`, the heaviest move is picked. Return None if the position is out
+        of the book (moves that are not legal, in case of key collision, are ignored).
+        """
+        entries = self.entries(position.key)
+        if not entries:
+            return None
+        legal_moves = position.legal_moves()
+        entries = [(move, weight) for move, weight in entries if move in legal_moves]
+        if not entries:
+            return None
+        if best:
+            return max(entries, key=lambda entry: entry[1])[0]
+        weights = np.array([weight for _, weight in entries], dtype=float)
+        idx = np.random.choice(len(entries), p=weights / weights.sum())
+        return entries[idx][0]
+
+
+def main(pgn: str, output: str, max_ply: int = 16, min_count: int = 1):
+    """Build an opening book from the games of a PGN file.
+
+    Parameters
+    -----------
+    pgn : str
+        Path of the PGN file.
+    output : str
+        Path of the book file to write.
+    max_ply : int
+        Number of half-moves of each game added to the book.
+    min_count : int
+        Minimum number of times a move must be played to enter the book.
+
+    """
+    from .pgn import read_games
+
+    n_records = build_book(read_games(pgn), output, max_ply, min_count)
+    print(f"{n_records} moves written to {output}")
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)
@@ -1,12 +1,13 @@
 """Coordinates class and functions."""
 from __future__ import annotations
 
-import numpy as np
-
 from .constants import COL_NAMES, ROW_NAMES
 
 
 class Coords:
+
+    __slots__ = ("coords",)
+
     def __init__(self, coords: tuple):
         self.coords = coords
 
@@ -51,8 +52,8 @@ def loc_to_coords(loc: str) -> tuple:
         raise ValueError(f"`row` must be in {ROW_NAMES}")
     if col not in COL_NAMES:
         raise ValueError(f"`col` must be in {COL_NAMES}")
-    x = int(np.where(np.array(COL_NAMES) == col)[0]) + 1
-    y = int(np.where(np.array(ROW_NAMES)[::-1] == row)[0]) + 1
+    x = COL_NAMES.index(col) + 1
+    y = ROW_NAMES[::-1].index(row) + 1
     return (x, y)
 
 
@@ -0,0 +1,137 @@
+"""Batched tensor encoding of positions.
+
+Each position is encoded as twelve 8x8 planes, one per (color, piece type) pair in the
+order of the bitboards (white P, N, B, R, Q, K, then black ones). Planes are laid out
+like `Board.chessboard`: row 0 is the 8th rank and column 0 the "a" file. Side to move,
+castling rights and en passant file come as separate feature vectors.
+"""
+from typing import Iterable, Iterator, List, NamedTuple, Union
+
+import numpy as np
+
+from .bitboard import Position
+from .game import Game
+from .pgn import PgnGame
+
+DTYPES = [np.uint8, np.float32]
+
+
+class PositionBatch(NamedTuple):
+    planes: np.ndarray  # (N, 12, 8, 8)
+    side_to_move: np.ndarray  # (N,), 0 for white and 1 for black
+    castling: np.ndarray  # (N, 4), rights in "KQkq" order
+    en_passant: np.ndarray  # (N, 8), one-hot file of the en passant square
+    moves: np.ndarray  # (N,) uint16, encoded move played from the position, if any
+
+    @property
+    def size(self) -> int:
+        return len(self.planes)
+
+    def select(self, index) -> "PositionBatch":
+        """Index or slice all the arrays of the batch."""
+        return PositionBatch(*(array[index] for array in self))
+
+
+def allocate(n: int, dtype=np.uint8) -> PositionBatch:
+    """Allocate an output buffer for `n` positions."""
+    if np.dtype(dtype) not in DTYPES:
+        raise ValueError(f"`dtype` must be in {DTYPES}")
+    return PositionBatch(
+        planes=np.zeros((n, 12, 8, 8), dtype=dtype),
+        side_to_move=np.zeros(n, dtype=dtype),
+        castling=np.zeros((n, 4), dtype=dtype),
+        en_passant=np.zeros((n, 8), dtype=dtype),
+        moves=np.zeros(n, dtype=np.uint16),
+    )
+
+
+class _Staging:
+    """Raw position fields, gathered before being expanded in a single pass."""
+
+    def __init__(self, n: int):
+        self.bitboards = np.zeros((n, 12), dtype=np.uint64)
+        self.side_to_move = np.zeros(n, dtype=np.uint8)
+        self.castling = np.zeros(n, dtype=np.uint8)
+        self.ep_file = np.zeros(n, dtype=np.int8)
+        self.moves = np.zeros(n, dtype=np.uint16)
+
+    def set(self, i: int, position: Position, move: int = None):
+        self.bitboards[i] = position.bitboards
+        self.side_to_move[i] = position.side_to_move
+        self.castling[i] = position.castling
+        self.ep_file[i] = -1 if position.ep_square is None else position.ep_square % 8
+        self.moves[i] = 0 if move is None else move
+
+    def expand(self, n: int, out: PositionBatch) -> PositionBatch:
+        """Write the first `n` staged positions into `out`."""
+        # one byte per rank (a1-h1 first), one bit per file (little-endian)
+        ranks = self.bitboards[:n].astype("<u8").view(np.uint8).reshape(n, 12, 8)
+        bits = np.unpackbits(ranks, axis=-1, bitorder="little").reshape(n, 12, 8, 8)
+        out.planes[:n] = bits[:, :, ::-1, :]
+        out.side_to_move[:n] = self.side_to_move[:n]
+        out.castling[:n] = (self.castling[:n, None] >> np.arange(4)) & 1
+        out.en_passant[:n] = self.ep_file[:n, None] == np.arange(8)
+        out.moves[:n] = self.moves[:n]
+        return out.select(slice(n))
+
+
+def encode_positions(
+    positions: List[Position], out: PositionBatch = None, dtype=np.uint8
+) -> PositionBatch:
+    """Encode `positions`, into the preallocated `out` buffer if given."""
+    n = len(positions)
+    if out is None:
+        out = allocate(n, dtype=dtype)
+    elif out.size < n:
+        raise ValueError(f"`out` can only hold {out.size} positions, not {n}")
+    staging = _Staging(n)
+    for i, position in enumerate(positions):
+        staging.set(i, position)
+    return staging.expand(n, out)
+
+
+def iter_positions(source) -> Iterator[tuple]:
+    """Yield the (position, move) pairs of a game or a sequence of moves.
+
+    `source` is either a `Game`, a `PgnGame` or a sequence of moves played from the
+    initial position, either encoded or in UCI notation. The final position is not
+    yielded. The same `Position` object is updated in place and yielded at each move.
+    """
+    if isinstance(source, Game):
+        (position, moves) = (source.start_position.copy(), source.moves)
+    elif isinstance(source, PgnGame):
+        (position, moves) = (source.start_position(), source.moves)
+    else:
+        (position, moves) = (Position.initial(), source)
+    for move in moves:
+        if isinstance(move, str):
+            move = position.parse_uci(move)
+        yield (position, move)
+        position.make_move(move)
+
+
+def stream_batches(
+    sources: Iterable[Union[Game, PgnGame, List[Union[int, str]]]],
+    chunk_size: int = 4096,
+    dtype=np.uint8,
+    out: PositionBatch = None,
+) -> Iterator[PositionBatch]:
+    """Encode the positions of `sources` (see `iter_positions`) in chunks.
+
+    Chunks are views of a single buffer (`out`, or one allocated once), overwritten
+    at each iteration: copy them if they have to outlive the iteration.
+    """
+    if out is None:
+        out = allocate(chunk_size, dtype=dtype)
+    chunk_size = min(chunk_size, out.size)
+    staging = _Staging(chunk_size)
+    i = 0
+    for source in sources:
+        for (position, move) in iter_positions(source):
+            staging.set(i, position, move)
+            i += 1
+            if i == chunk_size:
+                yield staging.expand(i, out)
+                i = 0
+    if i:
+        yield staging.expand(i, out)
@@ -34,3 +34,42 @@ def shuffle_pieces(pieces):
         piece.coords = idx_list[i]
 
     return pieces
+
+
+def pieces_from_position(position, color: str):
+    """Create the pieces of `color` standing on a bitboard `position`.
+
+    Kings and Rooks are marked as moved unless castling rights say otherwise, and
+    Pawns unless they stand on their initial row. A Ghost marks the en passant
+    square, if any.
+    """
+    from .bitboard import PIECE_SYMBOLS, color_index, square_to_coords
+    from .pieces import PROMOTION_PIECES, Ghost, King, Pawn
+
+    classes = {"P": Pawn, "K": King, **PROMOTION_PIECES}
+    index = color_index(color)
+    (first_row, second_row) = (1, 2) if color == "white" else (8, 7)
+    # home columns of the Rooks still allowed to castle (king side first)
+    castling = position.castling >> (2 * index)
+    rook_cols = [col for col, right in ((8, 1), (1, 2)) if castling & right]
+
+    pieces = []
+    for square, piece in enumerate(position.squares):
+        if piece is None or piece // 6 != index:
+            continue
+        coords = square_to_coords(square)
+        symbol = PIECE_SYMBOLS[piece % 6]
+        if symbol == "P":
+            has_moved = coords[1] != second_row
+        elif symbol == "K":
+            has_moved = len(rook_cols) == 0
+        elif symbol == "R":
+            has_moved = coords[1] != first_row or coords[0] not in rook_cols
+        else:
+            has_moved = False
+        pieces.append(classes[symbol](coords, color, has_moved=has_moved))
+
+    # the en passant square lies behind the Pawn of the player who just moved
+    if position.ep_square is not None and position.side_to_move != index:
+        pieces.append(Ghost(square_to_coords(position.ep_square), color))
+    return pieces
@@ -0,0 +1,113 @@
+"""Structured events emitted as games are played.
+
+Events are plain tuples, only formatted (with `str`) by the subscribers that need a
+message. Games do not even build them when nobody is subscribed.
+"""
+from collections import deque
+from typing import Callable, Iterator, NamedTuple, Optional, Tuple
+
+
+def _player(color: str) -> str:
+    return f'Player("{color}")'
+
+
+class MovePlayed(NamedTuple):
+    move_number: int
+    color: str
+    piece: str  # symbol of the moved piece
+    from_loc: str
+    to_loc: str
+    move: int  # encoded move, see `chess.bitboard`
+
+    def __str__(self):
+        return (
+            f"[{self.move_number}] {_player(self.color)} moves {self.piece} "
+            f"from {self.from_loc} to {self.to_loc}"
+        )
+
+
+class Capture(NamedTuple):
+    color: str  # color of the capturing side
+    captured: str  # symbol of the captured piece
+    loc: str
+
+    def __str__(self):
+        other = "black" if self.color == "white" else "white"
+        return f"{_player(self.color)} captured {_player(other)} {self.captured}"
+
+
+class Promotion(NamedTuple):
+    color: str
+    piece: str  # symbol of the promoted piece
+    loc: str
+
+    def __str__(self):
+        return f"* Pawn promoted to {self.piece}"
+
+
+class Check(NamedTuple):
+    color: str  # color of the side in check
+    attackers: tuple  # pieces giving check
+
+    def __str__(self):
+        return f"{_player(self.color)} is in check by {list(self.attackers)}"
+
+
+class TurnSwitched(NamedTuple):
+    color: str  # color of the side to move
+
+    def __str__(self):
+        return f"Switch to {self.color}"
+
+
+class GameOver(NamedTuple):
+    winner: Optional[str]
+    draw: bool
+
+    def __str__(self):
+        return "Draw" if self.draw else f"{self.winner} player won the game!"
+
+
+class EventQueue:
+    """Subscriber keeping the events it receives until they are iterated over."""
+
+    def __init__(self, maxlen: int = None):
+        self.events = deque(maxlen=maxlen)
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def __iter__(self) -> Iterator:
+        while self.events:
+            yield self.events.popleft()
+
+
+class EventEmitter:
+    """Dispatch events to subscribed callbacks.
+
+    An emitter is falsy when nobody is subscribed, so that emitters can skip the
+    creation of events altogether.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+
+    def __bool__(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, callback: Callable, event_types: Tuple[type, ...] = None):
+        """Call `callback` with each event (of `event_types` only, if given)."""
+        self._subscribers.append((callback, event_types))
+        return callback
+
+    def unsubscribe(self, callback: Callable):
+        self._subscribers = [s for s in self._subscribers if s[0] is not callback]
+
+    def record(self, event_types: Tuple[type, ...] = None, maxlen: int = None):
+        """Subscribe and return a new `EventQueue`."""
+        return self.subscribe(EventQueue(maxlen), event_types)
+
+    def emit(self, event):
+        for callback, event_types in list(self._subscribers):
+            if event_types is None or isinstance(event, event_types):
+                callback(event)
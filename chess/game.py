@@ -1,16 +1,47 @@
 """Game class."""
-import numpy as np
+from typing import List
 
+from .bitboard import PIECE_SYMBOLS, Position, coords_to_square, move_promotion
 from .board import Board
 from .coords import coords_to_loc
-from .engine import init_pieces
+from .engine import init_pieces, pieces_from_position
+from .events import (
+    Capture,
+    Check,
+    EventEmitter,
+    GameOver,
+    MovePlayed,
+    Promotion,
+    TurnSwitched,
+)
 from .moves import Move, Castling, is_in_check
-from .pieces import Bishop, Ghost, Knight, Pawn, Queen, Rook
+from .pieces import Pawn
 from .players import Player
 
+BACKENDS = ["object", "bitboard"]
+
+
+def _history_move(symbol, init_coords, new_coords, promoted, captured, castling):
+    if promoted:
+        # = promotion
+        return f"{coords_to_loc(new_coords)}+{symbol}"
+    if captured:
+        if symbol == Pawn.SYMBOL:
+            return f"{coords_to_loc(init_coords)}x{coords_to_loc(new_coords)}"
+        return f"{symbol}x{coords_to_loc(new_coords)}"
+    if castling is not None:
+        return castling
+    if symbol == Pawn.SYMBOL:
+        return coords_to_loc(new_coords)
+    return f"{symbol}{coords_to_loc(new_coords)}"
+
 
 class Game:
-    def __init__(self, player1: Player, player2: Player):
+    def __init__(self, player1: Player, player2: Player, backend: str = "object"):
+        if backend not in BACKENDS:
+            raise ValueError(f"`backend` must be in {BACKENDS}")
+        self.backend = backend
+
         self.player1 = player1
         self.player2 = player2
 
@@ -20,15 +51,57 @@ class Game:
         self.is_finished = False
         self.winner = None
         self.draw = False
+        # subscribers of the events of the game, see `chess.events`
+        self.events = EventEmitter()
+        # endgame tablebase adjudicating the game once its position is covered
+        self.tablebase = None
 
         self.automatic_promotion = True
         self.default_promotion = "Q"
 
+        # board and its bitboard mirror, both updated in place after each move
+        self._board = Board([self.player1, self.player2])
+        self.position = Position.from_board(self._board, turn=self.turn)
+        self.start_position = self.position.copy()
+        self._undo_stack = []
+
     @classmethod
-    def create(cls):
+    def create(cls, backend: str = "object"):
         player1 = Player("white")
         player2 = Player("black")
-        return cls(player1, player2)
+        return cls(player1, player2, backend=backend)
+
+    @classmethod
+    def from_position(cls, position: Position, backend: str = "object"):
+        """Create a game starting from a bitboard `position`."""
+        players = [
+            Player(color, pieces=pieces_from_position(position, color))
+            for color in ("white", "black")
+        ]
+        game = cls(*players, backend=backend)
+        game.turn = position.turn
+        game.move_number = position.fullmove_number
+        game.current_player.in_check = position.is_check()
+        game.position = position.copy()
+        game.start_position = position.copy()
+        return game
+
+    @classmethod
+    def from_fen(cls, fen: str, backend: str = "object"):
+        """Create a game starting from a Forsyth-Edwards Notation string."""
+        return cls.from_position(Position.from_fen(fen), backend=backend)
+
+    @classmethod
+    def unpack(cls, data: bytes, backend: str = "object"):
+        """Create a game starting from a snapshot created by `pack`."""
+        return cls.from_position(Position.unpack(data), backend=backend)
+
+    def to_fen(self) -> str:
+        return self.position.to_fen()
+
+    def pack(self) -> bytes:
+        """Return a fixed-size binary snapshot of the current position."""
+        return self.position.pack()
 
     def reset(self):
         # reset pieces
@@ -39,162 +112,194 @@ class Game:
         self.player1.captured_pieces = []
         self.player2.captured_pieces = []
 
-        # reset history and set turn to "white"
+        self.player1.in_check = False
+        self.player2.in_check = False
+
+        # reset history, outcome and set turn to "white"
         self.history = []
+        self.move_number = 1
         self.turn = "white"
+        self.is_finished = False
+        self.winner = None
+        self.draw = False
 
-    def switch_turn(self):
+        self._board = Board([self.player1, self.player2])
+        self.position = Position.from_board(self._board, turn=self.turn)
+        self.start_position = self.position.copy()
+        self._undo_stack = []
+
+    def switch_turn(self, verbose: bool = True):
         self.turn = "black" if self.turn == "white" else "white"
         if self.turn == "white":
             self.move_number += 1
-        print(f"Switch to {self.turn}")
+        if verbose or self.events:
+            self._emit(TurnSwitched(self.turn), verbose)
+
+    def _emit(self, event, verbose: bool):
+        if verbose:
+            print(event)
+        self.events.emit(event)
 
     def next_move(self, move: Move = None, verbose: bool = True):
-        # remove current player's ghosts
-        for piece in self.current_player.pieces:
-            if isinstance(piece, Ghost):
-                self.current_player.pieces.remove(piece)
+        board = self._board
 
         # get move
         if move is None:
-            move = self.current_player.get_move(self.board)
+            if self.backend == "bitboard" or self.current_player.strategy != "random":
+                move = self.current_player.get_move(self.position)
+            else:
+                move = self.current_player.get_move(board)
         if move is None:
             if self.current_player.in_check:
                 self.winner = (
                     "white" if self.current_player.color == "black" else "black"
                 )
-                print(f"{self.winner} player won the game!")
             else:
                 self.draw = True
-                print("Draw")
             self.is_finished = True
+            if verbose or self.events:
+                self._emit(GameOver(self.winner, self.draw), verbose)
             return
 
+        # bitboard moves are encoded as integers
+        promotion = None
+        if isinstance(move, int):
+            promotion = move_promotion(move)
+            if promotion is not None:
+                promotion = PIECE_SYMBOLS[promotion]
+            move = self.to_object_move(move)
+
         (piece, move) = move
         init_coords = piece.coords
         new_coords = move.get_new_coords(piece.coords)
 
-        # check if adversary piece is captured
-        captured_piece = False
-        target_cell = self.board.get_piece(new_coords)
-        if target_cell is not None and (target_cell.color != self.current_player.color):
-            # take adversary piece
-            captured_piece = True
-            if isinstance(target_cell, Ghost):
-                self.other_player.pieces.remove(target_cell)
-                target_cell = self.board.get_piece((piece.x + move.x, piece.y))
-            self.current_player.captured_pieces.append(target_cell)
-            self.other_player.pieces.remove(target_cell)
-            if verbose:
-                print(
-                    f"{self.current_player} captured "
-                    f"{self.other_player} {target_cell.SYMBOL}"
-                )
-
-        # move piece
-        self.current_player.move(piece, move)
-        # move Rook if move is Castling
-        if isinstance(move, Castling):
-            # move pieces
-            castling_rook = self.board.get_piece(
-                (move.rook_col, 1 if piece.color == "white" else 8)
-            )
-            self.current_player.move(castling_rook, move.rook_move)
-
-        # mark intermediary cell as "Ghost" if Pawn is moving two cells
-        if isinstance(piece, Pawn) and np.abs(move.y) == 2:
-            ghost = Ghost(
-                (piece.x, piece.y - np.sign(move.y)), color=self.current_player.color
-            )
-            self.current_player.pieces.append(ghost)
+        # choose piece to change Pawn to if it reaches the last row
+        promoted_piece = isinstance(piece, Pawn) and new_coords[1] == (
+            8 if self.current_player.color == "white" else 1
+        )
+        if promoted_piece and promotion is None:
+            if self.automatic_promotion:
+                promotion = self.default_promotion
+            else:
+                promotion = input('Change to: "Q", "R", "B", "N".')
 
-        if verbose:
-            print(
-                f"[{self.move_number}] {self.current_player} moves "
-                f"{piece.SYMBOL} from {coords_to_loc(init_coords)} "
-                f"to {coords_to_loc(new_coords)}"
+        # play move on the board and on its bitboard mirror
+        position_move = self.position.encode(
+            coords_to_square(init_coords), coords_to_square(new_coords), promotion
+        )
+        in_check_flags = (self.white_player.in_check, self.black_player.in_check)
+        undo = board.make_move(piece, move, promotion=promotion)
+        position_undo = self.position.make_move(position_move)
+        self._undo_stack.append((undo, position_undo, in_check_flags))
+
+        captured_piece = undo.captured is not None
+        # events are only created for subscribers (or printed if `verbose`)
+        notify = verbose or bool(self.events)
+        color = self.current_player.color
+        if captured_piece and notify:
+            loc = coords_to_loc(undo.captured.coords)
+            self._emit(Capture(color, undo.captured.SYMBOL, loc), verbose)
+
+        if notify:
+            (from_loc, to_loc) = (coords_to_loc(init_coords), coords_to_loc(new_coords))
+            event = MovePlayed(
+                self.move_number, color, piece.SYMBOL, from_loc, to_loc, position_move
             )
+            self._emit(event, verbose)
 
-        # check if piece is pawn and can be changed to another piece
-        promoted_piece = False
-        if isinstance(piece, Pawn):
-            # change Pawn to chosen piece
-            if (self.current_player.color == "white" and piece.y == 8) or (
-                self.current_player.color == "black" and piece.y == 1
-            ):
-                promoted_piece = True
-                if self.automatic_promotion:
-                    promotion = self.default_promotion
-                else:
-                    promotion = input('Change to: "Q", "R", "B", "N".')
-                if promotion == "Q":
-                    piece = Queen(
-                        piece.coords, color=self.current_player.color, has_moved=True
-                    )
-                elif promotion == "R":
-                    piece = Rook(
-                        piece.coords, color=self.current_player.color, has_moved=True
-                    )
-                elif promotion == "B":
-                    piece = Bishop(
-                        piece.coords, color=self.current_player.color, has_moved=True
-                    )
-                elif promotion == "N":
-                    piece = Knight(
-                        piece.coords, color=self.current_player.color, has_moved=True
-                    )
-                i = self.current_player.get_piece(piece.coords)[0]
-                self.current_player.pieces[i] = piece
-                if verbose:
-                    print(f"* Pawn promoted to {piece.SYMBOL}")
+        if promoted_piece:
+            piece = undo.promoted
+            if notify:
+                loc = coords_to_loc(new_coords)
+                self._emit(Promotion(color, piece.SYMBOL, loc), verbose)
 
         # check if move lead to an "in check" position against the other player
         in_check, in_check_pieces = is_in_check(
-            self.other_player, self.current_player, self.board
+            self.other_player, self.current_player, board
         )
         if in_check:
             self.other_player.in_check = True
-            if verbose:
-                print(f"{self.other_player} is in check by {in_check_pieces}")
+            if notify:
+                event = Check(self.other_player.color, tuple(in_check_pieces))
+                self._emit(event, verbose)
         else:
             self.other_player.in_check = False
 
-        # update history
-        movestr = ""
-        if promoted_piece:
-            # = promotion
-            movestr = f"{coords_to_loc(piece.coords)}+{piece.SYMBOL}"
-        elif captured_piece:
-            if isinstance(piece, Pawn):
-                movestr += (
-                    f"{coords_to_loc(init_coords)}x" f"{coords_to_loc(piece.coords)}"
-                )
-            else:
-                movestr += f"{piece.SYMBOL}x{coords_to_loc(piece.coords)}"
-        elif isinstance(move, Castling):
-            movestr = move.symbol
-        else:
-            if isinstance(piece, Pawn):
-                movestr += f"{coords_to_loc(piece.coords)}"
-            else:
-                movestr += f"{piece.SYMBOL}{coords_to_loc(piece.coords)}"
-        # Rook
-        self.history.append((self.move_number, self.turn, movestr))
+        # history entries are only formatted into strings by `get_history`
+        castling = move.symbol if isinstance(move, Castling) else None
+        entry = (piece.SYMBOL, init_coords, new_coords)
+        entry += (promoted_piece, captured_piece, castling)
+        self.history.append((self.move_number, self.turn, entry))
 
         # switch turn
-        self.switch_turn()
+        self.switch_turn(verbose=verbose)
+
+        if self.tablebase is not None:
+            self.adjudicate(verbose=verbose)
 
         return captured_piece
 
+    def adjudicate(self, verbose: bool = True) -> bool:
+        """End the game with its tablebase result, if the position is covered."""
+        value = self.tablebase.probe(self.position)
+        if value is None:
+            return False
+        if value == 0:
+            self.draw = True
+        else:
+            self.winner = self.turn if value > 0 else self.other_player.color
+        self.is_finished = True
+        if verbose or self.events:
+            self._emit(GameOver(self.winner, self.draw), verbose)
+        return True
+
+    def takeback(self):
+        """Take back the last move played."""
+        if len(self._undo_stack) == 0:
+            raise ValueError("No move to take back")
+        (undo, position_undo, in_check_flags) = self._undo_stack.pop()
+        self._board.unmake_move(undo)
+        self.position.unmake_move(position_undo)
+        (self.white_player.in_check, self.black_player.in_check) = in_check_flags
+        self.history.pop()
+
+        # revert turn (and move number) switch
+        if self.turn == "white":
+            self.move_number -= 1
+        self.turn = "black" if self.turn == "white" else "white"
+
+        self.is_finished = False
+        self.winner = None
+        self.draw = False
+
     @property
     def board(self):
-        return Board([self.player1, self.player2])
+        return self._board
+
+    @property
+    def moves(self) -> List[int]:
+        """Encoded bitboard moves played since `start_position`."""
+        return [position_undo.move for (_, position_undo, _) in self._undo_stack]
+
+    @property
+    def position_key(self) -> int:
+        """64-bit Zobrist key of the current position."""
+        return self.position.key
+
+    def snapshot(self) -> Board:
+        """Return an independent copy of the current board."""
+        return self._board.snapshot()
+
+    def to_object_move(self, move: int):
+        """Convert an encoded bitboard move to a (piece, move) pair."""
+        return self.position.to_object_move(move, self._board)
 
     def get_history(self, delimiter: str = "\n"):
         prev_move_number = 1
         msgs = []
         msg = ""
-        for (move_number, turn, move) in self.history:
+        for (move_number, turn, entry) in self.history:
+            move = _history_move(*entry)
             if move_number != prev_move_number:
                 msgs.append(msg)
                 msg = ""
@@ -0,0 +1,223 @@
+"""Append-only binary game log, with random access to any position.
+
+A log is made of two files. The data file starts with a `HEADER` and holds the games
+one after the other: the packed start position (see `Position.pack`), then the 16-bit
+encoded moves, with a packed snapshot of the position after every `interval` moves.
+The index file (``<path>.idx``) holds a fixed-size `INDEX_DTYPE` record per finished
+game, with the offset of the game in the data file.
+
+Both files are memory-mapped by `GameLog`, which reaches any ply of any game by
+replaying less than `interval` moves from the nearest snapshot.
+"""
+import mmap
+import os
+import struct
+from typing import List, Optional
+
+import numpy as np
+
+from .bitboard import PACKED_SIZE, Position
+
+MAGIC = b"CHESSLOG"
+VERSION = 1
+# magic, version, snapshot interval
+HEADER = struct.Struct("<8sHH4x")
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("plies", "<u4"), ("outcome", "u1")])
+OUTCOMES = ["white", "black", "draw", "unfinished"]
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+def _read_header(data: bytes, path: str) -> int:
+    """Return the snapshot interval of the log, checking its header."""
+    if len(data) < HEADER.size:
+        raise ValueError(f'"{path}" is not a game log')
+    (magic, version, interval) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or interval < 1:
+        raise ValueError(f'"{path}" is not a game log')
+    return interval
+
+
+class GameLogWriter:
+    """Append games to a log, move by move or at once.
+
+    The index record of a game is only written when the game ends, after its data:
+    readers never see unfinished games.
+    """
+
+    def __init__(self, path: str, interval: int = 32, buffer_size: int = 2**16):
+        if not 1 <= interval < 2**16:
+            raise ValueError("`interval` must be between 1 and 65535")
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                interval = _read_header(f.read(HEADER.size), path)
+            self.file = open(path, "ab", buffering=buffer_size)
+        else:
+            self.file = open(path, "wb", buffering=buffer_size)
+            self.file.write(HEADER.pack(MAGIC, VERSION, interval))
+            self.file.flush()
+        self.index = open(index_path(path), "ab")
+        self.interval = interval
+        self.n_games = os.path.getsize(index_path(path)) // INDEX_DTYPE.itemsize
+        self.position: Optional[Position] = None
+        self.offset = None
+        self.plies = 0
+
+    def begin(self, start_position: Position = None):
+        """Start a new game, from the initial position by default."""
+        if self.position is not None:
+            raise ValueError("A game is in progress")
+        self.position = (
+            Position.initial() if start_position is None else start_position.copy()
+        )
+        self.offset = self.file.tell()
+        self.plies = 0
+        self.file.write(self.position.pack())
+
+    def append(self, move: int):
+        """Append a move to the game in progress."""
+        self.position.make_move(move)
+        self.file.write(move.to_bytes(2, "little"))
+        self.plies += 1
+        if self.plies % self.interval == 0:
+            self.file.write(self.position.pack())
+
+    def end(self, outcome: str = "unfinished") -> int:
+        """End the game in progress and return its number."""
+        if self.position is None:
+            raise ValueError("No game in progress")
+        self.file.flush()
+        record = np.array(
+            [(self.offset, self.plies, OUTCOMES.index(outcome))], dtype=INDEX_DTYPE
+        )
+        self.index.write(record.tobytes())
+        self.index.flush()
+        self.position = None
+        self.n_games += 1
+        return self.n_games - 1
+
+    def write(
+        self,
+        moves: List[int],
+        outcome: str = "unfinished",
+        start_position: Position = None,
+    ) -> int:
+        self.begin(start_position)
+        for move in moves:
+            self.append(move)
+        return self.end(outcome)
+
+    def write_game(self, game) -> int:
+        if game.winner is not None:
+            outcome = game.winner
+        else:
+            outcome = "draw" if game.draw else "unfinished"
+        return self.write(game.moves, outcome, game.start_position)
+
+    def close(self):
+        self.file.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _map(path: str):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class GameLog:
+    """Read-only, memory-mapped view of the games logged when it is opened."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = _map(path)
+        self.interval = _read_header(self.data, path)
+        self._index_map = _map(index_path(path))
+        self.index = np.frombuffer(
+            self._index_map,
+            dtype=INDEX_DTYPE,
+            count=len(self._index_map) // INDEX_DTYPE.itemsize,
+        )
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def close(self):
+        # views of the maps must be released before closing them
+        self.index = None
+        for mapped in (self.data, self._index_map):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _game(self, game: int):
+        if not -len(self) <= game < len(self):
+            raise IndexError(f"Game {game} out of range ({len(self)} games)")
+        record = self.index[game]
+        return (int(record["offset"]), int(record["plies"]))
+
+    def _block_offset(self, offset: int, block: int) -> int:
+        """Offset of the snapshot starting the `block`-th block of moves."""
+        return offset + block * (PACKED_SIZE + 2 * self.interval)
+
+    def plies(self, game: int) -> int:
+        return self._game(game)[1]
+
+    def outcome(self, game: int) -> str:
+        self._game(game)
+        return OUTCOMES[self.index[game]["outcome"]]
+
+    def moves(self, game: int) -> np.ndarray:
+        """Return the encoded moves of `game`."""
+        (offset, plies) = self._game(game)
+        (n_blocks, rest) = divmod(plies, self.interval)
+        block_size = PACKED_SIZE + 2 * self.interval
+        data = np.frombuffer(
+            self.data,
+            dtype=np.uint8,
+            count=n_blocks * block_size + PACKED_SIZE + 2 * rest,
+            offset=offset,
+        )
+        blocks = data[: n_blocks * block_size].reshape(n_blocks, block_size)
+        moves = np.concatenate(
+            [
+                blocks[:, PACKED_SIZE:].reshape(-1),
+                data[n_blocks * block_size + PACKED_SIZE :],
+            ]
+        )
+        return moves.view("<u2").astype(np.uint16)
+
+    def position(self, game: int, ply: int = None) -> Position:
+        """Return the position of `game` after `ply` moves (after the last one by
+        default), replayed from the nearest snapshot."""
+        (offset, plies) = self._game(game)
+        if ply is None:
+            ply = plies
+        if not 0 <= ply <= plies:
+            raise IndexError(f"Ply {ply} out of range ({plies} plies)")
+        (block, rest) = divmod(ply, self.interval)
+        start = self._block_offset(offset, block)
+        position = Position.unpack(bytes(self.data[start : start + PACKED_SIZE]))
+        start += PACKED_SIZE
+        moves = np.frombuffer(self.data, dtype="<u2", count=rest, offset=start)
+        for move in moves.tolist():
+            position.make_move(move)
+        return position
+
+    def start_position(self, game: int) -> Position:
+        return self.position(game, 0)
@@ -0,0 +1,258 @@
+"""Monte Carlo tree search with random playouts.
+
+The tree is grown with UCT selection (upper confidence bounds applied to trees) and
+its leaves are scored by random playouts, run in batches, optionally over a pool of
+worker processes. The visits of the leaves of a batch are counted as soon as they are
+selected (a "virtual loss"), so that a batch spreads over different leaves. Playouts
+reaching `max_plies` are adjudicated on material.
+
+The tree is kept from one search to the next: the subtree of the searched position is
+reused when it was reached from the previous root in one or two plies.
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from .bitboard import Position
+from .search import PIECE_VALUES, evaluate, popcount
+
+WIN = 1.0
+DRAW = 0.5
+LOSS = 0.0
+
+
+def playout(position: Position, max_plies: int, rng: random.Random) -> float:
+    """Play random moves from `position` (modified in place) until the game ends or
+    `max_plies` are played, and return the result of the side to move at the start.
+
+    Moves are drawn among the pseudo-legal ones and only checked to be legal once
+    drawn, nothing else than the position is built along the way.
+    """
+    us = position.side_to_move
+    for _ in range(max_plies):
+        if position.halfmove_clock >= 100 or popcount(position.occupied) == 2:
+            return DRAW
+        mover = position.side_to_move
+        moves = position.pseudo_legal_moves()
+        n_moves = len(moves)
+        while n_moves:
+            i = int(rng.random() * n_moves)
+            move = moves[i]
+            n_moves -= 1
+            moves[i] = moves[n_moves]
+            undo = position.make_move(move)
+            if not position.is_square_attacked(position.king_square(mover), mover ^ 1):
+                break
+            position.unmake_move(undo)
+        else:
+            if not position.is_check():
+                return DRAW
+            return LOSS if mover == us else WIN
+    # material balance of at least a pawn wins an unfinished playout
+    score = evaluate(position)
+    if abs(score) < PIECE_VALUES[0]:
+        return DRAW
+    return WIN if (score > 0) == (position.side_to_move == us) else LOSS
+
+
+def run_playouts(positions: List[bytes], max_plies: int, seed: int) -> List[float]:
+    """Return the result of a playout from each of the packed `positions`."""
+    rng = random.Random(seed)
+    return [playout(Position.unpack(data), max_plies, rng) for data in positions]
+
+
+class Node:
+    __slots__ = ("move", "key", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move: int = None, key: int = 0, parent: "Node" = None):
+        self.move = move
+        self.key = key
+        self.parent = parent
+        self.children: List[Node] = []
+        # legal moves without child yet, generated at the first visit
+        self.untried: Optional[List[int]] = None
+        self.visits = 0
+        # results of the playouts for the side who played `move`
+        self.wins = 0.0
+
+    def select_child(self, exploration: float) -> "Node":
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.wins / child.visits
+            + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+
+class RootMove(NamedTuple):
+    move: int
+    visits: int
+    win_rate: float
+
+
+class MCTSResult(NamedTuple):
+    move: Optional[int]
+    win_rate: float
+    playouts: int
+    time: float
+    # statistics of the root moves, most visited first
+    moves: List[RootMove]
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.time if self.time > 0 else 0.0
+
+
+class MCTS:
+    """Monte Carlo tree search within a time and/or playout budget per move.
+
+    Playouts are run in batches of `batch_size` per process, in worker processes when
+    `processes` is greater than 1. Use it as a context manager, or call `close` once
+    done.
+    """
+
+    def __init__(
+        self,
+        time_limit: float = 1.0,
+        max_playouts: int = None,
+        max_plies: int = 60,
+        exploration: float = math.sqrt(2),
+        batch_size: int = 16,
+        processes: int = 1,
+    ):
+        if time_limit is None and max_playouts is None:
+            raise ValueError(
+                "At least one of `time_limit` or `max_playouts` must be set"
+            )
+        self.time_limit = time_limit
+        self.max_playouts = max_playouts
+        self.max_plies = max_plies
+        self.exploration = exploration
+        self.batch_size = batch_size
+        self.processes = processes
+        self.executor = None
+        if processes > 1:
+            self.executor = ProcessPoolExecutor(max_workers=processes)
+        self.root: Optional[Node] = None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _find_root(self, key: int) -> Node:
+        """Return the node of the previous tree reached in at most two plies, or a
+        new one."""
+        if self.root is not None:
+            nodes = [self.root]
+            for _ in range(3):
+                for node in nodes:
+                    if node.key == key:
+                        node.parent = None
+                        return node
+                nodes = [child for node in nodes for child in node.children]
+        return Node(key=key)
+
+    def _select(self, position: Position):
+        """Descend the tree from the root, expanding a leaf, and return the path
+        with the position at its end."""
+        node = self.root
+        path = [node]
+        while True:
+            if node.untried is None:
+                moves = position.legal_moves()
+                node.untried = [moves[i] for i in np.random.permutation(len(moves))]
+            if node.untried:
+                move = node.untried.pop()
+                position.make_move(move)
+                child = Node(move, position.key, node)
+                node.children.append(child)
+                path.append(child)
+                break
+            if not node.children:
+                break
+            node = node.select_child(self.exploration)
+            position.make_move(node.move)
+            path.append(node)
+        for node in path:
+            node.visits += 1
+        return (path, position)
+
+    def _playouts(self, positions: List[Position]) -> List[float]:
+        seeds = np.random.randint(2**31, size=self.processes).tolist()
+        if self.executor is None:
+            rng = random.Random(seeds[0])
+            return [playout(p, self.max_plies, rng) for p in positions]
+        packed = [position.pack() for position in positions]
+        n_tasks = min(self.processes, len(packed))
+        futures = [
+            self.executor.submit(
+                run_playouts, packed[i::n_tasks], self.max_plies, seeds[i]
+            )
+            for i in range(n_tasks)
+        ]
+        results = [None] * len(packed)
+        for i, future in enumerate(futures):
+            results[i::n_tasks] = future.result()
+        return results
+
+    def search(self, position: Position) -> MCTSResult:
+        """Search the best move of `position`, growing the tree of previous searches."""
+        start = time.perf_counter()
+        deadline = None if self.time_limit is None else start + self.time_limit
+        self.root = self._find_root(position.key)
+        playouts = 0
+        while (deadline is None or time.perf_counter() < deadline) and (
+            self.max_playouts is None or playouts < self.max_playouts
+        ):
+            batch_size = self.batch_size * self.processes
+            if self.max_playouts is not None:
+                batch_size = min(batch_size, self.max_playouts - playouts)
+            leaves = [self._select(position.copy()) for _ in range(batch_size)]
+            if not self.root.children:
+                break
+            # leaves without legal move (checked at their first visit) end the game
+            pending = []
+            for path, leaf in leaves:
+                if path[-1].untried == []:
+                    self._backpropagate(path, LOSS if leaf.is_check() else DRAW)
+                else:
+                    pending.append((path, leaf))
+            results = self._playouts([leaf for _, leaf in pending])
+            for (path, _), result in zip(pending, results):
+                self._backpropagate(path, result)
+            playouts += batch_size
+        return self.result(playouts, time.perf_counter() - start)
+
+    @staticmethod
+    def _backpropagate(path: List[Node], result: float):
+        """Add `result`, for the side to move at the end of `path`, to its nodes."""
+        for node in reversed(path):
+            result = 1.0 - result
+            node.wins += result
+
+    def root_moves(self) -> List[RootMove]:
+        """Statistics of the root moves, most visited first."""
+        if self.root is None:
+            return []
+        children = sorted(self.root.children, key=lambda child: -child.visits)
+        return [
+            RootMove(child.move, child.visits, child.wins / child.visits)
+            for child in children
+        ]
+
+    def result(self, playouts: int, elapsed: float) -> MCTSResult:
+        moves = self.root_moves()
+        if not moves:
+            return MCTSResult(None, 0.0, playouts, elapsed, moves)
+        return MCTSResult(moves[0].move, moves[0].win_rate, playouts, elapsed, moves)
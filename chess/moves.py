@@ -1,16 +1,71 @@
 """Move functions."""
-import numpy as np
-
 from .coords import Coords
 
 
+# conditions a move is subject to, as bit flags
+FIRST_MOVE = 1
+EMPTY = 2
+ADVERSARY_OR_EN_PASSANT = 4
+EMPTY_OR_ADVERSARY = 8
+EMPTY_DIAG = 16
+EMPTY_ROW = 32
+CONDITION_FLAGS = {
+    "first_move": FIRST_MOVE,
+    "empty": EMPTY,
+    "adversary OR en_passant": ADVERSARY_OR_EN_PASSANT,
+    "empty OR adversary": EMPTY_OR_ADVERSARY,
+    "empty_diag": EMPTY_DIAG,
+    "empty_row": EMPTY_ROW,
+}
+
+
+def conditions_to_flags(conditions) -> int:
+    if conditions is None:
+        return 0
+    if isinstance(conditions, str):
+        return CONDITION_FLAGS[conditions]
+    flags = 0
+    for condition in conditions:
+        if condition is not None:
+            flags |= CONDITION_FLAGS[condition]
+    return flags
+
+
 class Move(Coords):
+    """Relative move of a piece, subject to conditions.
+
+    Moves are immutable: plain moves with the same coordinates and conditions are
+    interned, i.e. created once and shared.
+    """
+
+    __slots__ = ("flags",)
+    _interned = {}
+
+    def __new__(cls, coords: tuple = None, conditions=None):
+        if cls is not Move:
+            return Coords.__new__(cls)
+        if type(coords) is not tuple:
+            coords = tuple(coords)
+        key = (coords, conditions_to_flags(conditions))
+        move = Move._interned.get(key)
+        if move is None:
+            move = Move._interned[key] = Coords.__new__(cls)
+            Coords.__init__(move, key[0])
+            move.flags = key[1]
+        return move
+
     def __init__(self, coords: tuple, conditions=None):
-        if not isinstance(conditions, list):
-            conditions = [conditions]
-        self.conditions = conditions
+        if type(self) is not Move:
+            Coords.__init__(self, tuple(coords))
+            self.flags = conditions_to_flags(conditions)
+
+    def __getnewargs__(self):
+        return (self.coords, self.conditions)
 
-        Coords.__init__(self, coords)
+    @property
+    def conditions(self) -> list:
+        names = [name for name, flag in CONDITION_FLAGS.items() if self.flags & flag]
+        return names if names else [None]
 
     def __repr__(self):
         (x, y) = self.coords
@@ -23,6 +78,9 @@ class Move(Coords):
 
 
 class Castling(Move):
+
+    __slots__ = ("symbol", "rook_col", "rook_move")
+
     def __init__(self, coords, symbol, rook_col, rook_move):
         Move.__init__(self, coords)
         self.symbol = symbol
@@ -31,6 +89,9 @@ class Castling(Move):
 
 
 class QueenSideCastling(Castling):
+
+    __slots__ = ()
+
     def __init__(self):
         Castling.__init__(
             self, coords=(-2, 0), symbol="0-0-0", rook_col=1, rook_move=Move((+3, 0))
@@ -38,12 +99,49 @@ class QueenSideCastling(Castling):
 
 
 class KingSideCastling(Castling):
+
+    __slots__ = ()
+
     def __init__(self):
         Castling.__init__(
             self, coords=(+2, 0), symbol="0-0", rook_col=8, rook_move=Move((-2, 0))
         )
 
 
+DIAGONALS = [(+1, +1), (+1, -1), (-1, +1), (-1, -1)]
+ROWS = [(0, +1), (0, -1), (+1, 0), (-1, 0)]
+
+
+def moves_by_cell(moves):
+    """Precompute, for every cell of the board, the `moves` staying on the board."""
+    return {
+        (x, y): [
+            move for move in moves if 1 <= x + move.x <= 8 and 1 <= y + move.y <= 8
+        ]
+        for x in range(1, 9)
+        for y in range(1, 9)
+    }
+
+
+def make_ray_moves(direction, conditions):
+    (dx, dy) = direction
+    return [Move((i * dx, i * dy), conditions) for i in range(1, 8)]
+
+
+# sliding moves, shared by all pieces: the ray starting from a given cell is a
+# slice of the seven moves going in its direction, truncated at the board edge
+RAY_MOVES = {
+    **{d: make_ray_moves(d, ["empty OR adversary", "empty_diag"]) for d in DIAGONALS},
+    **{d: make_ray_moves(d, ["empty OR adversary", "empty_row"]) for d in ROWS},
+}
+RAYS = {direction: moves_by_cell(moves) for direction, moves in RAY_MOVES.items()}
+
+
+def is_empty(cell) -> bool:
+    # ghosts (cells skipped by a Pawn moving two cells) do not block moves
+    return cell is None or cell.SYMBOL == " "
+
+
 def is_move_valid(piece, move, board, conditions=None, check_check=True):
     from .pieces import Rook
 
@@ -52,48 +150,45 @@ def is_move_valid(piece, move, board, conditions=None, check_check=True):
 
     target_cell = board.get_piece(new_coords)
 
-    sx = np.sign(move.x)
-    sy = np.sign(move.y)
+    sx = (move.x > 0) - (move.x < 0)
+    sy = (move.y > 0) - (move.y < 0)
 
+    flags = move.flags
     if conditions is not None:  # useless ?  TODO
-        if not any([cond in conditions for cond in move.conditions]):
+        if not flags & conditions_to_flags(conditions):
             return False
 
-    for condition in move.conditions:
-        if condition == "first_move":
-            if piece.has_moved:
-                return False
-        if condition == "empty":
-            if target_cell is not None:
-                return False
-        elif condition == "adversary OR en_passant":
-            if target_cell is None or (
-                target_cell is not None and target_cell.color == piece.color
-            ):
-                # implement "en-passant" check
-                return False
-        elif condition == "empty OR adversary":
-            if target_cell is not None and target_cell.color == piece.color:
+    if flags & FIRST_MOVE:
+        if piece.has_moved:
+            return False
+    if flags & EMPTY:
+        if not is_empty(target_cell):
+            return False
+    if flags & ADVERSARY_OR_EN_PASSANT:
+        if target_cell is None or (
+            target_cell is not None and target_cell.color == piece.color
+        ):
+            # implement "en-passant" check
+            return False
+    if flags & EMPTY_OR_ADVERSARY:
+        if target_cell is not None and target_cell.color == piece.color:
+            return False
+    if flags & EMPTY_DIAG:
+        for x, y in zip(range(sx, move.x, sx), range(sy, move.y, sy)):
+            if not is_empty(board.get_piece((piece.x + x, piece.y + y))):
                 return False
-        elif condition == "empty_diag":
-            for x, y in zip(range(sx, move.x, sx), range(sy, move.y, sy)):
-                if board.get_piece((piece.x + x, piece.y + y)) is not None:
+    if flags & EMPTY_ROW:
+        if move.x == 0:
+            for y in range(sy, move.y, sy):
+                if not is_empty(board.get_piece((piece.x, piece.y + y))):
+                    return False
+        elif move.y == 0:
+            for x in range(sx, move.x, sx):
+                if not is_empty(board.get_piece((piece.x + x, piece.y))):
                     return False
-        elif condition == "empty_row":
-            if move.x == 0:
-                for y in range(sy, move.y, sy):
-                    if board.get_piece((piece.x, piece.y + y)) is not None:
-                        return False
-            elif move.y == 0:
-                for x in range(sx, move.x, sx):
-                    if board.get_piece((piece.x + x, piece.y)) is not None:
-                        return False
 
     # check condition if current move is castling
     if isinstance(move, Castling):
-        # check that King is not in check
-        if board.get_player(piece.color).in_check:
-            return False
         # check that King has not moved yet
         if piece.has_moved:
             return False
@@ -102,59 +197,43 @@ def is_move_valid(piece, move, board, conditions=None, check_check=True):
             if board.get_piece((piece.x + x, piece.y)) is not None:
                 return False
         # check that target Rook has not moved neither
-        castling_rook = board.get_piece(
-            (1 if piece.color == "white" else 8, move.rook_col)
-        )
-        if castling_rook is None or not isinstance(castling_rook, Rook):
+        castling_rook = board.get_piece((move.rook_col, piece.y))
+        if (
+            castling_rook is None
+            or not isinstance(castling_rook, Rook)
+            or castling_rook.color != piece.color
+            or castling_rook.has_moved
+        ):
+            return False
+        # check that King is not in check and does not cross an attacked cell
+        other_color = "white" if piece.color == "black" else "black"
+        if board.is_square_attacked(piece.coords, other_color) or (
+            board.is_square_attacked((piece.x + sx, piece.y), other_color)
+        ):
             return False
-        else:
-            if castling_rook.has_moved:
-                return False
 
     # every moves have to lead to a non-check position for the current player
-    if check_check:
-        # simulate move
-        current_player = board.get_player(piece.color)
-        other_player = board.get_player("white" if piece.color == "black" else "black")
-
-        if target_cell is not None and target_cell.color != piece.color:
-            # take adversary piece
-            captured_piece = True
-            current_player.captured_pieces.append(target_cell)
-            other_player.pieces.remove(target_cell)
-            board.del_piece(target_cell)
-        else:
-            captured_piece = False
-
-        board.del_piece(piece)
-        piece.coords = new_coords
-        board.set_piece(piece)
-
-        # check if move lead to an in-check position for the current player
-        in_check, in_check_pieces = is_in_check(current_player, other_player, board)
-        # revert back simulated move
-        board.del_piece(piece)
-        piece.coords = init_coords
-        board.set_piece(piece)
-        if captured_piece:
-            current_player.captured_pieces.remove(target_cell)
-            other_player.pieces.append(target_cell)
-            board.set_piece(target_cell)
-
-        if in_check:
-            return False
+    if check_check and not is_move_safe(piece, move, board):
+        return False
 
     return True
 
 
+def is_move_safe(piece, move, board) -> bool:
+    """Check that `move` does not leave the King of `piece` in check."""
+    current_player = board.get_player(piece.color)
+    other_player = board.get_player("white" if piece.color == "black" else "black")
+
+    # simulate move and check if it leads to an in-check position
+    undo = board.make_move(piece, move)
+    in_check, _ = is_in_check(current_player, other_player, board)
+    board.unmake_move(undo)
+
+    return not in_check
+
+
 def is_in_check(current_player, other_player, board):
     current_king = current_player.get_king()[1]
-    valid_moves = other_player.get_valid_moves(board, check_check=False)
-    in_check_pieces = []
-    for piece, moves in valid_moves:
-        for move in moves:
-            if move.get_new_coords(piece.coords) == current_king.coords:
-                in_check_pieces.append(piece)
-                # print(piece.SYMBOL, piece.coords, current_king.coords)
+    in_check_pieces = board.attackers_of(current_king.coords, other_player.color)
     in_check = len(in_check_pieces) > 0
     return in_check, in_check_pieces
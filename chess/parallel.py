@@ -0,0 +1,247 @@
+"""Root-parallel alpha-beta search over a pool of worker processes.
+
+At each iteration of the iterative deepening, the best move of the previous iteration
+is searched first, by a single worker. The other root moves are then dealt round-robin
+to the workers, which search them with the score of the best move as lower bound of
+their alpha-beta window, so that inferior moves are cut off as in a sequential search.
+The workers only return moves scoring strictly more than that bound, and the best of
+them replaces the best move.
+
+Each worker keeps its own transposition table, from one iteration (and search) to
+the next. Workers check the deadline themselves and share an abort event with the
+searcher, so that all of them have returned once the time is up or the search is
+stopped, and the pool can be shut down cleanly.
+
+Usage: ``python -m chess.parallel [--depth=5] [--fen=kiwipete] [--processes=4]``
+compares the time to reach a depth with the sequential search.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import List
+
+
+from .bitboard import INITIAL_FEN, Position, move_to_uci
+from .perft import REFERENCE_POSITIONS
+from .search import (
+    INFINITY,
+    MATE_SCORE,
+    MAX_DEPTH,
+    Searcher,
+    SearchResult,
+    SearchTimeout,
+    mvv_lva,
+    search,
+)
+from .transposition import TranspositionTable
+
+# state of the worker processes, set by `_init_worker`
+_table = None
+_abort = None
+_search_id = None
+
+
+def _init_worker(table_size_mb: int, abort):
+    global _table, _abort
+    _table = TranspositionTable(size_mb=table_size_mb)
+    _abort = abort
+
+
+def search_moves(
+    search_id: int,
+    position: Position,
+    moves: List[int],
+    depth: int,
+    alpha: int = -INFINITY,
+    time_limit: float = None,
+    max_nodes: int = None,
+):
+    """Return the (move, score, nodes) of the best of `moves` searched to `depth` in
+    a worker, with None as move if no move scores more than `alpha`, and None as
+    move and score if the budget is exhausted first."""
+    global _search_id
+    if search_id != _search_id:
+        _table.new_search()
+        _search_id = search_id
+    searcher = Searcher(position, time_limit, max_nodes, depth, _table, _abort)
+    searcher.start()
+    try:
+        (move, score) = searcher.search_root(moves, depth, alpha)
+    except SearchTimeout:
+        (move, score) = (None, None)
+    return (move, score, searcher.nodes)
+
+
+class ParallelSearcher:
+    """Search positions with a pool of `processes` workers (one per CPU by default).
+
+    Use it as a context manager, or call `close` once done.
+    """
+
+    def __init__(self, processes: int = None, table_size_mb: int = 16):
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        context = multiprocessing.get_context()
+        self._abort = context.Event()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(table_size_mb, self._abort),
+        )
+        self._search_ids = 0
+
+    def _results(self, futures, stop=None) -> list:
+        """Wait for the results of `futures`, aborting them once `stop` is set."""
+        pending = set(futures)
+        while pending:
+            (_, pending) = wait(pending, timeout=None if stop is None else 0.01)
+            if stop is not None and stop.is_set():
+                self._abort.set()
+        return [future.result() for future in futures]
+
+    def search(
+        self,
+        position: Position,
+        time_limit: float = None,
+        max_nodes: int = None,
+        max_depth: int = None,
+        stop=None,
+    ) -> SearchResult:
+        """Search the best move of `position` within a time and/or node budget, or
+        until the `stop` event is set."""
+        if time_limit is None and max_nodes is None and max_depth is None:
+            raise ValueError(
+                "At least one of `time_limit`, `max_nodes` or `max_depth` must be set"
+            )
+        start = time.perf_counter()
+        # wall clock deadline, shared with the workers
+        deadline = None if time_limit is None else time.time() + time_limit
+        max_depth = MAX_DEPTH if max_depth is None else max_depth
+        self._search_ids += 1
+        self._abort.clear()
+
+        def budget(n_tasks):
+            time_left = None if deadline is None else deadline - time.time()
+            node_budget = None if max_nodes is None else (max_nodes - nodes) // n_tasks
+            exhausted = (time_left is not None and time_left <= 0) or (
+                node_budget is not None and node_budget <= 0
+            )
+            return (time_left, node_budget, exhausted)
+
+        moves = position.legal_moves()
+        if len(moves) == 0:
+            score = -MATE_SCORE if position.is_check() else 0
+            return SearchResult(None, score, 0, 0, time.perf_counter() - start)
+        moves.sort(key=lambda move: mvv_lva(position, move), reverse=True)
+
+        (best_move, best_score, depth, nodes) = (moves[0], -INFINITY, 0, 0)
+        for current_depth in range(1, max_depth + 1):
+            if stop is not None and stop.is_set():
+                break
+            # best move first, its score then bounds the search of the others
+            (time_left, node_budget, exhausted) = budget(1)
+            if exhausted:
+                break
+            future = self.executor.submit(
+                search_moves,
+                self._search_ids,
+                position,
+                moves[:1],
+                current_depth,
+                -INFINITY,
+                time_left,
+                node_budget,
+            )
+            ((move, score, task_nodes),) = self._results([future], stop)
+            nodes += task_nodes
+            if move is None:
+                break
+
+            others = moves[1:]
+            n_tasks = min(self.processes, len(others))
+            if n_tasks:
+                (time_left, node_budget, exhausted) = budget(n_tasks)
+                if exhausted:
+                    break
+                futures = [
+                    self.executor.submit(
+                        search_moves,
+                        self._search_ids,
+                        position,
+                        others[i::n_tasks],
+                        current_depth,
+                        score,
+                        time_left,
+                        node_budget,
+                    )
+                    for i in range(n_tasks)
+                ]
+                results = self._results(futures, stop)
+                nodes += sum(result[2] for result in results)
+                if any(result[1] is None for result in results):
+                    break
+                # workers only return moves scoring more than `score`
+                for other_move, other_score, _ in results:
+                    if other_move is not None and other_score > score:
+                        (move, score) = (other_move, other_score)
+
+            (best_move, best_score, depth) = (move, score, current_depth)
+            # search the best move first at the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= MATE_SCORE - MAX_DEPTH:
+                break
+            # next iteration is unlikely to complete within the remaining time
+            if deadline is not None:
+                if time.perf_counter() - start > time_limit / 2:
+                    break
+
+        self._abort.clear()
+        return SearchResult(
+            best_move, best_score, depth, nodes, time.perf_counter() - start
+        )
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main(depth: int = 5, fen: str = INITIAL_FEN, processes: int = None):
+    """Print the time the sequential and parallel searches take to reach `depth`.
+
+    Parameters
+    -----------
+    depth : int
+        Search depth.
+    fen : str
+        Position, in Forsyth-Edwards Notation, or name of a reference position.
+    processes : int
+        Number of worker processes (defaults to the number of CPUs).
+
+    """
+    if fen in REFERENCE_POSITIONS:
+        fen = REFERENCE_POSITIONS[fen][0]
+    position = Position.from_fen(fen)
+    results = [("sequential", search(position, max_depth=depth))]
+    with ParallelSearcher(processes) as searcher:
+        # the pool is started before timing the search
+        searcher.search(position, max_depth=1)
+        name = f"parallel ({searcher.processes} processes)"
+        results.append((name, searcher.search(position, max_depth=depth)))
+    for name, result in results:
+        print(
+            f"{name}: move {move_to_uci(result.move)}, score {result.score}, "
+            f"depth {result.depth}, {result.nodes} nodes in {result.time:.2f}s ({result.nps:.0f} nodes/s)"
+        )
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)
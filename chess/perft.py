@@ -0,0 +1,181 @@
+"""Move generation counts (perft) and throughput benchmark.
+
+Usage: ``python -m chess.perft --depth=4 [--fen="..."] [--processes=4]``
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple
+
+
+from .bitboard import INITIAL_FEN, Position, move_to_uci
+from .coords import coords_to_loc
+from .pieces import PROMOTION_PIECES, Pawn
+
+# reference positions and their known node counts at depths 1, 2, 3, ...
+REFERENCE_POSITIONS = {
+    "initial": (INITIAL_FEN, [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": (
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        [48, 2039, 97862, 4085603],
+    ),
+    "endgame": (
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        [14, 191, 2812, 43238, 674624],
+    ),
+    "promotions": (
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        [6, 264, 9467, 422333],
+    ),
+    "talkchess": (
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        [44, 1486, 62379, 2103487],
+    ),
+    "middlegame": (
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        [46, 2079, 89890, 3894594],
+    ),
+}
+
+
+class PerftResult(NamedTuple):
+    nodes: int
+    divide: Dict[str, int]
+    time: float
+
+    @property
+    def nps(self) -> float:
+        """Nodes per second."""
+        return self.nodes / self.time if self.time > 0 else 0.0
+
+
+def perft(position: Position, depth: int) -> int:
+    """Count the leaf nodes of the legal move tree of `position` at `depth`."""
+    if depth == 0:
+        return 1
+    moves = position.legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        undo = position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.unmake_move(undo)
+    return nodes
+
+
+def _perft_after(position: Position, move: int, depth: int) -> int:
+    position.make_move(move)
+    return perft(position, depth - 1)
+
+
+def perft_divide(
+    position: Position, depth: int, processes: int = None
+) -> Dict[str, int]:
+    """Count the leaf nodes at `depth` below each root move (in UCI notation).
+
+    With several `processes`, root moves are dispatched to a process pool.
+    """
+    if depth < 1:
+        raise ValueError("`depth` must be at least 1")
+    moves = position.legal_moves()
+    if processes is None or processes <= 1:
+        return {
+            move_to_uci(move): _perft_after(position.copy(), move, depth)
+            for move in moves
+        }
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        counts = executor.map(
+            _perft_after, [position] * len(moves), moves, [depth] * len(moves)
+        )
+        return dict(zip(map(move_to_uci, moves), counts))
+
+
+def run_perft(position: Position, depth: int, processes: int = None) -> PerftResult:
+    """Run `perft_divide` and time it."""
+    start = time.perf_counter()
+    divide = perft_divide(position, depth, processes=processes)
+    return PerftResult(sum(divide.values()), divide, time.perf_counter() - start)
+
+
+def _object_moves(player, board):
+    """Yield the (name, piece, move, promotion) legal moves of `player`."""
+    for (piece, moves) in player.get_valid_moves(board):
+        for move in moves:
+            new_coords = move.get_new_coords(piece.coords)
+            name = coords_to_loc(piece.coords) + coords_to_loc(new_coords)
+            if isinstance(piece, Pawn) and new_coords[1] in (1, 8):
+                for symbol in PROMOTION_PIECES:
+                    yield (name + symbol.lower(), piece, move, symbol)
+            else:
+                yield (name, piece, move, None)
+
+
+def _object_perft(board, player, other_player, depth: int) -> int:
+    if depth == 0:
+        return 1
+    nodes = 0
+    for (_, piece, move, promotion) in _object_moves(player, board):
+        if depth == 1:
+            nodes += 1
+            continue
+        undo = board.make_move(piece, move, promotion=promotion)
+        nodes += _object_perft(board, other_player, player, depth - 1)
+        board.unmake_move(undo)
+    return nodes
+
+
+def game_perft_divide(game, depth: int) -> Dict[str, int]:
+    """Object model counterpart of `perft_divide`, using `Player.get_valid_moves`.
+
+    The board of `game` is restored once the count is done.
+    """
+    if depth < 1:
+        raise ValueError("`depth` must be at least 1")
+    (board, player, other_player) = (game.board, game.current_player, game.other_player)
+    divide = {}
+    for (name, piece, move, promotion) in list(_object_moves(player, board)):
+        undo = board.make_move(piece, move, promotion=promotion)
+        divide[name] = _object_perft(board, other_player, player, depth - 1)
+        board.unmake_move(undo)
+    return divide
+
+
+def game_perft(game, depth: int) -> int:
+    """Object model counterpart of `perft`."""
+    if depth == 0:
+        return 1
+    return sum(game_perft_divide(game, depth).values())
+
+
+def main(depth: int = 4, fen: str = INITIAL_FEN, processes: int = None):
+    """Print the perft divide of a position and the move generation throughput.
+
+    Parameters
+    -----------
+    depth : int
+        Search depth.
+    fen : str
+        Position, in Forsyth-Edwards Notation, or name of a reference position.
+    processes : int
+        Number of worker processes the root moves are split across.
+
+    """
+    expected = None
+    if fen in REFERENCE_POSITIONS:
+        (fen, counts) = REFERENCE_POSITIONS[fen]
+        if depth <= len(counts):
+            expected = counts[depth - 1]
+    result = run_perft(Position.from_fen(fen), depth, processes=processes)
+    for uci, nodes in sorted(result.divide.items()):
+        print(f"{uci}: {nodes}")
+    print(f"Nodes: {result.nodes}")
+    if expected is not None:
+        status = "OK" if result.nodes == expected else "MISMATCH"
+        print(f"Expected: {expected} ({status})")
+    print(f"Time: {result.time:.2f}s ({result.nps:.0f} nodes/s)")
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)
@@ -0,0 +1,304 @@
+"""Portable Game Notation (PGN) reader and writer.
+
+Games are read one at a time from any iterable of lines (such as an open file), so
+that memory use is bounded by the size of a single game.
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple
+
+from .bitboard import (
+    CAPTURE,
+    INITIAL_FEN,
+    KING_CASTLE,
+    PAWN,
+    PIECE_SYMBOLS,
+    QUEEN_CASTLE,
+    Position,
+    move_promotion,
+    parse_square,
+    square_name,
+)
+from .game import Game
+
+RESULTS = ["1-0", "0-1", "1/2-1/2", "*"]
+# tags that come first, in this order, in every exported game
+SEVEN_TAG_ROSTER = {
+    "Event": "?",
+    "Site": "?",
+    "Date": "????.??.??",
+    "Round": "?",
+    "White": "?",
+    "Black": "?",
+    "Result": "*",
+}
+
+HEADER_RE = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# comments, variations and numeric annotation glyphs are skipped
+MOVETEXT_RE = re.compile(
+    r"\{[^}]*\}|;[^\n]*|\(|\)|\$\d+|\d+\.+|1-0|0-1|1/2-1/2|\*|[^\s(){};.]+"
+)
+SAN_RE = re.compile(
+    r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?[+#]?[!?]*$"
+)
+
+
+class PgnError(ValueError):
+    pass
+
+
+class PgnGame(NamedTuple):
+    headers: Dict[str, str]
+    moves: List[int]  # encoded moves (empty when only headers are read)
+    result: str
+
+    def start_position(self) -> Position:
+        if "FEN" in self.headers:
+            return Position.from_fen(self.headers["FEN"])
+        return Position.initial()
+
+    def to_game(self, backend: str = "bitboard") -> Game:
+        """Replay the moves silently into a new `Game`."""
+        game = Game.from_position(self.start_position(), backend=backend)
+        for move in self.moves:
+            game.next_move(move=move, verbose=False)
+        return game
+
+
+def move_to_san(position: Position, move: int) -> str:
+    """Return the Standard Algebraic Notation of the legal `move` in `position`."""
+    flag = move >> 12
+    if flag == KING_CASTLE:
+        san = "O-O"
+    elif flag == QUEEN_CASTLE:
+        san = "O-O-O"
+    else:
+        (from_square, to_square) = (move & 63, (move >> 6) & 63)
+        piece_type = position.squares[from_square] % 6
+        capture = "x" if flag & CAPTURE else ""
+        if piece_type == PAWN:
+            san = (square_name(from_square)[0] if capture else "") + capture
+        else:
+            # disambiguate between pieces of the same type reaching the same square
+            others = [
+                other & 63
+                for other in position.pseudo_legal_moves()
+                if (other >> 6) & 63 == to_square
+                and other & 63 != from_square
+                and position.squares[other & 63] == position.squares[from_square]
+                and position.is_legal(other)
+            ]
+            disambiguation = ""
+            if others:
+                if all(other % 8 != from_square % 8 for other in others):
+                    disambiguation = square_name(from_square)[0]
+                elif all(other // 8 != from_square // 8 for other in others):
+                    disambiguation = square_name(from_square)[1]
+                else:
+                    disambiguation = square_name(from_square)
+            san = PIECE_SYMBOLS[piece_type] + disambiguation + capture
+        san += square_name(to_square)
+        promotion = move_promotion(move)
+        if promotion is not None:
+            san += "=" + PIECE_SYMBOLS[promotion]
+
+    undo = position.make_move(move)
+    if position.is_check():
+        san += "+" if position.legal_moves() else "#"
+    position.unmake_move(undo)
+    return san
+
+
+def parse_san(position: Position, san: str) -> int:
+    """Return the legal move of `position` written `san` in Standard Algebraic
+    Notation."""
+    san = san.replace("0", "O")
+    if san.rstrip("+#!?") in ("O-O", "O-O-O"):
+        flag = KING_CASTLE if san.rstrip("+#!?") == "O-O" else QUEEN_CASTLE
+        for move in position.pseudo_legal_moves():
+            if move >> 12 == flag and position.is_legal(move):
+                return move
+        raise PgnError(f'Illegal move "{san}"')
+
+    match = SAN_RE.match(san)
+    if match is None:
+        raise PgnError(f'Invalid move "{san}"')
+    (symbol, from_file, from_rank, to_square, promotion) = match.groups()
+    piece_type = PIECE_SYMBOLS.index(symbol or "P")
+    to_square = parse_square(to_square)
+    candidates = []
+    for move in position.pseudo_legal_moves():
+        from_square = move & 63
+        if (
+            (move >> 6) & 63 != to_square
+            or position.squares[from_square] % 6 != piece_type
+            or (from_file and square_name(from_square)[0] != from_file)
+            or (from_rank and square_name(from_square)[1] != from_rank)
+        ):
+            continue
+        move_promoted = move_promotion(move)
+        if (move_promoted is None) != (promotion is None) or (
+            promotion and PIECE_SYMBOLS[move_promoted] != promotion
+        ):
+            continue
+        if position.is_legal(move):
+            candidates.append(move)
+    if len(candidates) != 1:
+        kind = "Illegal" if len(candidates) == 0 else "Ambiguous"
+        raise PgnError(f'{kind} move "{san}"')
+    return candidates[0]
+
+
+def _parse_game(headers, movetext, headers_only) -> PgnGame:
+    result = headers.get("Result", "*")
+    moves = []
+    if not headers_only:
+        position = PgnGame(headers, moves, result).start_position()
+        depth = 0
+        for token in MOVETEXT_RE.findall(movetext):
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+            elif depth > 0 or token[0] in "{;$" or token[-1] == ".":
+                continue
+            elif token in RESULTS:
+                result = token
+            else:
+                move = parse_san(position, token)
+                position.make_move(move)
+                moves.append(move)
+    return PgnGame(headers, moves, result)
+
+
+def iter_games(
+    lines: Iterable[str], headers_only: bool = False, on_error: str = "raise"
+) -> Iterator[PgnGame]:
+    """Parse games from `lines`, one at a time.
+
+    With `headers_only`, movetext is not parsed and games come without moves. Games
+    that cannot be parsed raise a `PgnError`, or are skipped if `on_error` is
+    "skip": the next game is read from its tags.
+    """
+    if on_error not in ("raise", "skip"):
+        raise ValueError('`on_error` must be either "raise" or "skip"')
+
+    def parse(headers, movetext):
+        try:
+            return [_parse_game(headers, "\n".join(movetext), headers_only)]
+        except ValueError:
+            if on_error == "raise":
+                raise
+            return []
+        except (IndexError, KeyError, TypeError) as error:
+            # malformed tags or movetext not caught by the checks of the parsers
+            if on_error == "raise":
+                raise PgnError(f"Invalid game ({error!r})") from error
+            return []
+
+    headers = {}
+    movetext = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            if movetext:
+                # a new game starts right after the movetext of the previous one
+                yield from parse(headers, movetext)
+                (headers, movetext) = ({}, [])
+            match = HEADER_RE.match(line)
+            if match is not None:
+                headers[match.group(1)] = match.group(2).replace('\\"', '"')
+        elif line and not line.startswith("%"):
+            if not headers_only:
+                movetext.append(line)
+            elif not movetext:
+                movetext.append("")
+    if headers or movetext:
+        yield from parse(headers, movetext)
+
+
+def read_games(
+    path: str, headers_only: bool = False, on_error: str = "raise"
+) -> Iterator[PgnGame]:
+    """Parse the games of the PGN file at `path`, one at a time."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from iter_games(f, headers_only=headers_only, on_error=on_error)
+
+
+def game_result(game: Game) -> str:
+    if game.winner is not None:
+        return "1-0" if game.winner == "white" else "0-1"
+    return "1/2-1/2" if game.draw else "*"
+
+
+def format_game(
+    moves: List[int],
+    headers: Dict[str, str] = None,
+    result: str = "*",
+    start_position: Position = None,
+    line_length: int = 79,
+) -> str:
+    """Return the PGN of a game made of the encoded `moves`."""
+    headers = {**SEVEN_TAG_ROSTER, **(headers or {}), "Result": result}
+    position = Position.initial() if start_position is None else start_position.copy()
+    if start_position is not None and "FEN" not in headers:
+        fen = start_position.to_fen()
+        if fen != INITIAL_FEN:
+            headers.update(SetUp="1", FEN=fen)
+
+    tokens = []
+    for move in moves:
+        if position.side_to_move == 0:
+            tokens.append(f"{position.fullmove_number}.")
+        elif not tokens:
+            tokens.append(f"{position.fullmove_number}...")
+        tokens.append(move_to_san(position, move))
+        position.make_move(move)
+    tokens.append(result)
+
+    lines = [
+        '[{} "{}"]'.format(tag, str(value).replace('"', '\\"'))
+        for tag, value in headers.items()
+    ]
+    lines.append("")
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > line_length:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n\n"
+
+
+class PgnWriter:
+    """Append games to a PGN file through a buffered stream.
+
+    Use it as a context manager, or call `close` once done.
+    """
+
+    def __init__(self, path: str, mode: str = "a", buffer_size: int = 2**16):
+        self.file = open(path, mode, buffering=buffer_size, encoding="utf-8")
+        self.n_games = 0
+
+    def write(
+        self,
+        moves: List[int],
+        headers: Dict[str, str] = None,
+        result: str = "*",
+        start_position: Position = None,
+    ):
+        self.file.write(format_game(moves, headers, result, start_position))
+        self.n_games += 1
+
+    def write_game(self, game: Game, headers: Dict[str, str] = None):
+        self.write(game.moves, headers, game_result(game), game.start_position)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,16 +1,31 @@
 """Piece classes."""
 from abc import ABC
-from typing import List
+from typing import Iterator, List
 
 from .coords import Coords, coords_to_loc
-from .moves import KingSideCastling, Move, QueenSideCastling, is_move_valid
-from .utils import staticproperty
+from .moves import (
+    DIAGONALS,
+    RAY_MOVES,
+    RAYS,
+    ROWS,
+    KingSideCastling,
+    Move,
+    QueenSideCastling,
+    is_empty,
+    is_move_safe,
+    is_move_valid,
+    moves_by_cell,
+)
 
 
 class Piece(ABC, Coords):
 
+    __slots__ = ("color", "has_moved")
+
     SYMBOL = ""
     MOVES = []
+    # moves staying on the board for each cell, if precomputed
+    THEORETICAL_MOVES = None
 
     def __init__(self, coords: tuple, color: str, has_moved: bool = False):
         self.color = color
@@ -18,6 +33,17 @@ class Piece(ABC, Coords):
 
         Coords.__init__(self, coords)
 
+    # pieces are compared by identity, not by coordinates
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def copy(self):
+        piece = object.__new__(type(self))
+        piece.coords = self.coords
+        piece.color = self.color
+        piece.has_moved = self.has_moved
+        return piece
+
     def move(self, new_coords: tuple) -> tuple:
         self.coords = new_coords
         self.has_moved = True
@@ -28,6 +54,8 @@ class Piece(ABC, Coords):
 
     @property
     def theoretical_moves(self) -> List[Move]:
+        if self.THEORETICAL_MOVES is not None:
+            return self.THEORETICAL_MOVES[self.coords]
         (x, y) = self.coords
         moves = []
         for move in self.MOVES:
@@ -35,12 +63,15 @@ class Piece(ABC, Coords):
                 moves.append(move)
         return moves
 
+    def iter_valid_moves(
+        self, board, conditions=None, check_check=True
+    ) -> Iterator[Move]:
+        for move in self.theoretical_moves:
+            if is_move_valid(self, move, board, conditions, check_check):
+                yield move
+
     def get_valid_moves(self, board, conditions=None, check_check=True) -> List[Move]:
-        return [
-            move
-            for move in self.theoretical_moves
-            if is_move_valid(self, move, board, conditions, check_check)
-        ]
+        return list(self.iter_valid_moves(board, conditions, check_check))
 
     def get_move(self, new_loc, board, **kwargs) -> Move:
         for move in self.get_valid_moves(board, **kwargs):
@@ -49,26 +80,76 @@ class Piece(ABC, Coords):
         raise ValueError(f'No move with new location "{new_loc}"')
 
 
+class SlidingPiece(Piece):
+
+    __slots__ = ()
+
+    DIRECTIONS = []
+
+    def iter_valid_moves(
+        self, board, conditions=None, check_check=True
+    ) -> Iterator[Move]:
+        if conditions is not None:
+            yield from Piece.iter_valid_moves(self, board, conditions, check_check)
+            return
+
+        # walk each ray once, stopping at the first blocking piece
+        chessboard = board.chessboard
+        (x, y) = self.coords
+        for direction in self.DIRECTIONS:
+            for move in RAYS[direction][self.coords]:
+                target_cell = chessboard[8 - y - move.y, x + move.x - 1]
+                blocked = not is_empty(target_cell)
+                if blocked and target_cell.color == self.color:
+                    break
+                if not check_check or is_move_safe(self, move, board):
+                    yield move
+                if blocked:
+                    break
+
+
+def pawn_moves(color: str, has_moved: bool) -> List[Move]:
+    way = +1 if color == "white" else -1
+    moves = [
+        Move((0, way), "empty"),
+        Move((+1, way), "adversary OR en_passant"),
+        Move((-1, way), "adversary OR en_passant"),
+    ]
+    if not has_moved:
+        moves += [Move((0, 2 * way), ["empty", "empty_row", "first_move"])]
+    return moves
+
+
+PAWN_MOVES = {
+    (color, has_moved): pawn_moves(color, has_moved)
+    for color in ("white", "black")
+    for has_moved in (False, True)
+}
+PAWN_THEORETICAL_MOVES = {
+    key: moves_by_cell(moves) for key, moves in PAWN_MOVES.items()
+}
+
+
 class Pawn(Piece):
 
+    __slots__ = ()
+
     SYMBOL = "P"
     VALUE = 1
 
     @property
     def MOVES(self):
-        way = +1 if self.color == "white" else -1
-        moves = [
-            Move((0, way), "empty"),
-            Move((+1, way), "adversary OR en_passant"),
-            Move((-1, way), "adversary OR en_passant"),
-        ]
-        if not self.has_moved:
-            moves += [Move((0, 2 * way), ["empty", "empty_row", "first_move"])]
-        return moves
+        return PAWN_MOVES[(self.color, self.has_moved)]
+
+    @property
+    def theoretical_moves(self) -> List[Move]:
+        return PAWN_THEORETICAL_MOVES[(self.color, self.has_moved)][self.coords]
 
 
 class Ghost(Piece):
 
+    __slots__ = ()
+
     SYMBOL = " "
 
     def __init__(self, coords, color, has_moved=True):
@@ -77,6 +158,8 @@ class Ghost(Piece):
 
 class Knight(Piece):
 
+    __slots__ = ()
+
     MOVES = [
         Move((-2, +1), ["empty OR adversary"]),
         Move((-2, -1), ["empty OR adversary"]),
@@ -87,66 +170,51 @@ class Knight(Piece):
         Move((-1, +2), ["empty OR adversary"]),
         Move((-1, -2), ["empty OR adversary"]),
     ]
+    THEORETICAL_MOVES = moves_by_cell(MOVES)
     SYMBOL = "N"
     VALUE = 3
 
 
-class Bishop(Piece):
+class Bishop(SlidingPiece):
+
+    __slots__ = ()
 
     SYMBOL = "B"
     VALUE = 3
 
-    @staticproperty
-    def MOVES():
-        moves = []
-        for i in range(1, 8, 1):
-            moves.append(Move((+i, i), ["empty OR adversary", "empty_diag"]))
-            moves.append(Move((+i, -i), ["empty OR adversary", "empty_diag"]))
-            moves.append(Move((-i, +i), ["empty OR adversary", "empty_diag"]))
-            moves.append(Move((-i, -i), ["empty OR adversary", "empty_diag"]))
-        return moves
+    DIRECTIONS = DIAGONALS
+    MOVES = [move for direction in DIRECTIONS for move in RAY_MOVES[direction]]
+    THEORETICAL_MOVES = moves_by_cell(MOVES)
+
 
+class Rook(SlidingPiece):
 
-class Rook(Piece):
+    __slots__ = ()
 
     SYMBOL = "R"
     VALUE = 6
 
-    @staticproperty
-    def MOVES():
-        moves = []
-        for i in range(1, 8, 1):
-            moves.append(Move((0, +i), ["empty OR adversary", "empty_row"]))
-            moves.append(Move((0, -i), ["empty OR adversary", "empty_row"]))
-            moves.append(Move((+i, 0), ["empty OR adversary", "empty_row"]))
-            moves.append(Move((-i, 0), ["empty OR adversary", "empty_row"]))
-        return moves
+    DIRECTIONS = ROWS
+    MOVES = [move for direction in DIRECTIONS for move in RAY_MOVES[direction]]
+    THEORETICAL_MOVES = moves_by_cell(MOVES)
 
 
-class Queen(Piece):
+class Queen(SlidingPiece):
+
+    __slots__ = ()
 
     SYMBOL = "Q"
     VALUE = 9
 
-    @staticproperty
-    def MOVES():
-        moves = []
-        for i in range(1, 8, 1):
-            # diagonals
-            moves.append(Move((+i, i), ["empty OR adversary", "empty_diag"]))
-            moves.append(Move((+i, -i), ["empty OR adversary", "empty_diag"]))
-            moves.append(Move((-i, +i), ["empty OR adversary", "empty_diag"]))
-            moves.append(Move((-i, -i), ["empty OR adversary", "empty_diag"]))
-            # rows
-            moves.append(Move((0, +i), ["empty OR adversary", "empty_row"]))
-            moves.append(Move((0, -i), ["empty OR adversary", "empty_row"]))
-            moves.append(Move((+i, 0), ["empty OR adversary", "empty_row"]))
-            moves.append(Move((-i, 0), ["empty OR adversary", "empty_row"]))
-        return moves
+    DIRECTIONS = DIAGONALS + ROWS
+    MOVES = [move for direction in DIRECTIONS for move in RAY_MOVES[direction]]
+    THEORETICAL_MOVES = moves_by_cell(MOVES)
 
 
 class King(Piece):
 
+    __slots__ = ()
+
     SYMBOL = "K"
     MOVES = [
         Move((0, +1), "empty OR adversary"),
@@ -160,3 +228,7 @@ class King(Piece):
         QueenSideCastling(),
         KingSideCastling(),
     ]
+    THEORETICAL_MOVES = moves_by_cell(MOVES)
+
+
+PROMOTION_PIECES = {"Q": Queen, "R": Rook, "B": Bishop, "N": Knight}
@@ -2,13 +2,28 @@
 import numpy as np
 from typing import List
 
+from .bitboard import Position
 from .engine import init_pieces
-from .moves import Move
+from .moves import Move, is_move_safe
 from .pieces import Piece, King
+from .search import search
+from .transposition import TranspositionTable
+
+
+STRATEGIES = ["random", "search", "mcts"]
 
 
 class Player:
-    def __init__(self, color: str, pieces: List[Piece] = None):
+    def __init__(
+        self,
+        color: str,
+        pieces: List[Piece] = None,
+        strategy: str = "random",
+        search_options: dict = None,
+        book=None,
+        tablebase=None,
+        mcts_options: dict = None,
+    ):
 
         if color not in ["white", "black"]:
             raise ValueError('`color` must be either "white" or "black".')
@@ -21,9 +36,82 @@ class Player:
 
         self.captured_pieces = []
 
+        # how moves are chosen; "search" options are passed to `chess.search.search`,
+        # or to a `ParallelSearcher` with that many "processes"
+        if strategy not in STRATEGIES:
+            raise ValueError(f"`strategy` must be in {STRATEGIES}")
+        self.strategy = strategy
+        if search_options is None:
+            search_options = {"time_limit": 1.0}
+        self.search_options = search_options
+        self.last_search = None
+        # kept from one move to the next, allocated at the first search
+        self.transposition_table = None
+        self.parallel_searcher = None
+        # "mcts" options are passed to `chess.mcts.MCTS`, whose tree is kept between
+        # moves
+        self.mcts_options = {} if mcts_options is None else mcts_options
+        self.mcts = None
+        # opening book (`OpeningBook` or path) answering before the strategy
+        if isinstance(book, str):
+            from .book import OpeningBook
+
+            book = OpeningBook(book)
+        self.book = book
+        # endgame tablebase (`Tablebase` or directory) playing covered positions
+        if isinstance(tablebase, str):
+            from .tablebase import Tablebase
+
+            tablebase = Tablebase(tablebase)
+        self.tablebase = tablebase
+
     def __repr__(self):
         return f'Player("{self.color}")'
 
+    def copy(self):
+        player = Player(
+            self.color,
+            pieces=[piece.copy() for piece in self.pieces],
+            strategy=self.strategy,
+            search_options=self.search_options,
+            book=self.book,
+            tablebase=self.tablebase,
+            mcts_options=self.mcts_options,
+        )
+        player.in_check = self.in_check
+        player.captured_pieces = list(self.captured_pieces)
+        return player
+
+    def iter_legal_moves(self, board, conditions=None, check_check=True):
+        """Lazily yield the (piece, move) pairs the player can play."""
+        for piece in self.pieces:
+            for move in piece.iter_valid_moves(board, conditions, check_check):
+                yield (piece, move)
+
+    def has_legal_move(self, board, conditions=None, check_check=True) -> bool:
+        """Check whether the player can move, stopping at the first legal move."""
+        if isinstance(board, Position):
+            return board.has_legal_move()
+        for _ in self.iter_legal_moves(board, conditions, check_check):
+            return True
+        return False
+
+    def sample_move(self, board, conditions=None, check_check=True):
+        """Randomly select a piece that can move, then one of its moves.
+
+        Pieces and moves are visited in random order and only validated until one
+        is found, instead of generating every legal move first.
+        """
+        pieces = self.pieces
+        for i in np.random.permutation(len(pieces)):
+            piece = pieces[i]
+            # moves are only checked not to leave the King in check once drawn
+            moves = piece.get_valid_moves(board, conditions, check_check=False)
+            for j in np.random.permutation(len(moves)):
+                if not check_check or is_move_safe(piece, moves[j], board):
+                    return (piece, moves[j])
+        return None
+
     def get_valid_moves(self, board, conditions=None, check_check=True):
         valid_moves = []
         for piece in self.pieces:
@@ -32,28 +120,71 @@ class Player:
                 valid_moves.append((piece, moves))
         return valid_moves
 
-    def get_move(self, board, conditions=None, check_check=True, strategy="random"):
-        # get all valid moves
-        valid_moves = self.get_valid_moves(board, conditions, check_check=check_check)
-        if len(valid_moves) == 0:
-            return None
-
-        # valid_moves_ = []
-        # for (piece, moves) in valid_moves:
-        #     if any(isinstance(move, Castling) for move in moves):
-        #         valid_moves_.append((piece, [move for move in moves if isinstance(move, Castling)]))  # noqa: E501
-        # if len(valid_moves_) > 0:
-        #     valid_moves = valid_moves_
-
-        if strategy == "random":
-            # randomly select piece
-            idx = np.random.choice(len(valid_moves), 1)[0]
-            (piece, moves) = valid_moves[idx]
-            # randomly select move
-            idx = np.random.choice(len(moves), 1)[0]
-            move = moves[idx]
-
-        return (piece, move)
+    def get_move(self, board, conditions=None, check_check=True, strategy=None):
+        if strategy is None:
+            strategy = self.strategy
+        if isinstance(board, Position):
+            return self.get_position_move(board, strategy=strategy)
+        if strategy != "random" or self.book is not None or self.tablebase is not None:
+            # books, tablebases and other strategies work on the bitboard
+            # representation of the board
+            position = Position.from_board(board, turn=self.color)
+            move = self.get_position_move(position, strategy=strategy)
+            return None if move is None else position.to_object_move(move, board)
+
+        # randomly select a piece, then one of its moves
+        return self.sample_move(board, conditions, check_check)
+
+    def get_position_move(self, position: Position, strategy=None):
+        if strategy is None:
+            strategy = self.strategy
+        if self.book is not None:
+            move = self.book.choose(position)
+            if move is not None:
+                return move
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(position)
+            if move is not None:
+                return move
+        if strategy == "search":
+            options = dict(self.search_options)
+            processes = options.pop("processes", None)
+            if processes is not None and processes > 1:
+                if self.parallel_searcher is None:
+                    from .parallel import ParallelSearcher
+
+                    self.parallel_searcher = ParallelSearcher(processes)
+                self.last_search = self.parallel_searcher.search(position, **options)
+                return self.last_search.move
+            if self.transposition_table is None:
+                self.transposition_table = TranspositionTable()
+            self.last_search = search(
+                position, table=self.transposition_table, **options
+            )
+            return self.last_search.move
+        if strategy == "mcts":
+            if self.mcts is None:
+                from .mcts import MCTS
+
+                self.mcts = MCTS(**self.mcts_options)
+            self.last_search = self.mcts.search(position)
+            return self.last_search.move
+
+        # randomly select a legal move, checking pseudo-legal moves in random order
+        moves = position.pseudo_legal_moves()
+        for i in np.random.permutation(len(moves)):
+            if position.is_legal(moves[i]):
+                return moves[i]
+        return None
+
+    def close(self):
+        """Shut down the worker processes of the searches, if any."""
+        if self.parallel_searcher is not None:
+            self.parallel_searcher.close()
+            self.parallel_searcher = None
+        if self.mcts is not None:
+            self.mcts.close()
+            self.mcts = None
 
     def get_piece(self, coords: tuple):
         for i, piece in enumerate(self.pieces):
@@ -1,8 +1,9 @@
-"""Plotting functions."""
-import matplotlib.patheffects as pe
-import matplotlib.pyplot as plt
+"""Plotting functions.
+
+Matplotlib and seaborn are only imported when a board is first shown, so that the
+rest of the package can be used (and imported quickly) without them.
+"""
 import numpy as np
-import seaborn as sns
 
 from .constants import COL_NAMES, ROW_NAMES
 from .coords import coords_to_np_coords
@@ -23,6 +24,9 @@ BACKGROUND = make_background()
 
 
 def show_board(board, cmap=CMAP, piece=None, moves=None):
+    import matplotlib.patheffects as pe
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     background = BACKGROUND.copy()
 
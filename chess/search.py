@@ -0,0 +1,304 @@
+"""Alpha-beta search on bitboard positions."""
+import time
+from typing import NamedTuple, Optional
+
+from .bitboard import CAPTURE, EN_PASSANT, PROMOTION, Position
+from .pieces import Bishop, Knight, Pawn, Queen, Rook
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+# material values (in centipawns) of the pieces, by bitboard piece type
+PIECE_VALUES = [100 * piece.VALUE for piece in (Pawn, Knight, Bishop, Rook, Queen)]
+PIECE_VALUES.append(0)  # King
+
+MATE_SCORE = 100000
+INFINITY = 10 * MATE_SCORE
+MAX_DEPTH = 64
+# scores beyond this bound are mates, stored relative to the node in the table
+MATE_BOUND = MATE_SCORE - 1000
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget is exhausted."""
+
+
+class SearchResult(NamedTuple):
+    move: Optional[int]
+    score: int
+    depth: int
+    nodes: int
+    time: float
+
+    @property
+    def nps(self) -> float:
+        """Nodes searched per second."""
+        return self.nodes / self.time if self.time > 0 else 0.0
+
+
+def popcount(bb: int) -> int:
+    return bin(bb).count("1")
+
+
+def evaluate(position: Position) -> int:
+    """Material balance from the point of view of the side to move."""
+    bbs = position.bitboards
+    score = 0
+    for piece_type in range(5):
+        score += PIECE_VALUES[piece_type] * (
+            popcount(bbs[piece_type]) - popcount(bbs[6 + piece_type])
+        )
+    return score if position.side_to_move == 0 else -score
+
+
+def score_to_table(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def is_tactical(move: int) -> bool:
+    """Check whether `move` is a capture or a promotion."""
+    return bool((move >> 12) & (CAPTURE | PROMOTION))
+
+
+def mvv_lva(position: Position, move: int) -> int:
+    """Order captures by Most Valuable Victim first, then Least Valuable Attacker.
+
+    Promotions count as capturing the promoted piece; quiet moves score 0.
+    """
+    flag = move >> 12
+    if not flag & (CAPTURE | PROMOTION):
+        return 0
+    squares = position.squares
+    if flag == EN_PASSANT:
+        victim = PIECE_VALUES[0]
+    elif flag & CAPTURE:
+        victim = PIECE_VALUES[squares[(move >> 6) & 63] % 6]
+    else:
+        victim = 0
+    if flag & PROMOTION:
+        victim += PIECE_VALUES[1 + (flag & 3)]
+    # attackers are ordered by piece type, from Pawn (0) to King (5)
+    return 10 * victim + 6 - squares[move & 63] % 6
+
+
+class Searcher:
+    """Negamax alpha-beta search with iterative deepening.
+
+    The search stops when `time_limit` (in seconds) or `max_nodes` is exhausted, once
+    `max_depth` is completed, or as soon as the `stop` event (e.g. a `threading.Event`
+    set by another thread) is set. It works on a copy of the given position. Results
+    are cached in the transposition `table`, if any, which can be kept from one
+    search to the next.
+    """
+
+    def __init__(
+        self,
+        position: Position,
+        time_limit: float = None,
+        max_nodes: int = None,
+        max_depth: int = None,
+        table: TranspositionTable = None,
+        stop=None,
+    ):
+        self.position = position.copy()
+        self.table = table
+        self.stop = stop
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.max_depth = MAX_DEPTH if max_depth is None else max_depth
+
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+
+    def start(self) -> float:
+        """Reset the node count and start the clock, return the start time."""
+        start = time.perf_counter()
+        self.nodes = 0
+        self.deadline = None if self.time_limit is None else start + self.time_limit
+        self.node_limit = self.max_nodes
+        return start
+
+    def search(self) -> SearchResult:
+        start = self.start()
+        if self.table is not None:
+            self.table.new_search()
+
+        moves = self.position.legal_moves()
+        if len(moves) == 0:
+            score = -MATE_SCORE if self.position.is_check() else 0
+            return SearchResult(None, score, 0, 0, time.perf_counter() - start)
+        moves.sort(key=lambda move: mvv_lva(self.position, move), reverse=True)
+
+        best_move, best_score, depth = moves[0], -INFINITY, 0
+        for current_depth in range(1, self.max_depth + 1):
+            try:
+                (move, score) = self.search_root(moves, current_depth)
+            except SearchTimeout:
+                break
+            if self.table is not None:
+                self.table.store(self.position.key, current_depth, EXACT, score, move)
+            (best_move, best_score, depth) = (move, score, current_depth)
+            # search the best move first at the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= MATE_SCORE - MAX_DEPTH:
+                break
+            # next iteration is unlikely to complete within the remaining time
+            if self.deadline is not None:
+                elapsed = time.perf_counter() - start
+                if elapsed > (self.deadline - start) / 2:
+                    break
+
+        return SearchResult(
+            best_move, best_score, depth, self.nodes, time.perf_counter() - start
+        )
+
+    def _check_limits(self):
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.nodes & 1023 == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            if self.stop is not None and self.stop.is_set():
+                raise SearchTimeout()
+
+    def search_root(self, moves, depth, alpha=-INFINITY):
+        """Return the best of the root `moves` searched to `depth`, with its score,
+        or None and `alpha` if no move scores more than `alpha`.
+
+        Raise `SearchTimeout` if the budget is exhausted first, leaving the moves
+        being searched made on the position of the searcher.
+        """
+        position = self.position
+        beta = INFINITY
+        best_move = None
+        for move in moves:
+            undo = position.make_move(move)
+            score = -self._negamax(depth - 1, -beta, -alpha, 1)
+            position.unmake_move(undo)
+            if score > alpha:
+                (alpha, best_move) = (score, move)
+        return (best_move, alpha)
+
+    def _ordered_moves(self, moves, first_move=None):
+        position = self.position
+
+        def priority(move):
+            return INFINITY if move == first_move else mvv_lva(position, move)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def _negamax(self, depth, alpha, beta, ply):
+        if depth <= 0:
+            return self._quiescence(alpha, beta, ply)
+        self.nodes += 1
+        self._check_limits()
+
+        position = self.position
+        if position.halfmove_clock >= 100:
+            return 0
+
+        table = self.table
+        table_move = None
+        if table is not None:
+            entry = table.probe(position.key)
+            if entry is not None:
+                (table_depth, bound, score, table_move) = entry
+                score = score_from_table(score, ply)
+                if table_depth >= depth and (
+                    bound == EXACT
+                    or (bound == LOWER and score >= beta)
+                    or (bound == UPPER and score <= alpha)
+                ):
+                    table.cutoffs += 1
+                    return score
+
+        us = position.side_to_move
+        alpha_init = alpha
+        best = -INFINITY
+        best_move = None
+        n_legal_moves = 0
+        moves = self._ordered_moves(position.pseudo_legal_moves(), table_move)
+        for move in moves:
+            undo = position.make_move(move)
+            if position.is_square_attacked(position.king_square(us), us ^ 1):
+                position.unmake_move(undo)
+                continue
+            n_legal_moves += 1
+            score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            position.unmake_move(undo)
+            if score > best:
+                (best, best_move) = (score, move)
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if n_legal_moves == 0:
+            # checkmate (prefer the shortest mate) or stalemate
+            best = -MATE_SCORE + ply if position.is_check() else 0
+            bound = EXACT
+        elif best >= beta:
+            bound = LOWER
+        elif best > alpha_init:
+            bound = EXACT
+        else:
+            bound = UPPER
+        if table is not None:
+            table.store(
+                position.key, depth, bound, score_to_table(best, ply), best_move
+            )
+        return best
+
+    def _quiescence(self, alpha, beta, ply):
+        self.nodes += 1
+        self._check_limits()
+
+        position = self.position
+        stand_pat = evaluate(position)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        us = position.side_to_move
+        captures = [move for move in position.pseudo_legal_moves() if is_tactical(move)]
+        for move in self._ordered_moves(captures):
+            undo = position.make_move(move)
+            if position.is_square_attacked(position.king_square(us), us ^ 1):
+                position.unmake_move(undo)
+                continue
+            score = -self._quiescence(-beta, -alpha, ply + 1)
+            position.unmake_move(undo)
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
+
+
+def search(
+    position: Position,
+    time_limit: float = None,
+    max_nodes: int = None,
+    max_depth: int = None,
+    table: TranspositionTable = None,
+    stop=None,
+) -> SearchResult:
+    """Search the best move of `position` within a time and/or node budget."""
+    if time_limit is None and max_nodes is None and max_depth is None:
+        raise ValueError(
+            "At least one of `time_limit`, `max_nodes` or `max_depth` must be set"
+        )
+    return Searcher(position, time_limit, max_nodes, max_depth, table, stop).search()
@@ -0,0 +1,241 @@
+"""Batch self-play over a process pool.
+
+Usage: ``python -m chess.selfplay --n_games=1000 [--white=search] [--processes=4]``
+"""
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, NamedTuple
+
+import numpy as np
+
+from .book import OpeningBook
+from .game import Game
+from .gamelog import GameLogWriter
+from .pgn import PgnWriter
+from .players import Player
+from .tablebase import Tablebase
+
+OUTCOMES = ["white", "black", "draw", "unfinished"]
+# PGN result of each outcome
+OUTCOME_RESULTS = dict(zip(OUTCOMES, ["1-0", "0-1", "1/2-1/2", "*"]))
+
+
+class GameResult(NamedTuple):
+    seed: int
+    outcome: str
+    plies: int
+    history: str
+    moves: List[int]  # encoded moves, see `chess.bitboard`
+
+
+def play_game(
+    seed: int,
+    white: str = "random",
+    black: str = "random",
+    max_plies: int = 200,
+    backend: str = "bitboard",
+    search_options: dict = None,
+    book: str = None,
+    tablebase: str = None,
+) -> GameResult:
+    """Silently play a game between two strategies, with a reproducible `seed`.
+
+    The game is "unfinished" if it lasts more than `max_plies` half-moves. Both
+    players open with the moves of the opening `book` file, if given, and the game is
+    adjudicated as soon as it reaches a position of the `tablebase` directory.
+    """
+    np.random.seed(seed)
+    if book is not None:
+        # memory-mapped once for both players
+        book = OpeningBook(book)
+    players = [
+        Player(color, strategy=strategy, search_options=search_options, book=book)
+        for color, strategy in (("white", white), ("black", black))
+    ]
+    game = Game(*players, backend=backend)
+    if tablebase is not None:
+        game.tablebase = Tablebase(tablebase)
+
+    plies = 0
+    try:
+        while not game.is_finished and plies < max_plies:
+            game.next_move(verbose=False)
+            plies = len(game.history)
+    finally:
+        # worker processes of the searches, if any
+        for player in players:
+            player.close()
+        if book is not None:
+            book.close()
+
+    if game.winner is not None:
+        outcome = game.winner
+    elif game.draw:
+        outcome = "draw"
+    else:
+        outcome = "unfinished"
+    return GameResult(seed, outcome, plies, game.get_history(delimiter=" "), game.moves)
+
+
+class SelfPlayStats:
+    """Results aggregated as games finish."""
+
+    def __init__(self):
+        self.outcomes = Counter({outcome: 0 for outcome in OUTCOMES})
+        self.lengths = []
+        self.start = time.perf_counter()
+
+    def add(self, result: GameResult):
+        self.outcomes[result.outcome] += 1
+        self.lengths.append(result.plies)
+
+    @property
+    def n_games(self) -> int:
+        return len(self.lengths)
+
+    @property
+    def games_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.n_games / elapsed if elapsed > 0 else 0.0
+
+    def length_histogram(self, bins: int = 10):
+        """Return the (counts, bin edges) of the game lengths, in plies."""
+        return np.histogram(self.lengths, bins=bins)
+
+    def summary(self) -> str:
+        outcomes = ", ".join(f"{k}: {v}" for k, v in self.outcomes.items())
+        msg = f"{self.n_games} games ({self.games_per_second:.1f} games/s) | {outcomes}"
+        if self.n_games:
+            (q1, median, q3) = np.percentile(self.lengths, [25, 50, 75])
+            msg += (
+                f" | plies: mean {np.mean(self.lengths):.1f}, "
+                f"median {median:.0f} (IQR {q1:.0f}-{q3:.0f}), "
+                f"min {min(self.lengths)}, max {max(self.lengths)}"
+            )
+        return msg
+
+
+def run_selfplay(
+    n_games: int,
+    white: str = "random",
+    black: str = "random",
+    max_plies: int = 200,
+    seed: int = 0,
+    processes: int = None,
+    backend: str = "bitboard",
+    search_options: dict = None,
+    book: str = None,
+    tablebase: str = None,
+    callback: Callable[[GameResult, SelfPlayStats], None] = None,
+) -> List[GameResult]:
+    """Play `n_games` games, the i-th one with seed ``seed + i``.
+
+    Games are dispatched to `processes` worker processes (one per CPU by default, no
+    pool if 1). `callback` is called with each result and the running statistics, as
+    soon as a game finishes. Results are returned in seed order.
+    """
+    stats = SelfPlayStats()
+    options = dict(
+        white=white,
+        black=black,
+        max_plies=max_plies,
+        backend=backend,
+        search_options=search_options,
+        book=book,
+        tablebase=tablebase,
+    )
+
+    def collect(result):
+        stats.add(result)
+        if callback is not None:
+            callback(result, stats)
+        return result
+
+    if processes == 1:
+        results = [collect(play_game(seed + i, **options)) for i in range(n_games)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(play_game, seed + i, **options) for i in range(n_games)
+            ]
+            results = [collect(future.result()) for future in as_completed(futures)]
+    return sorted(results, key=lambda result: result.seed)
+
+
+def main(
+    n_games: int = 100,
+    white: str = "random",
+    black: str = "random",
+    max_plies: int = 200,
+    seed: int = 0,
+    processes: int = None,
+    search_depth: int = 2,
+    report_every: int = 10,
+    pgn: str = None,
+    log: str = None,
+    book: str = None,
+    tablebase: str = None,
+):
+    """Run self-play games and print aggregated results as they come.
+
+    Parameters
+    -----------
+    n_games : int
+        Number of games.
+    white, black : str
+        Strategy of each side ("random", "search" or "mcts").
+    max_plies : int
+        Maximum number of half-moves per game.
+    seed : int
+        Seed of the first game (the i-th game uses seed + i).
+    processes : int
+        Number of worker processes (defaults to the number of CPUs).
+    search_depth : int
+        Depth of the "search" strategy.
+    report_every : int
+        Number of finished games between two progress reports.
+    pgn : str
+        Path of a PGN file the games are appended to, as they finish.
+    log : str
+        Path of a binary game log (see `chess.gamelog`) the games are appended to.
+    book : str
+        Path of an opening book (see `chess.book`) both sides play from.
+    tablebase : str
+        Directory of endgame tables (see `chess.tablebase`) adjudicating games.
+
+    """
+    writer = None if pgn is None else PgnWriter(pgn)
+    log_writer = None if log is None else GameLogWriter(log)
+
+    def report(result, stats):
+        if writer is not None:
+            headers = {"Round": str(result.seed), "White": white, "Black": black}
+            writer.write(result.moves, headers, OUTCOME_RESULTS[result.outcome])
+        if log_writer is not None:
+            log_writer.write(result.moves, result.outcome)
+        if stats.n_games % report_every == 0 or stats.n_games == n_games:
+            print(stats.summary())
+
+    run_selfplay(
+        n_games,
+        white=white,
+        black=black,
+        max_plies=max_plies,
+        seed=seed,
+        processes=processes,
+        search_options={"max_depth": search_depth},
+        book=book,
+        tablebase=tablebase,
+        callback=report,
+    )
+    if writer is not None:
+        writer.close()
+    if log_writer is not None:
+        log_writer.close()
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)
@@ -0,0 +1,369 @@
+"""Asyncio server hosting many concurrent games over TCP.
+
+Clients exchange JSON messages, one per line. Requests carry a client chosen "id"
+echoed in their response, along with "ok" (and "error" if false):
+
+- ``{"id": 1, "type": "create", "white": "human", "black": "search"}`` creates a game
+  (optionally from a "fen") and subscribes to it. Sides are played by clients
+  ("human") or by the engine (a `Player` strategy).
+- ``{"id": 2, "type": "move", "game": 1, "move": "e2e4"}`` plays a UCI move.
+- ``{"id": 3, "type": "subscribe", "game": 1}``, ``"unsubscribe"``, ``"state"`` and
+  ``"close"`` manage and query games.
+
+Subscribers receive ``{"event": "state", "game": 1, "state": {...}}`` after each move.
+Engine moves are computed in an executor so that the event loop never blocks.
+
+Usage: ``python -m chess.server [--port=8765] [--processes=4]``
+"""
+import asyncio
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import count
+from typing import Dict, Optional, Set
+
+
+from .bitboard import Position, move_to_uci
+from .game import Game
+from .players import STRATEGIES, Player
+from .transposition import TranspositionTable
+
+HUMAN = "human"
+# engine players kept by each process computing moves, least recently used first
+MAX_ENGINE_PLAYERS = 16
+
+
+class ServerError(Exception):
+    pass
+
+
+_engine_players: Dict[tuple, Player] = OrderedDict()
+_engine_players_lock = threading.Lock()
+# transposition table of each thread computing engine moves
+_worker = threading.local()
+
+
+def _worker_table() -> TranspositionTable:
+    if not hasattr(_worker, "table"):
+        _worker.table = TranspositionTable()
+    return _worker.table
+
+
+def engine_move(
+    key: tuple, position: Position, strategy: str, search_options: dict = None
+):
+    """Return the move of the engine `Player` of `key` in `position` (run in
+    executors).
+
+    Players are kept from one move to the next by the process computing them. They
+    share the transposition table of the thread computing their move, so that the
+    memory is bounded and evicting a player does not allocate another table.
+    """
+    with _engine_players_lock:
+        player = _engine_players.pop(key, None)
+        if player is None:
+            player = Player(
+                position.turn, strategy=strategy, search_options=search_options
+            )
+        _engine_players[key] = player
+        while len(_engine_players) > MAX_ENGINE_PLAYERS:
+            _engine_players.popitem(last=False)[1].close()
+    player.transposition_table = _worker_table()
+    return player.get_position_move(position)
+
+
+class Session:
+    """A game hosted by the server, with the connections subscribed to it."""
+
+    def __init__(self, game_id: int, game: Game, sides: Dict[str, str]):
+        self.id = game_id
+        self.game = game
+        self.sides = sides
+        # moves are played one at a time, by clients or by the engine
+        self.lock = asyncio.Lock()
+        self.subscribers: Set["Connection"] = set()
+        self.engine_task: Optional[asyncio.Task] = None
+
+    @property
+    def engine_to_move(self) -> bool:
+        return not self.game.is_finished and self.sides[self.game.turn] != HUMAN
+
+    def state(self) -> dict:
+        game = self.game
+        moves = game.moves
+        return {
+            "fen": game.to_fen(),
+            "turn": game.turn,
+            "ply": len(moves),
+            "last_move": move_to_uci(moves[-1]) if moves else None,
+            "is_finished": game.is_finished,
+            "winner": game.winner,
+            "draw": game.draw,
+            **self.sides,
+        }
+
+
+class Connection:
+    """Client connection whose messages are written by a dedicated task.
+
+    Messages wait in a bounded queue: clients that do not read fast enough to keep
+    up are disconnected rather than letting the queue grow.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, queue_size: int):
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.sessions: Set[Session] = set()
+        self.closed = False
+        self.task = asyncio.get_running_loop().create_task(self._write())
+
+    def send(self, message: dict):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.close()
+
+    async def _write(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                if message is None:
+                    break
+                self.writer.write(json.dumps(message).encode() + b"\n")
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+
+    def close(self, discard: bool = True):
+        """Stop sending messages, once those queued are written unless `discard`."""
+        if not self.closed:
+            self.closed = True
+            for session in self.sessions:
+                session.subscribers.discard(self)
+            while (discard or self.queue.full()) and not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class GameServer:
+    """Host games, play engine moves in `executor` (default executor if None)."""
+
+    def __init__(
+        self,
+        executor: Executor = None,
+        max_games: int = 10000,
+        queue_size: int = 256,
+        search_options: dict = None,
+    ):
+        self.executor = executor
+        self.max_games = max_games
+        self.queue_size = queue_size
+        self.search_options = search_options
+        self.sessions: Dict[int, Session] = {}
+        self._ids = count(1)
+        # identifies the engine players of the server in worker processes
+        self.token = uuid.uuid4().hex
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader, writer):
+        connection = Connection(writer, self.queue_size)
+        try:
+            # requests of a connection are handled in order: a client sending
+            # faster than it is served is slowed down by the socket buffers
+            while not connection.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                connection.send(await self.handle_line(line, connection))
+        except ConnectionError:
+            pass
+        finally:
+            connection.close(discard=False)
+            await connection.task
+
+    async def handle_line(self, line: bytes, connection: Connection) -> dict:
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ServerError("Requests must be JSON objects")
+            response = await self.handle_request(request, connection)
+            return {"id": request.get("id"), "ok": True, **response}
+        except (ServerError, ValueError) as e:
+            return {"id": request.get("id"), "ok": False, "error": str(e)}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # a failing request does not drop the connection (and its other games)
+            error = f"Internal error ({type(e).__name__})"
+            return {"id": request.get("id"), "ok": False, "error": error}
+
+    async def handle_request(self, request: dict, connection: Connection) -> dict:
+        request_type = request.get("type")
+        if request_type == "create":
+            session = self.create(request)
+            self.subscribe(session, connection)
+            self.schedule_engine(session)
+            return {"game": session.id, "state": session.state()}
+
+        session = self.get_session(request.get("game"))
+        if request_type == "move":
+            await self.play(session, request.get("move"))
+        elif request_type == "subscribe":
+            self.subscribe(session, connection)
+        elif request_type == "unsubscribe":
+            session.subscribers.discard(connection)
+            connection.sessions.discard(session)
+        elif request_type == "close":
+            self.close(session)
+        elif request_type != "state":
+            raise ServerError(f'Unknown request type "{request_type}"')
+        return {"game": session.id, "state": session.state()}
+
+    def create(self, request: dict) -> Session:
+        if len(self.sessions) >= self.max_games:
+            raise ServerError(f"Too many games ({self.max_games})")
+        sides = {color: request.get(color, HUMAN) for color in ("white", "black")}
+        for strategy in sides.values():
+            if strategy != HUMAN and strategy not in STRATEGIES:
+                raise ServerError(f"Sides must be {HUMAN!r} or in {STRATEGIES}")
+        if "fen" in request:
+            game = Game.from_position(
+                self.parse_position(request["fen"]), backend="bitboard"
+            )
+        else:
+            game = Game.create(backend="bitboard")
+        session = Session(next(self._ids), game, sides)
+        self.sessions[session.id] = session
+        return session
+
+    @staticmethod
+    def parse_position(fen) -> Position:
+        if not isinstance(fen, str):
+            raise ServerError("FEN must be a string")
+        try:
+            position = Position.from_fen(fen)
+        except ValueError as e:
+            raise ServerError(str(e))
+        # the engine would capture the King
+        us = position.side_to_move
+        if position.is_square_attacked(position.king_square(us ^ 1), us):
+            raise ServerError("The side not to move is in check")
+        return position
+
+    def get_session(self, game_id) -> Session:
+        if not isinstance(game_id, int) or game_id not in self.sessions:
+            raise ServerError(f"Unknown game {game_id}")
+        return self.sessions[game_id]
+
+    def subscribe(self, session: Session, connection: Connection):
+        session.subscribers.add(connection)
+        connection.sessions.add(session)
+
+    def close(self, session: Session):
+        self.sessions.pop(session.id, None)
+        if session.engine_task is not None:
+            session.engine_task.cancel()
+        for connection in session.subscribers:
+            connection.sessions.discard(session)
+        session.subscribers.clear()
+
+    def broadcast(self, session: Session):
+        message = {"event": "state", "game": session.id, "state": session.state()}
+        for connection in list(session.subscribers):
+            connection.send(message)
+
+    async def play(self, session: Session, uci: str):
+        async with session.lock:
+            game = session.game
+            if game.is_finished:
+                raise ServerError("The game is finished")
+            if session.sides[game.turn] != HUMAN:
+                raise ServerError(f"{game.turn.capitalize()} is played by the engine")
+            try:
+                move = game.position.parse_uci(str(uci))
+            except (ValueError, IndexError):
+                raise ServerError(f'Invalid move "{uci}"')
+            if move not in game.position.legal_moves():
+                raise ServerError(f'Illegal move "{uci}"')
+            self._next_move(session, move)
+        self.broadcast(session)
+        self.schedule_engine(session)
+
+    def _next_move(self, session: Session, move: Optional[int]):
+        game = session.game
+        game.next_move(move=move, verbose=False)
+        if not game.is_finished and not game.position.has_legal_move():
+            # without a move to play, the game records the mate or stalemate
+            game.next_move(verbose=False)
+
+    def schedule_engine(self, session: Session):
+        if session.engine_to_move and session.engine_task is None:
+            loop = asyncio.get_running_loop()
+            session.engine_task = loop.create_task(self._engine_loop(session))
+
+    async def _engine_loop(self, session: Session):
+        loop = asyncio.get_running_loop()
+        try:
+            while session.engine_to_move and session.id in self.sessions:
+                game = session.game
+                (position, ply) = (game.position.copy(), len(game.moves))
+                move = await loop.run_in_executor(
+                    self.executor,
+                    engine_move,
+                    (self.token, session.id, game.turn),
+                    position,
+                    session.sides[game.turn],
+                    self.search_options,
+                )
+                async with session.lock:
+                    if len(game.moves) != ply or session.id not in self.sessions:
+                        break
+                    self._next_move(session, move)
+                self.broadcast(session)
+        finally:
+            session.engine_task = None
+
+
+def main(host: str = "127.0.0.1", port: int = 8765, processes: int = None):
+    """Serve games until interrupted.
+
+    Parameters
+    -----------
+    host, port : str, int
+        Address the server listens on.
+    processes : int
+        Number of worker processes computing engine moves (threads of the default
+        executor if not given).
+
+    """
+    executor = None if processes is None else ProcessPoolExecutor(processes)
+
+    async def serve():
+        server = await GameServer(executor).start(host, port)
+        print(f"Serving on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)
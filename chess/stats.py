@@ -0,0 +1,188 @@
+"""Opt-in instrumentation of the hot paths of move generation and game play.
+
+`enable` replaces the functions listed in `TARGETS` by wrappers counting their calls,
+cumulative time (children included) and net allocated memory blocks, and `disable`
+puts the original functions back: when disabled, instrumentation costs nothing.
+Nodes are the moves made on boards and positions.
+
+Usage::
+
+    from chess import stats
+
+    stats.enable()
+    ...
+    stats.write_prometheus("/var/lib/node_exporter/chess.prom")
+"""
+import functools
+import json
+import os
+import sys
+import time
+from importlib import import_module
+from typing import Dict
+
+# "module:qualified name" of the instrumented functions
+TARGETS = [
+    "chess.pieces:Piece.get_valid_moves",
+    "chess.moves:is_move_valid",
+    "chess.moves:is_move_safe",
+    "chess.moves:is_in_check",
+    "chess.board:Board.__init__",
+    "chess.board:Board.copy",
+    "chess.board:Board.make_move",
+    "chess.bitboard:Position.legal_moves",
+    "chess.bitboard:Position.make_move",
+    "chess.game:Game.next_move",
+    "chess.search:search",
+]
+NODE_TARGETS = ["chess.board:Board.make_move", "chess.bitboard:Position.make_move"]
+
+# [calls, seconds, allocated blocks] by target
+_counters: Dict[str, list] = {target: [0, 0.0, 0] for target in TARGETS}
+# (owner, attribute name, original function, wrapper) of the installed wrappers
+_patches = []
+_started = None
+_elapsed = 0.0
+
+
+def _wrap(func, counter: list):
+    perf_counter = time.perf_counter
+    allocated_blocks = sys.getallocatedblocks
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        blocks = allocated_blocks()
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += perf_counter() - start
+            counter[2] += allocated_blocks() - blocks
+
+    return wrapper
+
+
+def _resolve(target: str):
+    """Return the (owner, attribute name, function) of `target`."""
+    (module_name, qualname) = target.split(":")
+    owner = import_module(module_name)
+    *path, name = qualname.split(".")
+    for attribute in path:
+        owner = getattr(owner, attribute)
+    return (owner, name, owner.__dict__[name])
+
+
+def is_enabled() -> bool:
+    return _started is not None
+
+
+def enable():
+    """Install the wrappers (in every `chess` module that imported a function)."""
+    global _started
+    if is_enabled():
+        return
+    for target in TARGETS:
+        (owner, name, func) = _resolve(target)
+        wrapper = _wrap(func, _counters[target])
+        owners = [owner]
+        if isinstance(owner, type(sys)):
+            owners += [
+                module
+                for module_name, module in list(sys.modules.items())
+                if module_name.startswith("chess.")
+                and module is not owner
+                and getattr(module, name, None) is func
+            ]
+        for patched in owners:
+            setattr(patched, name, wrapper)
+            _patches.append((patched, name, func, wrapper))
+    _started = time.perf_counter()
+
+
+def disable():
+    """Put the original functions back, keeping the counters."""
+    global _started, _elapsed
+    if not is_enabled():
+        return
+    for owner, name, func, _ in reversed(_patches):
+        setattr(owner, name, func)
+    _patches.clear()
+    _elapsed += time.perf_counter() - _started
+    _started = None
+
+
+def reset():
+    global _elapsed, _started
+    for counter in _counters.values():
+        counter[:] = [0, 0.0, 0]
+    _elapsed = 0.0
+    if is_enabled():
+        _started = time.perf_counter()
+
+
+def snapshot() -> dict:
+    """Return the counters and rates gathered while enabled, since the last reset."""
+    elapsed = _elapsed
+    if is_enabled():
+        elapsed += time.perf_counter() - _started
+    nodes = sum(_counters[target][0] for target in NODE_TARGETS)
+    functions = {}
+    for target, (calls, seconds, blocks) in _counters.items():
+        functions[target] = {
+            "calls": calls,
+            "seconds": seconds,
+            "seconds_per_call": seconds / calls if calls else 0.0,
+            "allocated_blocks": blocks,
+        }
+    return {
+        "pid": os.getpid(),
+        "enabled": is_enabled(),
+        "elapsed": elapsed,
+        "nodes": nodes,
+        "nps": nodes / elapsed if elapsed > 0 else 0.0,
+        "functions": functions,
+    }
+
+
+def to_prometheus(stats: dict = None) -> str:
+    """Format a `snapshot` in the Prometheus text exposition format."""
+    if stats is None:
+        stats = snapshot()
+    pid = f'pid="{stats["pid"]}"'
+    lines = []
+    metrics = [
+        ("calls", "counter", "Number of calls"),
+        ("seconds", "counter", "Cumulative time spent in calls"),
+        ("allocated_blocks", "counter", "Net number of memory blocks allocated"),
+    ]
+    for key, kind, help_text in metrics:
+        name = f"chess_function_{key}_total"
+        lines += [f"# HELP {name} {help_text}.", f"# TYPE {name} {kind}"]
+        for target, values in stats["functions"].items():
+            lines.append(f'{name}{{{pid},function="{target}"}} {values[key]}')
+    lines += [
+        "# HELP chess_nodes_total Number of moves made on boards and positions.",
+        "# TYPE chess_nodes_total counter",
+        f"chess_nodes_total{{{pid}}} {stats['nodes']}",
+        "# HELP chess_nodes_per_second Nodes per second while instrumented.",
+        "# TYPE chess_nodes_per_second gauge",
+        f"chess_nodes_per_second{{{pid}}} {stats['nps']}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: str, text: str):
+    # collectors never read a partially written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_json(path: str):
+    _write_atomic(path, json.dumps(snapshot(), indent=2))
+
+
+def write_prometheus(path: str):
+    _write_atomic(path, to_prometheus())
@@ -0,0 +1,486 @@
+"""Endgame tablebases, solved by retrograde analysis.
+
+A table covers the positions of a material set where one side is left with its King
+alone, such as KQK, KRK, KPK or KBNK (the strong side pieces, in "QRBNP" order, come
+between the two Kings). Tables are computed with the strong side playing white and
+probed with colors and ranks swapped when it plays black. The index of a position is
+``((side * 64 + K) * 64 + k) * 64 + ...`` with the squares of the white King, of the
+black King, then of the other white pieces.
+
+Each entry is a distance to mate: 0 for a draw, otherwise ``plies + 1``, where `plies`
+is the number of half-moves to mate with best play, positive when the side to move
+wins and negative when it loses. Tables are saved as ``<material>.npy`` files and
+memory-mapped when probed.
+
+Usage: ``python -m chess.tablebase KQK KRK KPK [--directory=tablebases]``
+"""
+import functools
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .bitboard import (
+    BISHOP,
+    BLACK,
+    EAST,
+    KING,
+    KING_ATTACKS,
+    KNIGHT,
+    KNIGHT_ATTACKS,
+    NORTH,
+    NORTH_EAST,
+    NORTH_WEST,
+    PAWN,
+    PAWN_ATTACKS,
+    PIECE_SYMBOLS,
+    QUEEN,
+    ROOK,
+    SOUTH,
+    SOUTH_EAST,
+    SOUTH_WEST,
+    WEST,
+    WHITE,
+    Position,
+    iter_bits,
+)
+
+PIECE_ORDER = "QRBNP"
+PROMOTIONS = [QUEEN, ROOK, BISHOP, KNIGHT]
+ILLEGAL = np.iinfo(np.int16).min
+CHUNK_SIZE = 2**16
+
+
+def _leaper_targets(attacks: List[int]) -> np.ndarray:
+    """(64, 8) squares reached from each square, -1 padded."""
+    targets = np.full((64, 8), -1, dtype=np.int64)
+    for square in range(64):
+        squares = list(iter_bits(attacks[square]))
+        targets[square, : len(squares)] = squares
+    return targets
+
+
+def _ray_targets(rays: List[List[int]]) -> np.ndarray:
+    """(64, n rays, 7) squares along each ray, nearest first, -1 padded."""
+    targets = np.full((64, len(rays), 7), -1, dtype=np.int64)
+    for square in range(64):
+        for i, ray in enumerate(rays):
+            squares = sorted(iter_bits(ray[square]), key=lambda s: abs(s - square))
+            targets[square, i, : len(squares)] = squares
+    return targets
+
+
+def _line_tables(rays: List[List[int]]):
+    """(64, 64) masks of whether two squares share a ray and of the squares between."""
+    aligned = np.zeros((64, 64), dtype=bool)
+    between = np.zeros((64, 64), dtype=np.uint64)
+    for ray in rays:
+        for square in range(64):
+            for target in iter_bits(ray[square]):
+                aligned[square, target] = True
+                between[square, target] = ray[square] ^ ray[target] ^ (1 << target)
+    return (aligned, between)
+
+
+def _attack_matrix(attacks: List[int]) -> np.ndarray:
+    matrix = np.zeros((64, 64), dtype=bool)
+    for square in range(64):
+        matrix[square, list(iter_bits(attacks[square]))] = True
+    return matrix
+
+
+ROOK_RAYS = [NORTH, EAST, SOUTH, WEST]
+BISHOP_RAYS = [NORTH_EAST, NORTH_WEST, SOUTH_WEST, SOUTH_EAST]
+
+
+class MoveTables(NamedTuple):
+    king_targets: np.ndarray
+    leaper_targets: Dict[int, np.ndarray]
+    slider_targets: Dict[int, np.ndarray]
+    leaper_attacks: Dict[int, np.ndarray]
+    slider_lines: Dict[int, list]
+
+
+@functools.lru_cache(maxsize=None)
+def move_tables() -> MoveTables:
+    """Move and attack tables of the solver, built the first time a table is solved
+    (probing does not need them)."""
+    king_targets = _leaper_targets(KING_ATTACKS)
+    rook_lines = _line_tables(ROOK_RAYS)
+    bishop_lines = _line_tables(BISHOP_RAYS)
+    return MoveTables(
+        king_targets=king_targets,
+        leaper_targets={KING: king_targets, KNIGHT: _leaper_targets(KNIGHT_ATTACKS)},
+        slider_targets={
+            BISHOP: _ray_targets(BISHOP_RAYS),
+            ROOK: _ray_targets(ROOK_RAYS),
+            QUEEN: _ray_targets(ROOK_RAYS + BISHOP_RAYS),
+        },
+        leaper_attacks={
+            PAWN: _attack_matrix(PAWN_ATTACKS[WHITE]),
+            KNIGHT: _attack_matrix(KNIGHT_ATTACKS),
+            KING: _attack_matrix(KING_ATTACKS),
+        },
+        slider_lines={
+            BISHOP: [bishop_lines],
+            ROOK: [rook_lines],
+            QUEEN: [rook_lines, bishop_lines],
+        },
+    )
+
+
+def parse_material(material: str) -> List[int]:
+    """Return the types of the strong side pieces (but the King) of `material`."""
+    symbols = material.upper()
+    if len(symbols) < 2 or symbols[0] != "K" or symbols[-1] != "K":
+        raise ValueError(f'Invalid material "{material}", expected e.g. "KQK"')
+    if any(symbol not in PIECE_ORDER for symbol in symbols[1:-1]):
+        raise ValueError(f'Invalid material "{material}", expected e.g. "KQK"')
+    return sorted(
+        (PIECE_SYMBOLS.index(symbol) for symbol in symbols[1:-1]),
+        key=lambda piece_type: PIECE_ORDER.index(PIECE_SYMBOLS[piece_type]),
+    )
+
+
+def material_name(types: List[int]) -> str:
+    symbols = sorted(PIECE_SYMBOLS[piece_type] for piece_type in types)
+    return "K" + "".join(sorted(symbols, key=PIECE_ORDER.index)) + "K"
+
+
+def dependencies(types: List[int]) -> List[str]:
+    """Material sets reached by capturing or promoting a piece of `types`."""
+    names = []
+    for i, piece_type in enumerate(types):
+        others = types[:i] + types[i + 1 :]
+        names.append(material_name(others))
+        if piece_type == PAWN:
+            names.extend(material_name(others + [promoted]) for promoted in PROMOTIONS)
+    return sorted(set(names))
+
+
+def _square_mask(square: np.ndarray) -> np.ndarray:
+    return np.left_shift(np.uint64(1), square.astype(np.uint64))
+
+
+def _is_attacked(target, types, squares, occupied) -> np.ndarray:
+    """Whether `target` squares are attacked by white pieces of `types` on `squares`."""
+    tables = move_tables()
+    attacked = np.zeros(len(target), dtype=bool)
+    for piece_type, square in zip(types, squares):
+        if piece_type in tables.leaper_attacks:
+            attacked |= tables.leaper_attacks[piece_type][square, target]
+        else:
+            for aligned, between in tables.slider_lines[piece_type]:
+                blocked = (between[square, target] & occupied) != 0
+                attacked |= aligned[square, target] & ~blocked
+    return attacked
+
+
+class _Solver:
+    """Retrograde analysis of one material set, given its solved dependencies."""
+
+    def __init__(self, types: List[int], subtables: Dict[str, np.ndarray]):
+        self.types = types
+        self.name = material_name(types)
+        self.n_pieces = len(types) + 2
+        self.n_placements = 64**self.n_pieces
+        self.subtables = subtables
+        self.tables = move_tables()
+        self.values = np.zeros(2 * self.n_placements, dtype=np.int16)
+        # whether the black King is attacked, by placement
+        self.attacked = np.zeros(self.n_placements, dtype=bool)
+
+    def decode(self, index: np.ndarray) -> List[np.ndarray]:
+        """Return the squares of the pieces of positions `index`."""
+        return [
+            (index >> (6 * (self.n_pieces - 1 - i))) & 63 for i in range(self.n_pieces)
+        ]
+
+    def lookup(self, types, side, squares) -> np.ndarray:
+        """Values of the positions of (possibly other) material `types`."""
+        order = sorted(
+            range(len(types)),
+            key=lambda i: PIECE_ORDER.index(PIECE_SYMBOLS[types[i]]),
+        )
+        name = material_name(types)
+        values = self.values if name == self.name else self.subtables[name]
+        index = side
+        for square in squares[:2] + [squares[2 + i] for i in order]:
+            index = index * 64 + square
+        return values[index]
+
+    def mark_illegal(self):
+        """Flag overlapping pieces, adjacent Kings, pawns on the first or last rank,
+        and positions where the side not to move is in check."""
+        all_types = [KING, KING] + self.types
+        for start in range(0, self.n_placements, CHUNK_SIZE):
+            placement = np.arange(start, min(start + CHUNK_SIZE, self.n_placements))
+            squares = self.decode(placement)
+            illegal = self.tables.leaper_attacks[KING][squares[0], squares[1]]
+            for i in range(self.n_pieces):
+                for j in range(i):
+                    illegal |= squares[i] == squares[j]
+                if all_types[i] == PAWN:
+                    illegal |= (squares[i] < 8) | (squares[i] >= 56)
+            occupied = np.zeros(len(placement), dtype=np.uint64)
+            for i in range(self.n_pieces):
+                if i != 1:
+                    occupied |= _square_mask(squares[i])
+            attacked = _is_attacked(
+                squares[1],
+                [KING] + self.types,
+                [squares[0]] + squares[2:],
+                occupied,
+            )
+            self.attacked[placement] = attacked
+            self.values[placement[illegal | attacked]] = ILLEGAL
+            self.values[self.n_placements + placement[illegal]] = ILLEGAL
+
+    def white_successors(self, index: np.ndarray):
+        """Yield (rows, values) of the legal moves of white to move positions
+        `index`: each row of `index` occurs at most once per yielded pair."""
+        squares = self.decode(index)
+
+        def occupied(target):
+            found = target < 0
+            for square in squares:
+                found |= target == square
+            return found
+
+        def successors(mask, i, target, types=self.types):
+            rows = np.flatnonzero(mask)
+            moved = [square[rows] for square in squares]
+            moved[i] = target[rows]
+            values = self.lookup(types, BLACK, moved)
+            legal = values != ILLEGAL
+            return (rows[legal], values[legal])
+
+        for i, piece_type in enumerate([KING, None] + self.types):
+            if i == 1:
+                continue
+            square = squares[i]
+            if piece_type in self.tables.leaper_targets:
+                targets = self.tables.leaper_targets[piece_type][square]
+                for j in range(targets.shape[1]):
+                    target = targets[:, j]
+                    yield successors(~occupied(target), i, target)
+            elif piece_type in self.tables.slider_targets:
+                rays = self.tables.slider_targets[piece_type][square]
+                for j in range(rays.shape[1]):
+                    free = np.ones(len(index), dtype=bool)
+                    for distance in range(rays.shape[2]):
+                        target = rays[:, j, distance]
+                        free &= ~occupied(target)
+                        if not free.any():
+                            break
+                        yield successors(free, i, target)
+            else:
+                target = square + 8
+                free = ~occupied(target)
+                promoted = target >= 56
+                yield successors(free & ~promoted, i, target)
+                for promotion in PROMOTIONS:
+                    types = list(self.types)
+                    types[i - 2] = promotion
+                    yield successors(free & promoted, i, target, types)
+                target = square + 16
+                double = free & (square < 16) & ~occupied(target)
+                yield successors(double, i, target)
+
+    def black_successors(self, index: np.ndarray):
+        """Yield (rows, values) of the legal moves of the black to move positions
+        `index`."""
+        squares = self.decode(index)
+        targets = self.tables.king_targets[squares[1]]
+        for j in range(targets.shape[1]):
+            target = targets[:, j]
+            moves = (target >= 0) & (target != squares[0])
+            captures = []
+            for i in range(2, self.n_pieces):
+                capture = moves & (target == squares[i])
+                moves &= ~capture
+                captures.append((i, capture))
+            for i, mask in [(None, moves)] + captures:
+                rows = np.flatnonzero(mask)
+                moved = [square[rows] for square in squares]
+                moved[1] = target[rows]
+                types = self.types
+                if i is not None:
+                    types = self.types[: i - 2] + self.types[i - 1 :]
+                    del moved[i]
+                values = self.lookup(types, WHITE, moved)
+                legal = values != ILLEGAL
+                yield (rows[legal], values[legal])
+
+    def solve(self) -> np.ndarray:
+        self.mark_illegal()
+        # results of the subtables can only be reached after as many plies
+        horizon = max(
+            (
+                int(np.abs(table[table != ILLEGAL].astype(np.int64)).max(initial=0))
+                for table in self.subtables.values()
+            ),
+            default=0,
+        )
+        (plies, last_change) = (0, 0)
+        while plies <= max(horizon, last_change + 2):
+            if self.step(plies):
+                last_change = plies
+            plies += 1
+        return self.values
+
+    def step(self, plies: int) -> bool:
+        """Resolve the positions won (odd `plies`) or lost (even `plies`) in `plies`
+        half-moves. Only values of the other side to move are read."""
+        side = WHITE if plies % 2 else BLACK
+        half = self.values[side * self.n_placements : (side + 1) * self.n_placements]
+        unresolved = np.flatnonzero(half == 0)
+        changed = False
+        for start in range(0, len(unresolved), CHUNK_SIZE):
+            placement = unresolved[start : start + CHUNK_SIZE]
+            index = placement + side * self.n_placements
+            if side == WHITE:
+                won = np.zeros(len(index), dtype=bool)
+                for rows, values in self.white_successors(index):
+                    won[rows[values == -plies]] = True
+                (resolved, value) = (placement[won], plies + 1)
+            else:
+                legal = np.zeros(len(index), dtype=np.int64)
+                lost = np.zeros(len(index), dtype=np.int64)
+                for rows, values in self.black_successors(index):
+                    legal[rows] += 1
+                    lost[rows] += (values >= 2) & (values <= plies)
+                if plies == 0:
+                    mated = (legal == 0) & self.attacked[placement]
+                else:
+                    mated = (legal > 0) & (lost == legal)
+                (resolved, value) = (placement[mated], -(plies + 1))
+            half[resolved] = value
+            changed |= len(resolved) > 0
+        return changed
+
+
+def table_path(directory: str, material: str) -> str:
+    return os.path.join(directory, material_name(parse_material(material)) + ".npy")
+
+
+def generate(material: str, directory: str, verbose: bool = False) -> np.ndarray:
+    """Solve the table of `material` and save it to `directory`, along with the
+    tables it depends on. Tables already saved are loaded instead."""
+    path = table_path(directory, material)
+    if os.path.exists(path):
+        return np.load(path, mmap_mode="r")
+    types = parse_material(material)
+    subtables = {
+        name: generate(name, directory, verbose=verbose) for name in dependencies(types)
+    }
+    if verbose:
+        print(f"Solving {material_name(types)}")
+    values = _Solver(types, subtables).solve()
+    os.makedirs(directory, exist_ok=True)
+    np.save(path, values)
+    return values
+
+
+class Tablebase:
+    """Tables of a directory, memory-mapped the first time they are probed."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._tables = {}
+
+    def table(self, material: str) -> Optional[np.ndarray]:
+        if material not in self._tables:
+            path = os.path.join(self.directory, material + ".npy")
+            table = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+            self._tables[material] = table
+        return self._tables[material]
+
+    def index(self, position: Position):
+        """Return the (material, index) of `position`, or None if it has no table."""
+        if position.castling:
+            return None
+        counts = [
+            sum(bin(position.bitboards[color * 6 + t]).count("1") for t in range(5))
+            for color in (WHITE, BLACK)
+        ]
+        if counts[BLACK] == 0:
+            (strong, flip) = (WHITE, 0)
+        elif counts[WHITE] == 0:
+            (strong, flip) = (BLACK, 56)
+        else:
+            return None
+        weak = 1 - strong
+        types = []
+        squares = []
+        for piece_type in range(5):
+            for square in iter_bits(position.bitboards[strong * 6 + piece_type]):
+                types.append(piece_type)
+                squares.append(square ^ flip)
+        order = sorted(
+            range(len(types)),
+            key=lambda i: PIECE_ORDER.index(PIECE_SYMBOLS[types[i]]),
+        )
+        index = position.side_to_move ^ strong
+        for square in [
+            position.king_square(strong) ^ flip,
+            position.king_square(weak) ^ flip,
+        ] + [squares[i] for i in order]:
+            index = index * 64 + square
+        return (material_name(types), index)
+
+    def probe(self, position: Position) -> Optional[int]:
+        """Return the distance to mate of `position` (see module docstring), or None
+        if it is not covered."""
+        found = self.index(position)
+        if found is None:
+            return None
+        table = self.table(found[0])
+        if table is None:
+            return None
+        value = int(table[found[1]])
+        return None if value == ILLEGAL else value
+
+    def best_move(self, position: Position) -> Optional[int]:
+        """Return the move leading to the fastest mate, to the longest resistance when
+        losing, or keeping the draw. Return None if a successor is not covered."""
+        if self.probe(position) is None:
+            return None
+        best = None
+        for move in position.iter_legal_moves():
+            undo = position.make_move(move)
+            value = self.probe(position)
+            position.unmake_move(undo)
+            if value is None:
+                return None
+            # from the point of view of the side to move: won, drawn then lost
+            score = (2, value) if value < 0 else (1, 0) if value == 0 else (0, value)
+            if best is None or score > best[0]:
+                best = (score, move)
+        return None if best is None else best[1]
+
+
+def main(*materials: str, directory: str = "tablebases"):
+    """Generate endgame tables.
+
+    Parameters
+    -----------
+    materials : str
+        Material sets to solve, such as "KQK" or "KBNK".
+    directory : str
+        Directory the tables are saved to.
+
+    """
+    for material in materials:
+        table = generate(material, directory, verbose=True)
+        values = table[table != ILLEGAL]
+        print(
+            f"{material}: {len(values)} positions, {np.mean(values > 0):.1%} won, "
+            f"longest mate in {int(values.max()) - 1} plies"
+        )
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)
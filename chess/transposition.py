@@ -0,0 +1,128 @@
+"""Transposition table."""
+import numpy as np
+
+# bound types of the stored scores (0 marks an empty entry)
+EMPTY = 0
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+POLICIES = ["depth", "always"]
+
+ENTRY_DTYPE = np.dtype(
+    [
+        ("key", np.uint64),
+        ("score", np.int32),
+        ("move", np.uint16),
+        ("depth", np.int8),
+        ("bound", np.uint8),
+        ("age", np.uint8),
+    ]
+)
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results, keyed by Zobrist keys.
+
+    Entries are stored in a preallocated NumPy structured array of `size_mb`
+    megabytes, indexed by the low bits of the key. With the "depth" policy, an entry
+    is only replaced by a search at least as deep (or by any entry of a later
+    search); with the "always" policy, the latest entry always wins.
+    """
+
+    def __init__(self, size_mb: float = 16, policy: str = "depth"):
+        if policy not in POLICIES:
+            raise ValueError(f"`policy` must be in {POLICIES}")
+        self.policy = policy
+
+        n_entries = int(size_mb * 2**20) // ENTRY_DTYPE.itemsize
+        if n_entries < 1:
+            raise ValueError("`size_mb` is too small to hold a single entry")
+        # round down to a power of two, so that indexing is a simple mask
+        n_entries = 1 << (n_entries.bit_length() - 1)
+        self.mask = n_entries - 1
+        self.entries = np.zeros(n_entries, dtype=ENTRY_DTYPE)
+        # entries written before the last call to `new_search` are always replaced
+        self.age = 0
+
+        # field views, avoiding the creation of a record at each access
+        self._keys = self.entries["key"]
+        self._scores = self.entries["score"]
+        self._moves = self.entries["move"]
+        self._depths = self.entries["depth"]
+        self._bounds = self.entries["bound"]
+        self._ages = self.entries["age"]
+
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def size_mb(self) -> float:
+        return self.entries.nbytes / 2**20
+
+    def clear(self):
+        self.entries[:] = 0
+        self.age = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.probes = self.hits = self.cutoffs = self.stores = self.overwrites = 0
+
+    def new_search(self):
+        """Mark every entry as coming from a previous search."""
+        self.age = (self.age + 1) % 256
+
+    def probe(self, key: int):
+        """Return the (depth, bound, score, move) entry of `key`, or None."""
+        self.probes += 1
+        index = key & self.mask
+        if self._bounds[index] == EMPTY or int(self._keys[index]) != key:
+            return None
+        self.hits += 1
+        move = int(self._moves[index])
+        return (
+            int(self._depths[index]),
+            int(self._bounds[index]),
+            int(self._scores[index]),
+            move if move else None,
+        )
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: int = None):
+        index = key & self.mask
+        if self._bounds[index] != EMPTY:
+            same_key = int(self._keys[index]) == key
+            if (
+                self.policy == "depth"
+                and self._ages[index] == self.age
+                and depth < self._depths[index]
+            ):
+                return
+            if not same_key:
+                self.overwrites += 1
+            elif move is None:
+                # keep the best move of a previous search of the same position
+                move = int(self._moves[index]) or None
+        self.stores += 1
+        self._keys[index] = key
+        self._depths[index] = depth
+        self._bounds[index] = bound
+        self._scores[index] = score
+        self._moves[index] = 0 if move is None else move
+        self._ages[index] = self.age
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "used": int(np.count_nonzero(self._bounds)),
+            "probes": self.probes,
+            "hits": self.hits,
+            "cutoffs": self.cutoffs,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+        }
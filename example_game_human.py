@@ -16,6 +16,11 @@ computer_side = "white" if randint(0, 1) == 1 else "black"
 if verbose:
     print(f"Computer plays with the {computer_side}s")
 
+# computer searches the best move for 2 seconds
+computer = game.get_player(computer_side)
+computer.strategy = "search"
+computer.search_options = {"time_limit": 2}
+
 
 # show board in init state
 if show:
@@ -33,6 +38,12 @@ for i in range(n_moves):
     # computer play
     if game.turn == computer_side:
         game.next_move(verbose=verbose)
+        if verbose and computer.last_search is not None:
+            result = computer.last_search
+            print(
+                f"Searched depth {result.depth}: {result.nodes} nodes "
+                f"in {result.time:.2f}s ({result.nps:.0f} nodes/s)"
+            )
         if show:
             game.show_board()
     # user play
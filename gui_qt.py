@@ -1,15 +1,15 @@
 """Graphical User Interface (GUI) based on PyQt library."""
 import sys
-import time
 from functools import partial
 from random import randint
+from threading import Event
 from typing import List
 
 import fire
 import numpy as np
 from playsound import playsound
 from pygame import mixer
-from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtCore import QObject, QSize, Qt, QThread, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWidgets import (
     QApplication,
@@ -24,13 +24,16 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from chess.bitboard import Position
 from chess.coords import coords_to_loc, coords_to_np_coords, np_coords_to_coords
 from chess.game import Game
 from chess.moves import Move
 from chess.pieces import Piece
 from chess.plot import BACKGROUND, CMAP
+from chess.search import MAX_DEPTH, search
+from chess.transposition import TranspositionTable
 
-COMPUTER_LATENCY = 2  # seconds
+COMPUTER_LATENCY = 2  # seconds of search per move
 
 
 from threading import Thread
@@ -62,8 +65,46 @@ def play_notify_sound():
     notify_sound.play()
 
 
+class EngineWorker(QObject):
+    """Search computer moves in the thread the worker is moved to.
+
+    Searches are requested with a `threading.Event`, set by the UI thread to cancel
+    them. The transposition table is kept from one search to the next: pondering
+    (searching the predicted reply of the human) fills it while the human thinks.
+    """
+
+    # request id, `SearchResult`
+    move_found = pyqtSignal(int, object)
+
+    def __init__(self, search_options: dict):
+        super().__init__()
+        self.search_options = search_options
+        self.table = TranspositionTable()
+
+    @pyqtSlot(int, object, object)
+    def think(self, request_id: int, position: Position, stop: Event):
+        result = search(position, table=self.table, stop=stop, **self.search_options)
+        if not stop.is_set():
+            self.move_found.emit(request_id, result)
+
+    @pyqtSlot(object, object)
+    def ponder(self, position: Position, stop: Event):
+        """Search the position after the predicted reply until `stop` is set."""
+        entry = self.table.probe(position.key)
+        if entry is None or entry[3] not in position.legal_moves():
+            return
+        position.make_move(entry[3])
+        search(position, max_depth=MAX_DEPTH, table=self.table, stop=stop)
+
+
 class CheckerBoard(QMainWindow):
-    def __init__(self, play_against_computer: bool):
+
+    # request id, position, stop event
+    think_requested = pyqtSignal(int, object, object)
+    # position, stop event
+    ponder_requested = pyqtSignal(object, object)
+
+    def __init__(self, play_against_computer: bool, ponder: bool = False):
         """View initializer."""
         super().__init__()
 
@@ -78,6 +119,23 @@ class CheckerBoard(QMainWindow):
 
         # create chess game
         self.game = Game.create()
+        if self.play_against_computer:
+            computer = self.game.get_player(self.computer_color)
+            computer.strategy = "search"
+            computer.search_options = {"time_limit": COMPUTER_LATENCY}
+
+            # the computer moves are searched in another thread, to keep the UI
+            # responsive
+            self.ponder = ponder
+            self.request_id = 0
+            self.stop_event = Event()
+            self.engine_thread = QThread(self)
+            self.engine = EngineWorker(computer.search_options)
+            self.engine.moveToThread(self.engine_thread)
+            self.think_requested.connect(self.engine.think)
+            self.ponder_requested.connect(self.engine.ponder)
+            self.engine.move_found.connect(self.play_computer_move)
+            self.engine_thread.start()
 
         self.selected_piece: Piece = None
         self.valid_moves: List[Move] = None
@@ -111,6 +169,10 @@ class CheckerBoard(QMainWindow):
         self.history_layout.addWidget(history_title_label)
         self.history_layout.addWidget(self.history_content_label)
         self.history_layout.addStretch(1)
+        takeback_button = QPushButton("Take back")
+        takeback_button.setFixedWidth(140)
+        takeback_button.clicked.connect(self.takeback)
+        self.history_layout.addWidget(takeback_button)
 
         self.main_layout = QGridLayout()
         self.main_layout.setSpacing(10)
@@ -162,13 +224,73 @@ class CheckerBoard(QMainWindow):
         thread = Thread(target=target)
         thread.start()
 
+    def stop_engine(self):
+        """Cancel the current search, if any: its result will be ignored."""
+        self.stop_event.set()
+        self.stop_event = Event()
+        self.request_id += 1
+
     def computer_play(self):
-        time.sleep(COMPUTER_LATENCY)
-        captured_piece = self.game.next_move()
+        """Request a move from the engine, played by `play_computer_move`."""
+        self.stop_engine()
+        self.think_requested.emit(
+            self.request_id, self.game.position.copy(), self.stop_event
+        )
+
+    def play_computer_move(self, request_id: int, result):
+        if request_id != self.request_id:
+            return
+        if result.move is None:
+            # no legal move: let the game record its end
+            captured_piece = self.game.next_move(verbose=False)
+        else:
+            captured_piece = self.game.next_move(move=result.move, verbose=False)
         self.play_sound_effect(sound_type="capture" if captured_piece else "move")
         self.update_layout()
+        if self.check_end_of_game():
+            return
+        if self.ponder:
+            self.stop_engine()
+            self.ponder_requested.emit(self.game.position.copy(), self.stop_event)
+
+    def check_end_of_game(self) -> bool:
+        if not self.game.is_finished:
+            return False
+        if self.game.draw:
+            QMessageBox.information(self, "End of the game", "Draw!")
+        else:
+            QMessageBox.information(
+                self, "End of the game", f"{self.game.winner} won the game!"
+            )
+        self.close()
+        return True
+
+    def closeEvent(self, event):
+        if self.play_against_computer:
+            self.stop_engine()
+            self.engine_thread.quit()
+            self.engine_thread.wait()
+        super().closeEvent(event)
+
+    def takeback(self):
+        if len(self.game.history) == 0:
+            return
+        if self.play_against_computer:
+            self.stop_engine()
+        self.game.takeback()
+        # when playing against computer, take back moves until it is human's turn
+        if self.play_against_computer:
+            while self.game.turn == self.computer_color and len(self.game.history):
+                self.game.takeback()
+        self.selected_piece = None
+        self.valid_moves = None
+        self.update_layout()
+        if self.play_against_computer and self.game.turn == self.computer_color:
+            self.computer_play()
 
     def select_cell(self, i, j):
+        if self.play_against_computer and self.game.turn == self.computer_color:
+            return
 
         loc = coords_to_loc(np_coords_to_coords(i, j))
 
@@ -188,15 +310,7 @@ class CheckerBoard(QMainWindow):
                 self.select_move(i, j)
 
         self.update_layout()
-
-        if self.game.is_finished:
-            if self.game.draw:
-                QMessageBox.information(self, "End of the game", "Draw!")
-            else:
-                QMessageBox.information(
-                    self, "End of the game", f"{self.game.winner} won the game!"
-                )
-            sys.exit()
+        self.check_end_of_game()
 
     def select_piece(self, piece: Piece):
         self.selected_piece = piece
@@ -210,7 +324,9 @@ class CheckerBoard(QMainWindow):
             move = self.selected_piece.get_move(
                 coords_to_loc(np_coords_to_coords(i, j)), self.game.board
             )
-            captured_piece = self.game.next_move(move=(self.selected_piece, move))
+            captured_piece = self.game.next_move(
+                move=(self.selected_piece, move), verbose=False
+            )
             self.play_sound_effect(sound_type="capture" if captured_piece else "move")
             self.selected_piece = None
             self.valid_moves = None
@@ -302,13 +418,20 @@ class CheckerBoard(QMainWindow):
                 """
                 )
 
+        # remove pieces put back on the board by a takeback
+        for layout, captured_pieces in [
+            (self.white_captured_pieces_layout, self.game.white_player.captured_pieces),
+            (self.black_captured_pieces_layout, self.game.black_player.captured_pieces),
+        ]:
+            while layout.count() - 2 > len(captured_pieces):
+                layout.takeAt(layout.count() - 3).widget().deleteLater()
+
         if self.game.white_player.captured_pieces:
             for i in range(
                 self.white_captured_pieces_layout.count() - 2,
                 len(self.game.white_player.captured_pieces),
             ):
                 captured_piece = self.game.white_player.captured_pieces[i]
-                print("White captured piece ", i, captured_piece)
                 captured_piece_label = QLabel()
                 captured_piece_pixmap = QPixmap(get_piece_img(str(captured_piece)))
                 captured_piece_label.setPixmap(captured_piece_pixmap.scaled(20, 20))
@@ -320,7 +443,6 @@ class CheckerBoard(QMainWindow):
                 len(self.game.black_player.captured_pieces),
             ):
                 captured_piece = self.game.black_player.captured_pieces[i]
-                print("Black captured piece ", i, captured_piece)
                 captured_piece_label = QLabel()
                 captured_piece_pixmap = QPixmap(get_piece_img(str(captured_piece)))
                 captured_piece_label.setPixmap(captured_piece_pixmap.scaled(20, 20))
@@ -356,12 +478,15 @@ def get_piece_img(piece_name):
     return piece_img_path
 
 
-def main(play_against_computer: bool = False):
+def main(play_against_computer: bool = False, ponder: bool = False):
     # create an instance of QApplication
     app = QApplication(sys.argv)
 
+    # hand the interpreter over to the UI thread often, while the engine searches
+    sys.setswitchinterval(0.001)
+
     # show the chess GUI
-    view = CheckerBoard(play_against_computer)
+    view = CheckerBoard(play_against_computer, ponder=ponder)
 
     # execute the chess main loop
     sys.exit(app.exec_())
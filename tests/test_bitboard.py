@@ -0,0 +1,145 @@
+"""Test bitboard Position class."""
+import pytest
+from chess.bitboard import (
+    BLACK,
+    PACKED_SIZE,
+    WHITE,
+    Position,
+    iter_bits,
+    move_to_uci,
+    parse_square,
+    square_name,
+)
+from chess.game import Game
+
+
+def perft(position, depth):
+    if depth == 0:
+        return 1
+    nodes = 0
+    for move in position.legal_moves():
+        undo = position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.unmake_move(undo)
+    return nodes
+
+
+@pytest.mark.parametrize("depth, nodes", ((1, 20), (2, 400), (3, 8902)))
+def test_initial_position_move_counts(depth, nodes):
+    assert perft(Position.initial(), depth) == nodes
+
+
+def test_position_from_board():
+    game = Game.create()
+    position = Position.from_board(game.board, turn=game.turn)
+    initial = Position.initial()
+    assert position.bitboards == initial.bitboards
+    assert position.squares == initial.squares
+    assert position.castling == initial.castling == 15
+    assert position.ep_square is None
+
+
+def test_squares():
+    assert square_name(0) == "a1" and square_name(63) == "h8"
+    assert parse_square("e4") == 28
+    for name in ("i9", "", "+", "e44"):
+        with pytest.raises(ValueError):
+            parse_square(name)
+
+
+def test_push_en_passant():
+    position = Position.initial()
+    for uci in ("e2e4", "a7a6", "e4e5", "d7d5"):
+        (move,) = [m for m in position.legal_moves() if move_to_uci(m) == uci]
+        position.make_move(move)
+    assert position.ep_square == parse_square("d6")
+    ep_moves = [m for m in position.legal_moves() if move_to_uci(m) == "e5d6"]
+    assert len(ep_moves) == 1
+    position.make_move(ep_moves[0])
+    assert position.piece_at(parse_square("d5")) is None
+
+
+def test_game_bitboard_backend():
+    game = Game.create(backend="bitboard")
+    for _ in range(20):
+        game.next_move(verbose=False)
+    position = Position.from_board(game.board, turn=game.turn)
+    assert position.bitboards == game.position.bitboards
+
+
+def test_attackers_of():
+    position = Position.initial()
+    attackers = position.attackers_of(parse_square("f3"), WHITE)
+    assert sorted(square_name(sq) for sq in iter_bits(attackers)) == ["e2", "g1", "g2"]
+    assert position.is_square_attacked(parse_square("f3"), WHITE)
+    assert not position.is_square_attacked(parse_square("f3"), BLACK)
+
+
+def play(position, *ucis):
+    for uci in ucis:
+        (move,) = [m for m in position.legal_moves() if move_to_uci(m) == uci]
+        position.make_move(move)
+    return position
+
+
+def test_zobrist_key():
+    initial = Position.initial()
+    assert initial.key == initial.compute_key()
+
+    # transpositions lead to the same key
+    position1 = play(Position.initial(), "e2e4", "e7e5", "g1f3")
+    position2 = play(Position.initial(), "g1f3", "e7e5", "e2e4")
+    assert position1.key == position2.key == position1.compute_key()
+    position = play(Position.initial(), "g1f3", "g8f6", "f3g1", "f6g8")
+    assert position.key == initial.key
+
+    # castling rights are part of the key
+    position1 = play(Position.initial(), "g1f3", "g8f6", "h1g1", "f6g8", "g1h1")
+    position1 = play(position1, "g8f6", "f3g1", "f6g8")
+    position2 = play(Position.initial(), "g1f3", "g8f6", "f3g1", "f6g8")
+    assert position1.bitboards == position2.bitboards
+    assert position1.key != position2.key
+
+
+def test_position_from_fen():
+    initial = Position.from_fen(
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+    )
+    assert initial.squares == Position.initial().squares
+    assert initial.key == Position.initial().key
+    position = Position.from_fen(
+        "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w Kq f6 0 3"
+    )
+    assert position.ep_square == parse_square("f6")
+    assert position.castling == 1 | 8
+    assert position.fullmove_number == 3
+    with pytest.raises(ValueError):
+        Position.from_fen("8/8/8 w - -")
+    # one King per side
+    for placement in ("8/8/8/8/8/8/8/4K3", "4k3/8/8/8/8/8/8/3KK3"):
+        with pytest.raises(ValueError):
+            Position.from_fen(f"{placement} w - - 0 1")
+    # castling rights without King and Rook on their squares are dropped
+    position = Position.from_fen("4k3/8/8/8/8/8/8/4K3 w K - 0 1")
+    assert position.castling == 0
+    assert sorted(move_to_uci(move) for move in position.legal_moves()) == [
+        "e1d1",
+        "e1d2",
+        "e1e2",
+        "e1f1",
+        "e1f2",
+    ]
+    assert Position.from_fen("r3k3/8/8/8/8/8/8/4K2R w KQkq - 0 1").castling == 1 | 8
+
+
+def test_position_pack_unpack():
+    position = play(Position.initial(), "e2e4", "a7a6", "e4e5", "d7d5")
+    data = position.pack()
+    assert len(data) == PACKED_SIZE
+    unpacked = Position.unpack(data)
+    assert unpacked.bitboards == position.bitboards
+    assert unpacked.key == position.key
+    assert unpacked.to_fen() == position.to_fen()
+    assert position.to_fen() == (
+        "rnbqkbnr/1pp1pppp/p7/3pP3/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3"
+    )
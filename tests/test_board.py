@@ -8,3 +8,35 @@ def test_board_creation():
     player1 = Player("white")
     player2 = Player("black")
     Board(players=[player1, player2])
+
+
+def test_board_make_unmake_move():
+    player1 = Player("white")
+    player2 = Player("black")
+    board = Board(players=[player1, player2])
+    before = board.to_str_arr()
+
+    pawn = board.get_piece("e2")
+    undo = board.make_move(pawn, pawn.get_move("e4", board))
+    assert board.get_piece("e4") is pawn and pawn.has_moved
+    assert board.get_piece("e2") is None
+    assert board.get_piece("e3").SYMBOL == " "
+
+    board.unmake_move(undo)
+    assert (board.to_str_arr() == before).all()
+    assert board.get_piece("e2") is pawn and not pawn.has_moved
+    assert len(player1.pieces) == 16
+
+
+def test_board_attackers_of():
+    player1 = Player("white")
+    player2 = Player("black")
+    board = Board(players=[player1, player2])
+
+    # f3 is defended by the g2 and e2 pawns and the g1 knight
+    attackers = board.attackers_of((6, 3), "white")
+    assert sorted(repr(piece) for piece in attackers) == ["Nw", "Pw", "Pw"]
+    assert board.is_square_attacked((6, 3), "white")
+    assert not board.is_square_attacked((6, 3), "black")
+    # sliders are blocked by pawns in the initial position
+    assert board.attackers_of((4, 4)) == []
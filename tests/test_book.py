@@ -0,0 +1,90 @@
+"""Test opening book."""
+import pickle
+
+import numpy as np
+import pytest
+
+from chess.bitboard import Position
+from chess.book import RECORD, OpeningBook, build_book
+from chess.game import Game
+from chess.players import Player
+from chess.selfplay import play_game
+
+GAMES = [
+    ["e2e4", "e7e5", "g1f3"],
+    ["e2e4", "e7e5", "f1c4"],
+    ["e2e4", "c7c5"],
+    ["d2d4", "d7d5"],
+]
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = str(tmp_path / "book.bin")
+    build_book(GAMES, path, max_ply=2)
+    return path
+
+
+def test_build_book(book_path):
+    with open(book_path, "rb") as f:
+        data = f.read()
+    records = [RECORD.unpack_from(data, i) for i in range(0, len(data), RECORD.size)]
+    # e4 and d4 from the initial position, e5 and c5 after e4, d5 after d4
+    assert len(records) == 5
+    assert records == sorted(records)
+    assert sum(weight for _, _, weight in records) == 8
+
+
+def test_lookup(book_path):
+    position = Position.initial()
+    with OpeningBook(book_path) as book:
+        entries = dict(book.entries(position.key))
+        assert entries == {
+            position.parse_uci("e2e4"): 3,
+            position.parse_uci("d2d4"): 1,
+        }
+        assert book.choose(position, best=True) == position.parse_uci("e2e4")
+        position.make_move(position.parse_uci("e2e4"))
+        assert book.choose(position) in (
+            position.parse_uci("e7e5"),
+            position.parse_uci("c7c5"),
+        )
+        # out of book (max_ply=2)
+        position.make_move(position.parse_uci("e7e5"))
+        assert book.entries(position.key) == []
+        assert book.choose(position) is None
+        # books are mapped again when unpickled
+        assert len(pickle.loads(pickle.dumps(book))) == len(book) == 5
+
+
+def test_invalid_book(tmp_path):
+    path = tmp_path / "book.bin"
+    path.write_bytes(b"\x00" * (RECORD.size + 1))
+    with pytest.raises(ValueError, match="not an opening book"):
+        OpeningBook(str(path))
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert OpeningBook(str(empty)).choose(Position.initial()) is None
+
+
+@pytest.mark.parametrize("backend", ["object", "bitboard"])
+def test_player_book(book_path, backend):
+    np.random.seed(0)
+    player1 = Player("white", book=book_path)
+    player2 = Player("black", book=OpeningBook(book_path))
+    game = Game(player1, player2, backend=backend)
+    for _ in range(2):
+        game.next_move(verbose=False)
+    assert game.position.to_fen().split()[0] in (
+        "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR",
+        "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR",
+        "rnbqkbnr/ppp1pppp/8/3p4/3P4/8/PPP1PPPP/RNBQKBNR",
+    )
+
+
+def test_selfplay_book(book_path):
+    result = play_game(3, max_plies=10, book=book_path)
+    assert result.moves[0] in (
+        Position.initial().parse_uci("e2e4"),
+        Position.initial().parse_uci("d2d4"),
+    )
@@ -0,0 +1,50 @@
+"""Test batched position encoding."""
+import numpy as np
+import pytest
+from chess.bitboard import Position
+from chess.encode import allocate, encode_positions, iter_positions, stream_batches
+from chess.game import Game
+
+
+def test_encode_positions():
+    batch = encode_positions([Position.initial()])
+    assert batch.planes.shape == (1, 12, 8, 8)
+    # white pawns on the 2nd rank, black king on e8
+    assert batch.planes[0, 0, 6].tolist() == [1] * 8
+    assert batch.planes[0, 11, 0].tolist() == [0, 0, 0, 0, 1, 0, 0, 0]
+    assert batch.planes.sum() == 32
+    assert batch.castling.tolist() == [[1, 1, 1, 1]]
+    assert batch.side_to_move.tolist() == [0]
+
+    position = Position.from_fen(
+        "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w Kq f6 0 3"
+    )
+    out = allocate(4, dtype=np.float32)
+    batch = encode_positions([position], out=out)
+    assert batch.planes.dtype == np.float32
+    assert np.shares_memory(batch.planes, out.planes)
+    assert batch.en_passant.tolist() == [[0, 0, 0, 0, 0, 1, 0, 0]]
+    assert batch.castling.tolist() == [[1, 0, 0, 1]]
+    with pytest.raises(ValueError):
+        encode_positions([position] * 5, out=out)
+
+
+def test_stream_batches():
+    game = Game.create(backend="bitboard")
+    for _ in range(6):
+        game.next_move(verbose=False)
+    sources = [game, ["e2e4", "e7e5", "g1f3"], game.moves]
+    keys = [
+        position.key for source in sources for position, _ in iter_positions(source)
+    ]
+    assert len(keys) == 15 and keys[:6] == keys[9:]
+
+    sizes = []
+    planes = []
+    for batch in stream_batches(sources, chunk_size=4):
+        sizes.append(batch.size)
+        planes.append(batch.planes.copy())
+    assert sizes == [4, 4, 4, 3]
+    expected = encode_positions([Position.initial()]).planes[0]
+    assert (planes[0][0] == expected).all()
+    assert (planes[1][2] == expected).all()
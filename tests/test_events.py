@@ -0,0 +1,83 @@
+"""Test game events."""
+import pytest
+
+import chess.game
+from chess.events import (
+    Capture,
+    Check,
+    EventEmitter,
+    GameOver,
+    MovePlayed,
+    Promotion,
+    TurnSwitched,
+)
+from chess.game import Game
+
+
+def play(game, *ucis, verbose=False):
+    for uci in ucis:
+        game.next_move(move=game.position.parse_uci(uci), verbose=verbose)
+
+
+def test_events():
+    game = Game.create()
+    queue = game.events.record()
+    moves = game.events.record(event_types=(MovePlayed,))
+    play(game, "f2f3", "e7e5", "g2g4", "d8h4")
+    game.next_move(verbose=False)
+
+    assert [type(event) for event in moves] == [MovePlayed] * 4
+    events = list(queue)
+    assert [type(event) for event in events[-3:]] == [Check, TurnSwitched, GameOver]
+    assert str(events[-3]) == 'Player("white") is in check by [Qb]'
+    assert events[-1] == GameOver("black", False)
+    assert events[0] == MovePlayed(1, "white", "P", "f2", "f3", events[0].move)
+    assert str(events[0]) == '[1] Player("white") moves P from f2 to f3'
+    assert events[1] == TurnSwitched("black")
+    # the queue is drained by iteration
+    assert list(queue) == []
+
+
+def test_capture_and_promotion(capsys):
+    game = Game.from_fen("1n2k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+    events = game.events.record(event_types=(Capture, Promotion))
+    play(game, "a7b8q", verbose=True)
+    assert list(events) == [Capture("white", "N", "b8"), Promotion("white", "Q", "b8")]
+    assert capsys.readouterr().out.splitlines() == [
+        'Player("white") captured Player("black") N',
+        '[1] Player("white") moves P from a7 to b8',
+        "* Pawn promoted to Q",
+        'Player("black") is in check by [Qw]',
+        "Switch to black",
+    ]
+
+
+def test_no_subscriber(monkeypatch, capsys):
+    def fail(*args):
+        raise AssertionError("Event or history created without subscriber")
+
+    # squares are only named when events or the history are formatted
+    names = ["MovePlayed", "Capture", "Check", "TurnSwitched", "GameOver"]
+    for name in names + ["coords_to_loc"]:
+        monkeypatch.setattr(chess.game, name, fail)
+    game = Game.create()
+    play(game, "f2f3", "e7e5", "g2g4", "d8h4")
+    game.next_move(verbose=False)
+    assert game.winner == "black"
+    assert capsys.readouterr().out == ""
+    monkeypatch.undo()
+    assert game.get_history(delimiter=" ") == "1. f3 e5 2. g4 Qh4"
+
+
+def test_unsubscribe():
+    emitter = EventEmitter()
+    assert not emitter
+    received = []
+    callback = emitter.subscribe(received.append)
+    emitter.emit(TurnSwitched("white"))
+    emitter.unsubscribe(callback)
+    assert not emitter
+    emitter.emit(TurnSwitched("black"))
+    assert received == [TurnSwitched("white")]
+    with pytest.raises(TypeError):
+        emitter.emit()
@@ -1,6 +1,90 @@
 """Test Game class."""
-from chess.game import Game
+import pytest
+from chess.board import Board
+from chess.bitboard import PACKED_SIZE
+from chess.game import BACKENDS, Game
 
 
 def test_game_creation():
     Game.create()
+
+
+def test_game_board_is_updated_in_place():
+    game = Game.create()
+    board = game.board
+    assert game.board is board
+    game.next_move(verbose=False)
+    assert game.board is board
+    fresh = Board([game.player1, game.player2])
+    assert (fresh.to_str_arr() == board.to_str_arr()).all()
+
+
+def test_game_snapshot_is_independent():
+    game = Game.create()
+    snapshot = game.snapshot()
+    game.next_move(verbose=False)
+    assert (snapshot.to_str_arr() != game.board.to_str_arr()).any()
+    assert (snapshot.to_str_arr() == Board(snapshot.players).to_str_arr()).all()
+
+
+@pytest.mark.parametrize("backend", ("object", "bitboard"))
+def test_game_takeback(backend):
+    game = Game.create(backend=backend)
+    board = game.board.to_str_arr()
+    bitboards = list(game.position.bitboards)
+    for _ in range(6):
+        game.next_move(verbose=False)
+    for _ in range(6):
+        game.takeback()
+    assert (game.board.to_str_arr() == board).all()
+    assert game.position.bitboards == bitboards
+    assert game.turn == "white" and game.move_number == 1 and game.history == []
+    with pytest.raises(ValueError):
+        game.takeback()
+
+
+def test_game_position_key():
+    game = Game.create()
+    key = game.position_key
+    game.next_move(verbose=False)
+    assert game.position_key != key
+    assert game.position_key == game.position.compute_key()
+    game.takeback()
+    assert game.position_key == key
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_game_from_fen(backend):
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b Kq - 0 7"
+    game = Game.from_fen(fen, backend=backend)
+    assert game.to_fen() == fen
+    assert game.turn == "black" and game.move_number == 7
+    assert game.board.get_piece("e8").SYMBOL == "K"
+    assert not game.board.get_piece("a8").has_moved
+    assert game.board.get_piece("h8").has_moved
+    game.next_move(verbose=False)
+    game.takeback()
+    assert game.to_fen() == fen
+
+    snapshot = game.pack()
+    assert len(snapshot) == PACKED_SIZE
+    assert Game.unpack(snapshot).to_fen() == fen
+
+
+@pytest.mark.parametrize("backend", ("object", "bitboard"))
+def test_game_reset_after_finish(backend):
+    game = Game.create(backend=backend)
+
+    def fools_mate():
+        for uci in ("f2f3", "e7e5", "g2g4", "d8h4"):
+            game.next_move(move=game.position.parse_uci(uci), verbose=False)
+        game.next_move(verbose=False)
+
+    fools_mate()
+    assert game.is_finished and game.winner == "black"
+    game.reset()
+    assert not game.is_finished and game.winner is None and not game.draw
+    assert game.move_number == 1 and game.turn == "white" and game.moves == []
+    assert not game.current_player.in_check
+    fools_mate()
+    assert game.is_finished and game.winner == "black" and game.move_number == 3
@@ -0,0 +1,85 @@
+"""Test binary game log."""
+import numpy as np
+import pytest
+
+from chess.bitboard import Position
+from chess.game import Game
+from chess.gamelog import GameLog, GameLogWriter
+from chess.selfplay import play_game
+
+
+@pytest.fixture
+def results():
+    return [play_game(seed, max_plies=100) for seed in range(3)]
+
+
+def test_roundtrip(tmp_path, results):
+    path = str(tmp_path / "games.log")
+    with GameLogWriter(path, interval=8) as writer:
+        for result in results:
+            writer.write(result.moves, result.outcome)
+    # appending to an existing log keeps its snapshot interval
+    game = Game.from_fen("8/8/8/2k5/8/8/8/3QK3 w - - 0 1", backend="bitboard")
+    game.next_move(verbose=False)
+    with GameLogWriter(path, interval=32) as writer:
+        assert writer.interval == 8
+        assert writer.write_game(game) == 3
+
+    with GameLog(path) as log:
+        assert len(log) == 4
+        for i, result in enumerate(results):
+            assert log.plies(i) == result.plies
+            assert log.outcome(i) == result.outcome
+            assert log.moves(i).tolist() == result.moves
+            position = Position.initial()
+            for ply, move in enumerate(result.moves):
+                if ply % 5 == 0:
+                    assert log.position(i, ply).to_fen() == position.to_fen()
+                position.make_move(move)
+            assert log.position(i).key == position.key
+        assert log.start_position(3).to_fen() == "8/8/8/2k5/8/8/8/3QK3 w - - 0 1"
+        assert log.position(3).to_fen() == game.to_fen()
+        with pytest.raises(IndexError):
+            log.position(0, results[0].plies + 1)
+        with pytest.raises(IndexError):
+            log.moves(4)
+
+
+def test_streaming(tmp_path):
+    path = str(tmp_path / "games.log")
+    writer = GameLogWriter(path, interval=4)
+    writer.begin()
+    position = Position.initial()
+    for uci in ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"]:
+        move = position.parse_uci(uci)
+        position.make_move(move)
+        writer.append(move)
+    # unfinished games are not indexed
+    assert len(GameLog(path)) == 0
+    assert writer.end() == 0
+    writer.close()
+
+    log = GameLog(path)
+    assert log.outcome(0) == "unfinished"
+    assert log.moves(0).dtype == np.uint16
+    assert log.position(0, 4).to_fen() == (
+        "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+    )
+    log.close()
+
+
+def test_invalid_log(tmp_path):
+    path = tmp_path / "games.log"
+    path.write_bytes(b"PGN" * 10)
+    with pytest.raises(ValueError, match="not a game log"):
+        GameLog(str(path))
+    with pytest.raises(ValueError, match="not a game log"):
+        GameLogWriter(str(path))
+
+
+@pytest.mark.parametrize("interval", [0, -1, 2**16])
+def test_invalid_interval(tmp_path, interval):
+    path = tmp_path / "games.log"
+    with pytest.raises(ValueError, match="`interval` must be"):
+        GameLogWriter(str(path), interval=interval)
+    assert not path.exists()
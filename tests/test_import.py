@@ -0,0 +1,38 @@
+"""Test import of the core package."""
+import subprocess
+import sys
+
+# import time budget of the core modules (in seconds), on top of NumPy
+IMPORT_TIME_BUDGET = 0.5
+# modules only imported by the features (or command line interfaces) using them
+LAZY_MODULES = [
+    "asyncio",
+    "chess.book",
+    "chess.mcts",
+    "chess.parallel",
+    "chess.perft",
+    "chess.tablebase",
+    "concurrent.futures",
+    "fire",
+    "matplotlib",
+    "multiprocessing",
+    "seaborn",
+]
+
+SCRIPT = """
+import sys, time
+import numpy
+start = time.perf_counter()
+import chess.board, chess.game, chess.moves, chess.pieces, chess.players
+print(time.perf_counter() - start)
+print(" ".join(sorted(sys.modules)))
+"""
+
+
+def test_core_import_is_headless_and_fast():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, check=True, text=True
+    ).stdout.splitlines()
+    (import_time, modules) = (float(output[0]), output[1].split())
+    assert [name for name in LAZY_MODULES if name in modules] == []
+    assert import_time < IMPORT_TIME_BUDGET
@@ -0,0 +1,65 @@
+"""Test Monte Carlo tree search."""
+import random
+
+import numpy as np
+import pytest
+from chess.bitboard import Position, move_to_uci
+from chess.mcts import DRAW, LOSS, MCTS, WIN, playout
+from chess.players import Player
+
+SCHOLAR = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+
+
+def test_playout():
+    rng = random.Random(0)
+    # black is mated, stalemated, or only Kings are left
+    assert playout(Position.from_fen("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1"), 10, rng) == LOSS
+    assert playout(Position.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"), 10, rng) == DRAW
+    assert playout(Position.from_fen("7k/8/5K2/8/8/8/8/8 w - - 0 1"), 10, rng) == DRAW
+    # unfinished playouts are adjudicated on material
+    assert playout(Position.from_fen("7k/8/5K2/8/8/8/8/Q7 w - - 0 1"), 0, rng) == WIN
+    results = [playout(Position.initial(), 20, rng) for _ in range(10)]
+    assert set(results) <= {WIN, DRAW, LOSS}
+
+
+def test_mcts_finds_mate_in_one():
+    np.random.seed(0)
+    with MCTS(time_limit=None, max_playouts=500) as mcts:
+        result = mcts.search(Position.from_fen(SCHOLAR))
+    assert move_to_uci(result.move) == "h5f7"
+    assert result.playouts == 500
+    assert result.moves[0].move == result.move and result.win_rate == 1.0
+    assert sum(move.visits for move in result.moves) <= 500
+
+
+def test_mcts_reuses_tree():
+    np.random.seed(0)
+    mcts = MCTS(time_limit=None, max_playouts=200, batch_size=4)
+    position = Position.initial()
+    result = mcts.search(position)
+    assert len(result.moves) == 20
+    (child,) = [node for node in mcts.root.children if node.move == result.move]
+    grandchild = child.children[0]
+    position.make_move(child.move)
+    position.make_move(grandchild.move)
+    visits = grandchild.visits
+    mcts.search(position)
+    assert mcts.root is grandchild and mcts.root.parent is None
+    assert mcts.root.visits > visits
+    # no legal move
+    result = mcts.search(Position.from_fen("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1"))
+    assert result.move is None and result.moves == []
+    with pytest.raises(ValueError):
+        MCTS(time_limit=None)
+
+
+def test_player_mcts_strategy():
+    options = {"time_limit": None, "max_playouts": 64, "processes": 2}
+    player = Player("white", strategy="mcts", mcts_options=options)
+    position = Position.from_fen(SCHOLAR)
+    try:
+        assert player.get_move(position) in position.legal_moves()
+        assert player.last_search.playouts == 64
+    finally:
+        player.close()
+    assert player.mcts is None
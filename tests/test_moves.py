@@ -0,0 +1,26 @@
+"""Test Move classes."""
+import pickle
+
+from chess.moves import EMPTY, EMPTY_DIAG, KingSideCastling, Move
+from chess.pieces import King, Pawn
+
+
+def test_move_interning():
+    move = Move((1, 1), ["empty OR adversary", "empty_diag"])
+    assert Move([1, 1], ("empty OR adversary", "empty_diag")) is move
+    assert Move((1, 1)) is not move
+    assert move.conditions == ["empty OR adversary", "empty_diag"]
+    assert move.flags & EMPTY_DIAG and not move.flags & EMPTY
+    assert Move((0, 1)).conditions == [None]
+    assert pickle.loads(pickle.dumps(move)) is move
+
+    castling = pickle.loads(pickle.dumps(KingSideCastling()))
+    assert (castling.coords, castling.symbol, castling.rook_col) == ((2, 0), "0-0", 8)
+
+
+def test_compact_objects():
+    for obj in (Move((1, 2)), King.MOVES[-1], Pawn((1, 2), "white")):
+        assert not hasattr(obj, "__dict__")
+    pawn = Pawn((1, 2), "white")
+    copy = pawn.copy()
+    assert copy is not pawn and (copy.coords, copy.color) == (pawn.coords, pawn.color)
@@ -0,0 +1,83 @@
+"""Test root-parallel search."""
+import threading
+
+import pytest
+from chess.bitboard import Position, move_to_uci
+from chess.parallel import ParallelSearcher
+from chess.perft import REFERENCE_POSITIONS
+from chess.players import Player
+from chess.search import MATE_SCORE, MAX_DEPTH, search
+
+
+def play(position, *ucis):
+    for uci in ucis:
+        (move,) = [m for m in position.legal_moves() if move_to_uci(m) == uci]
+        position.make_move(move)
+    return position
+
+
+@pytest.fixture(scope="module")
+def searcher():
+    with ParallelSearcher(processes=2) as searcher:
+        yield searcher
+
+
+def test_parallel_search_finds_mate_in_one(searcher):
+    position = play(Position.initial(), "e2e4", "e7e5", "d1h5", "b8c6", "f1c4", "g8f6")
+    result = searcher.search(position, max_depth=3)
+    assert move_to_uci(result.move) == "h5f7"
+    assert result.score >= MATE_SCORE - 3
+
+
+def test_parallel_search_matches_sequential_search(searcher):
+    position = play(Position.initial(), "e2e4", "e7e5", "g1f3", "b8c6")
+    result = searcher.search(position, max_depth=3)
+    expected = search(position, max_depth=3)
+    assert (result.move, result.score, result.depth) == (
+        expected.move,
+        expected.score,
+        expected.depth,
+    )
+    with ParallelSearcher(processes=3) as other:
+        assert other.search(position, max_depth=3).move == result.move
+    # the bound of the best move cuts off the others, as in a sequential search
+    kiwipete = Position.from_fen(REFERENCE_POSITIONS["kiwipete"][0])
+    with ParallelSearcher(processes=2) as fresh:
+        result = fresh.search(kiwipete, max_depth=3)
+    expected = search(kiwipete, max_depth=3)
+    assert (result.move, result.score) == (expected.move, expected.score)
+    assert result.nodes < 1.5 * expected.nodes
+
+
+def test_parallel_search_limits(searcher):
+    position = Position.initial()
+    result = searcher.search(position, max_nodes=2000)
+    assert result.nodes <= 2000
+    assert result.move in position.legal_moves()
+    result = searcher.search(position, time_limit=0.2)
+    assert result.move in position.legal_moves() and result.time < 1
+    with pytest.raises(ValueError):
+        searcher.search(position)
+
+
+def test_parallel_search_stop_event(searcher):
+    stop = threading.Event()
+    timer = threading.Timer(0.2, stop.set)
+    timer.start()
+    result = searcher.search(Position.initial(), max_depth=MAX_DEPTH, stop=stop)
+    assert result.time < 2 and result.depth < MAX_DEPTH
+    assert result.move in Position.initial().legal_moves()
+    # the next search is not aborted
+    assert searcher.search(Position.initial(), max_depth=2).depth == 2
+
+
+def test_player_with_processes():
+    options = {"max_depth": 2, "processes": 2}
+    player = Player("white", strategy="search", search_options=options)
+    position = play(Position.initial(), "e2e4", "e7e5", "d1h5", "d8g5")
+    try:
+        assert move_to_uci(player.get_position_move(position)) == "h5g5"
+        assert player.parallel_searcher is not None
+    finally:
+        player.close()
+    assert player.parallel_searcher is None
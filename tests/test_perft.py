@@ -0,0 +1,47 @@
+"""Test move generation counts."""
+import pytest
+from chess.bitboard import Position
+from chess.game import Game
+from chess.perft import (
+    REFERENCE_POSITIONS,
+    game_perft,
+    game_perft_divide,
+    perft,
+    perft_divide,
+    run_perft,
+)
+
+# reference counts up to 10000 nodes, to keep the suite fast
+CASES = [
+    (name, depth, nodes)
+    for name, (_, counts) in REFERENCE_POSITIONS.items()
+    for depth, nodes in enumerate(counts, start=1)
+    if nodes <= 10000
+]
+
+
+@pytest.mark.parametrize("name, depth, nodes", CASES)
+def test_perft_reference_positions(name, depth, nodes):
+    (fen, _) = REFERENCE_POSITIONS[name]
+    position = Position.from_fen(fen)
+    assert perft(position, depth) == nodes
+    # position is restored
+    assert position.key == Position.from_fen(fen).key
+
+
+def test_perft_divide_processes():
+    (fen, counts) = REFERENCE_POSITIONS["kiwipete"]
+    position = Position.from_fen(fen)
+    divide = perft_divide(position, 2, processes=2)
+    assert divide == perft_divide(position, 2)
+    assert len(divide) == counts[0] and sum(divide.values()) == counts[1]
+
+    result = run_perft(position, 2)
+    assert result.nodes == counts[1]
+    assert result.nps > 0
+
+
+def test_game_perft():
+    game = Game.create()
+    assert game_perft(game, 3) == 8902
+    assert game_perft_divide(game, 2) == perft_divide(Position.initial(), 2)
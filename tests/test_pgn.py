@@ -0,0 +1,102 @@
+"""Test PGN reader and writer."""
+import io
+
+import pytest
+
+import chess.pgn
+from chess.bitboard import Position
+from chess.pgn import (
+    PgnError,
+    PgnWriter,
+    format_game,
+    iter_games,
+    move_to_san,
+    parse_san,
+    read_games,
+)
+from chess.selfplay import play_game
+
+PGN = """[Event "Test \\"quoted\\""]
+[Result "1-0"]
+
+1. e4 {best by test} e5 2. Nf3 (2. f4 exf4) Nc6 $1 3. Bb5 a6 ; Ruy Lopez
+4. Ba4 Nf6 5. O-O Be7 1-0
+
+[Event "Fool's mate"]
+[Result "0-1"]
+
+1. f3 e5 2. g4 Qh4# 0-1
+"""
+
+
+def test_iter_games():
+    (first, second) = iter_games(io.StringIO(PGN))
+    assert first.headers["Event"] == 'Test "quoted"'
+    assert len(first.moves) == 10 and first.result == "1-0"
+    assert second.result == "0-1"
+    game = second.to_game()
+    assert game.to_fen().startswith("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR")
+
+    headers_only = list(iter_games(io.StringIO(PGN), headers_only=True))
+    assert [game.headers for game in headers_only] == [first.headers, second.headers]
+    assert headers_only[0].moves == []
+
+
+def test_iter_games_on_error():
+    (first, second) = PGN.split("\n\n[")
+    corrupt = '[Event "Corrupt"]\n[Result "*"]\n\n1. e4 Ke7 2. Qz9 *\n\n'
+    pgn = first + "\n\n" + corrupt + "[" + second
+    with pytest.raises(PgnError):
+        list(iter_games(io.StringIO(pgn)))
+    games = list(iter_games(io.StringIO(pgn), on_error="skip"))
+    assert [game.result for game in games] == ["1-0", "0-1"]
+    assert len(games[1].moves) == 4
+    with pytest.raises(ValueError):
+        list(iter_games(io.StringIO(pgn), on_error="ignore"))
+
+
+def test_iter_games_on_parser_error(monkeypatch):
+    corrupt = '[FEN "4k3/8/8/8/8/8/8/4K3 w - + 0 1"]\n\n1. Kd2 *\n\n'
+    for pgn in (corrupt + PGN, PGN + "\n" + corrupt):
+        with pytest.raises(ValueError):
+            list(iter_games(io.StringIO(pgn)))
+        games = list(iter_games(io.StringIO(pgn), on_error="skip"))
+        assert [game.result for game in games] == ["1-0", "0-1"]
+
+    # errors other than `ValueError` are raised as `PgnError` too
+    def fail(position, san):
+        raise IndexError("string index out of range")
+
+    monkeypatch.setattr(chess.pgn, "parse_san", fail)
+    with pytest.raises(PgnError):
+        list(iter_games(io.StringIO(PGN)))
+    assert list(iter_games(io.StringIO(PGN), on_error="skip")) == []
+
+
+def test_san():
+    position = Position.from_fen(
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    )
+    for san in ("O-O-O", "Nxf7", "Qxf6", "dxe6", "Rb1", "gxh3"):
+        assert move_to_san(position, parse_san(position, san)) == san
+    with pytest.raises(PgnError):
+        parse_san(position, "Ke3")
+
+    # file, then rank disambiguation
+    position = Position.from_fen("4k3/8/8/R7/8/8/8/R4RK1 w - - 0 1")
+    assert move_to_san(position, parse_san(position, "Rae1")) == "Rae1+"
+    assert move_to_san(position, parse_san(position, "R1a3")) == "R1a3"
+    with pytest.raises(PgnError):
+        parse_san(position, "Ra3")
+
+
+def test_write_read_roundtrip(tmp_path):
+    results = [play_game(seed, max_plies=80) for seed in range(3)]
+    path = str(tmp_path / "games.pgn")
+    with PgnWriter(path) as writer:
+        for result in results:
+            writer.write(result.moves, {"Round": str(result.seed)})
+    games = list(read_games(path))
+    assert [game.moves for game in games] == [result.moves for result in results]
+    assert games[2].headers["Round"] == "2"
+    assert format_game(results[0].moves).startswith('[Event "?"]')
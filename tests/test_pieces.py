@@ -0,0 +1,23 @@
+"""Test Piece classes."""
+from chess.board import Board
+from chess.pieces import Bishop, King, Queen, Rook
+from chess.players import Player
+
+
+def test_sliding_moves_are_shared():
+    assert Bishop.MOVES is Bishop.MOVES
+    assert (
+        Bishop((1, 1), "white").theoretical_moves
+        is Bishop((1, 1), "black").theoretical_moves
+    )
+    assert len(Queen((4, 4), "white").theoretical_moves) == 27
+    assert len(Rook((1, 1), "white").theoretical_moves) == 14
+
+
+def test_sliding_moves_stop_at_first_blocker():
+    player1 = Player("white", pieces=[Rook((1, 1), "white"), King((8, 2), "white")])
+    player2 = Player("black", pieces=[Rook((1, 4), "black"), King((8, 8), "black")])
+    board = Board(players=[player1, player2])
+    rook = board.get_piece("a1")
+    locs = sorted(m.get_new_coords(rook.coords) for m in rook.get_valid_moves(board))
+    assert locs == [(1, 2), (1, 3), (1, 4)] + [(x, 1) for x in range(2, 9)]
@@ -1,8 +1,46 @@
 """Test Player class."""
 import pytest
+from chess.bitboard import Position
+from chess.game import Game
 from chess.players import Player
 
 
 @pytest.mark.parametrize("color", ("white", "black"))
 def test_player_creation(color):
     player = Player(color)
+
+
+def test_player_get_position_move():
+    position = Position.initial()
+    move = Player("white").get_move(position)
+    assert move in position.legal_moves()
+
+
+def test_player_search_strategy():
+    with pytest.raises(ValueError):
+        Player("white", strategy="unknown")
+    player = Player("white", strategy="search", search_options={"max_depth": 1})
+    position = Position.initial()
+    assert player.get_move(position) in position.legal_moves()
+    assert player.last_search.depth == 1
+
+
+def test_player_lazy_legal_moves():
+    game = Game.create()
+    player = game.current_player
+    moves = list(player.iter_legal_moves(game.board))
+    assert len(moves) == 20
+    assert player.has_legal_move(game.board)
+    (piece, move) = player.sample_move(game.board)
+    assert any(p is piece and m is move for p, m in moves)
+
+    # fool's mate: white cannot move anymore
+    fen = "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3"
+    for game in (Game.from_fen(fen), Game.from_fen(fen, backend="bitboard")):
+        player = game.current_player
+        assert not player.has_legal_move(game.board)
+        assert not player.has_legal_move(game.position)
+        assert player.sample_move(game.board) is None
+        assert player.get_move(game.position) is None
+        game.next_move(verbose=False)
+        assert game.is_finished and game.winner == "black"
@@ -0,0 +1,72 @@
+"""Test alpha-beta search."""
+import threading
+import time
+
+import numpy as np
+import pytest
+from chess.bitboard import Position, move_to_uci
+from chess.search import MATE_SCORE, MAX_DEPTH, search
+
+
+def play(position, *ucis):
+    for uci in ucis:
+        (move,) = [m for m in position.legal_moves() if move_to_uci(m) == uci]
+        position.make_move(move)
+    return position
+
+
+def test_search_finds_mate_in_one():
+    position = play(Position.initial(), "e2e4", "e7e5", "d1h5", "b8c6", "f1c4", "g8f6")
+    result = search(position, max_depth=3)
+    assert move_to_uci(result.move) == "h5f7"
+    assert result.score >= MATE_SCORE - 3
+
+
+def test_search_captures_hanging_queen():
+    position = play(Position.initial(), "e2e4", "e7e5", "d1h5", "d8g5")
+    result = search(position, max_depth=2)
+    assert move_to_uci(result.move) == "h5g5"
+    assert result.score > 0
+
+
+def test_search_limits():
+    position = Position.initial()
+    result = search(position, max_nodes=2000)
+    assert result.nodes <= 2000
+    assert result.move in position.legal_moves()
+    assert result.nps >= 0
+    # position is left untouched
+    assert position.key == Position.initial().key
+    with pytest.raises(ValueError):
+        search(position)
+
+
+def test_search_interrupted_deep_in_tree():
+    # the budget runs out in the middle of the tree of random positions
+    rng = np.random.RandomState(0)
+    for _ in range(40):
+        position = Position.initial()
+        for _ in range(rng.randint(40)):
+            moves = position.legal_moves()
+            if not moves:
+                break
+            position.make_move(moves[rng.randint(len(moves))])
+        result = search(position, max_nodes=int(rng.randint(50, 500)))
+        assert result.move is None or result.move in position.legal_moves()
+
+
+def test_search_stop_event():
+    stop = threading.Event()
+    results = []
+    thread = threading.Thread(
+        target=lambda: results.append(
+            search(Position.initial(), max_depth=MAX_DEPTH, stop=stop)
+        )
+    )
+    thread.start()
+    time.sleep(0.2)
+    stop.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert results[0].move in Position.initial().legal_moves()
+    assert results[0].depth < MAX_DEPTH
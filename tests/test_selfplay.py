@@ -0,0 +1,40 @@
+"""Test self-play runner."""
+import multiprocessing
+
+from chess.selfplay import SelfPlayStats, play_game, run_selfplay
+
+
+def test_play_game(capsys):
+    result = play_game(1, max_plies=30)
+    assert result == play_game(1, max_plies=30)
+    assert result.plies <= 30
+    assert result.outcome in ("white", "black", "draw", "unfinished")
+    # games are silent
+    assert capsys.readouterr().out == ""
+
+
+def test_run_selfplay():
+    finished = []
+    results = run_selfplay(
+        4,
+        max_plies=20,
+        seed=10,
+        processes=2,
+        callback=lambda r, s: finished.append(s.n_games),
+    )
+    assert [result.seed for result in results] == [10, 11, 12, 13]
+    assert finished == [1, 2, 3, 4]
+    assert results == run_selfplay(4, max_plies=20, seed=10, processes=1)
+
+    stats = SelfPlayStats()
+    for result in results:
+        stats.add(result)
+    assert sum(stats.outcomes.values()) == stats.n_games == 4
+    assert "4 games" in stats.summary()
+
+
+def test_play_game_closes_players():
+    options = {"max_depth": 1, "processes": 2}
+    result = play_game(0, white="search", max_plies=4, search_options=options)
+    assert result.plies == 4
+    assert multiprocessing.active_children() == []
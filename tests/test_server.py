@@ -0,0 +1,185 @@
+"""Test game server."""
+import asyncio
+import json
+
+from chess.bitboard import Position
+from chess.server import (
+    MAX_ENGINE_PLAYERS,
+    Connection,
+    GameServer,
+    _engine_players,
+    engine_move,
+)
+
+
+async def request(reader, writer, **message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    return await receive(reader)
+
+
+async def receive(reader):
+    return json.loads(await asyncio.wait_for(reader.readline(), timeout=10))
+
+
+def run_with_server(client, **kwargs):
+    async def run():
+        server = await GameServer(**kwargs).start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        (reader, writer) = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            return await client(reader, writer)
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(run())
+
+
+def test_human_vs_engine():
+    async def client(reader, writer):
+        response = await request(reader, writer, id=1, type="create", black="random")
+        assert response["ok"] and response["id"] == 1
+        assert response["state"]["ply"] == 0
+        game = response["game"]
+
+        response = await request(
+            reader, writer, id=2, type="move", game=game, move="e7e5"
+        )
+        assert not response["ok"] and "Illegal move" in response["error"]
+        # human move, then engine reply, are streamed to subscribers
+        messages = [
+            await request(reader, writer, id=3, type="move", game=game, move="e2e4"),
+            await receive(reader),
+            await receive(reader),
+        ]
+        (response,) = [message for message in messages if "id" in message]
+        assert response["ok"] and response["state"]["ply"] >= 1
+        events = [message["state"] for message in messages if "event" in message]
+        assert [state["ply"] for state in events] == [1, 2]
+        assert events[0]["last_move"] == "e2e4" and events[1]["turn"] == "white"
+
+        response = await request(reader, writer, id=4, type="close", game=game)
+        response = await request(reader, writer, id=5, type="state", game=game)
+        assert response == {"id": 5, "ok": False, "error": f"Unknown game {game}"}
+
+    run_with_server(client)
+
+
+def test_engine_vs_engine():
+    async def client(reader, writer):
+        fen = "7k/8/6K1/8/8/8/8/1Q6 w - - 0 1"
+        response = await request(
+            reader, writer, type="create", white="search", black="random", fen=fen
+        )
+        assert response["state"]["fen"].startswith("7k/8/6K1")
+        event = await receive(reader)
+        assert event["state"]["last_move"] == "b1b8"
+        assert event["state"]["winner"] == "white"
+
+    run_with_server(client, search_options={"max_depth": 2})
+
+
+def test_invalid_requests():
+    async def client(reader, writer):
+        writer.write(b"not json\n")
+        response = await receive(reader)
+        assert not response["ok"]
+        response = await request(reader, writer, type="create", white="smart")
+        assert "Sides must be" in response["error"]
+        response = await request(reader, writer, type="create", fen=5)
+        assert response["error"] == "FEN must be a string"
+        response = await request(reader, writer, type="create", fen="8/8/8 w - -")
+        assert response["error"] == 'Invalid FEN placement "8/8/8"'
+        fen = "4k3/4R3/8/8/8/8/8/4K3 w - - 0 1"
+        response = await request(reader, writer, type="create", fen=fen)
+        assert response["error"] == "The side not to move is in check"
+        await request(reader, writer, type="create")
+        response = await request(reader, writer, type="create")
+        assert response["error"] == "Too many games (1)"
+        response = await request(reader, writer, type="dance", game=1)
+        assert response["error"] == 'Unknown request type "dance"'
+        # the connection survives malformed values
+        response = await request(reader, writer, type="state", game=[1])
+        assert response["error"] == "Unknown game [1]"
+        response = await request(reader, writer, type="state", game=1)
+        assert response["ok"]
+
+    run_with_server(client, max_games=1)
+
+
+def test_slow_consumer():
+    class Writer:
+        def write(self, data):
+            pass
+
+        async def drain(self):
+            await asyncio.sleep(1)
+
+        def close(self):
+            pass
+
+    async def run():
+        connection = Connection(Writer(), queue_size=2)
+        for i in range(4):
+            connection.send({"event": i})
+        assert connection.closed
+        await asyncio.wait_for(connection.task, timeout=5)
+
+    asyncio.run(run())
+
+
+def test_engine_players_are_kept():
+    position = Position.initial()
+    options = {"max_depth": 1}
+    move = engine_move(("test", 1, "white"), position, "search", options)
+    assert move in position.legal_moves()
+    player = _engine_players[("test", 1, "white")]
+    table = player.transposition_table
+    engine_move(("test", 1, "white"), position, "search", options)
+    assert _engine_players[("test", 1, "white")] is player
+    assert player.transposition_table is table
+
+
+def test_unexpected_errors(monkeypatch):
+    def fail(self, request):
+        raise RuntimeError("bug")
+
+    async def client(reader, writer):
+        response = await request(reader, writer, id=1, type="create")
+        assert response == {
+            "id": 1,
+            "ok": False,
+            "error": "Internal error (RuntimeError)",
+        }
+        response = await request(reader, writer, id=2, type="state", game=1)
+        assert response["error"] == "Unknown game 1"
+
+    monkeypatch.setattr(GameServer, "create", fail)
+    run_with_server(client)
+
+
+def test_many_engine_games():
+    n_games = MAX_ENGINE_PLAYERS + 4
+
+    async def client(reader, writer):
+        for i in range(n_games):
+            writer.write(json.dumps({"type": "create", "white": "search"}).encode())
+            writer.write(b"\n")
+        await writer.drain()
+        # a response and an engine move per game
+        messages = [await receive(reader) for _ in range(2 * n_games)]
+        events = [message for message in messages if "event" in message]
+        assert sorted(event["game"] for event in events) == list(range(1, n_games + 1))
+        assert all(event["state"]["ply"] == 1 for event in events)
+
+    run_with_server(client, search_options={"max_depth": 1})
+    assert len(_engine_players) == MAX_ENGINE_PLAYERS
+    # evicted players leave the transposition tables to the others
+    position = Position.initial()
+    tables = set()
+    for i in range(n_games):
+        engine_move(("test", i, "white"), position, "search", {"max_depth": 1})
+        tables.add(id(_engine_players[("test", i, "white")].transposition_table))
+    assert len(tables) == 1
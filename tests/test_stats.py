@@ -0,0 +1,63 @@
+"""Test instrumentation."""
+import json
+
+import numpy as np
+
+import chess.moves
+import chess.pieces
+from chess import stats
+from chess.game import Game
+
+
+def test_enable_disable():
+    original = chess.moves.is_move_valid
+    assert chess.pieces.is_move_valid is original
+    stats.reset()
+    stats.enable()
+    try:
+        assert stats.is_enabled()
+        # functions imported by name are instrumented too
+        assert chess.pieces.is_move_valid is chess.moves.is_move_valid
+        assert chess.moves.is_move_valid.__wrapped__ is original
+        np.random.seed(0)
+        game = Game.create()
+        for _ in range(4):
+            game.next_move(verbose=False)
+    finally:
+        stats.disable()
+    assert chess.moves.is_move_valid is chess.pieces.is_move_valid is original
+
+    snapshot = stats.snapshot()
+    functions = snapshot["functions"]
+    assert functions["chess.game:Game.next_move"]["calls"] == 4
+    # legality checks make moves too
+    assert functions["chess.board:Board.make_move"]["calls"] >= 4
+    assert functions["chess.moves:is_move_valid"]["calls"] > 0
+    assert functions["chess.game:Game.next_move"]["seconds"] > 0
+    # bitboard mirror moves are counted as well
+    assert snapshot["nodes"] >= 8 and snapshot["nps"] > 0
+    assert not snapshot["enabled"]
+
+    stats.reset()
+    assert stats.snapshot()["functions"]["chess.game:Game.next_move"]["calls"] == 0
+
+
+def test_export(tmp_path):
+    stats.reset()
+    stats.enable()
+    try:
+        Game.create(backend="bitboard").next_move(verbose=False)
+    finally:
+        stats.disable()
+
+    text = stats.to_prometheus()
+    assert "# TYPE chess_function_calls_total counter" in text
+    assert 'function="chess.game:Game.next_move"} 1\n' in text
+    assert "chess_nodes_total{" in text
+
+    stats.write_json(str(tmp_path / "stats.json"))
+    stats.write_prometheus(str(tmp_path / "stats.prom"))
+    with open(tmp_path / "stats.json") as f:
+        assert json.load(f)["nodes"] >= 2
+    assert (tmp_path / "stats.prom").read_text() == text
+    stats.reset()
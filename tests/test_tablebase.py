@@ -0,0 +1,93 @@
+"""Test endgame tablebases."""
+import numpy as np
+import pytest
+
+from chess.bitboard import KNIGHT, PAWN, Position, move_to_uci
+from chess.game import Game
+from chess.players import Player
+from chess.tablebase import (
+    ILLEGAL,
+    Tablebase,
+    dependencies,
+    generate,
+    move_tables,
+    parse_material,
+)
+
+
+@pytest.fixture(scope="module")
+def directory(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("tablebases"))
+    generate("KQK", directory)
+    return directory
+
+
+def test_material():
+    assert parse_material("KNPK") == [KNIGHT, PAWN]
+    assert parse_material("kpnk") == [KNIGHT, PAWN]
+    assert dependencies(parse_material("KPK")) == ["KBK", "KK", "KNK", "KQK", "KRK"]
+    with pytest.raises(ValueError, match="Invalid material"):
+        parse_material("KQ")
+
+
+def test_generate(directory):
+    values = generate("KQK", directory)
+    assert isinstance(values, np.memmap)
+    legal = values[values != ILLEGAL]
+    # mate in 10 moves at most, and black never wins
+    assert legal.max() == 20
+    assert legal[len(legal) // 2 :].max() <= 0
+
+
+@pytest.mark.parametrize(
+    "fen, value",
+    [
+        ("7k/8/6K1/8/8/8/8/1Q6 w - - 0 1", 2),  # mate in one
+        ("7k/6Q1/6K1/8/8/8/8/8 b - - 0 1", -1),  # checkmate
+        ("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1", 0),  # stalemate
+        ("1q6/8/8/8/8/6k1/8/7K b - - 0 1", 2),  # colors swapped
+        ("7k/8/6K1/8/8/8/8/1R6 w - - 0 1", None),  # no table
+        ("7k/8/6K1/8/8/8/8/1QQ5 w - - 0 1", None),
+    ],
+)
+def test_probe(directory, fen, value):
+    assert Tablebase(directory).probe(Position.from_fen(fen)) == value
+
+
+def test_probe_does_not_build_move_tables(directory):
+    move_tables.cache_clear()
+    tablebase = Tablebase(directory)
+    assert tablebase.probe(Position.from_fen("7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")) == 2
+    assert move_tables.cache_info().currsize == 0
+
+
+def test_best_move(directory):
+    tablebase = Tablebase(directory)
+    position = Position.from_fen("7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")
+    assert move_to_uci(tablebase.best_move(position)) == "b1b8"
+    # the lone King takes the undefended Queen
+    position = Position.from_fen("8/8/8/8/8/8/3Qk3/7K b - - 0 1")
+    assert move_to_uci(tablebase.best_move(position)) == "e2d2"
+
+
+@pytest.mark.parametrize("backend", ["object", "bitboard"])
+def test_perfect_play(directory, backend):
+    game = Game.from_fen("8/8/8/2k5/8/8/8/3QK3 w - - 0 1", backend=backend)
+    for player in (game.white_player, game.black_player):
+        player.tablebase = Tablebase(directory)
+    value = game.white_player.tablebase.probe(game.position)
+    while not game.is_finished:
+        game.next_move(verbose=False)
+    assert game.winner == "white"
+    assert len(game.moves) == value - 1
+
+
+def test_adjudication(directory):
+    game = Game(Player("white"), Player("black"))
+    game.tablebase = Tablebase(directory)
+    game.next_move(verbose=False)
+    assert not game.is_finished
+    game = Game.from_fen("8/8/8/3k4/8/8/8/3QK3 b - - 0 1")
+    game.tablebase = Tablebase(directory)
+    game.next_move(verbose=False)
+    assert game.is_finished and game.winner == "white"
@@ -0,0 +1,47 @@
+"""Test TranspositionTable class."""
+import pytest
+from chess.bitboard import Position
+from chess.search import search
+from chess.transposition import EXACT, LOWER, TranspositionTable
+
+
+def test_table_size():
+    table = TranspositionTable(size_mb=1)
+    assert len(table) & (len(table) - 1) == 0
+    assert table.size_mb <= 1
+    with pytest.raises(ValueError):
+        TranspositionTable(policy="unknown")
+
+
+def test_table_store_probe():
+    table = TranspositionTable(size_mb=0.01)
+    key = 2**64 - 1
+    assert table.probe(key) is None
+    table.store(key, 3, EXACT, -250, 1032)
+    assert table.probe(key) == (3, EXACT, -250, 1032)
+    assert table.probe(key ^ (1 << 63)) is None
+    assert (table.probes, table.hits) == (3, 1)
+
+
+@pytest.mark.parametrize("policy, kept_depth", (("depth", 5), ("always", 1)))
+def test_table_replacement_policy(policy, kept_depth):
+    table = TranspositionTable(size_mb=0.01, policy=policy)
+    (key, other_key) = (7, 7 + len(table))
+    table.store(key, 5, EXACT, 10, 1032)
+    table.store(other_key, 1, LOWER, 20, 1032)
+    entry = table.probe(key) if kept_depth == 5 else table.probe(other_key)
+    assert entry[0] == kept_depth
+    assert table.overwrites == (0 if kept_depth == 5 else 1)
+    # entries of a previous search are replaced regardless of the policy
+    table.new_search()
+    table.store(other_key, 1, LOWER, 20, 1032)
+    assert table.probe(other_key) is not None
+
+
+def test_search_with_table():
+    table = TranspositionTable(size_mb=1)
+    position = Position.initial()
+    result = search(position, max_depth=4, table=table)
+    assert result.move == search(position, max_depth=4).move
+    assert table.hits > 0 and table.cutoffs > 0
+    assert table.probe(position.key)[3] == result.move